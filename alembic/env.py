@@ -10,6 +10,8 @@ from alembic import context
 from app.db.base import Base
 from app.db.models.user import User
 from app.db.models.code import VerificationCode
+from app.db.models.outbox import EmailOutbox
+from app.db.models.auth_event import AuthEvent
 
 from app.core.config import settings
 
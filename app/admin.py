@@ -4,11 +4,11 @@ from sqladmin.authentication import AuthenticationBackend
 from fastapi import Request
 from sqlalchemy import select
 
-from app.core.utils.security import verify_password
+from app.core.utils.security import verify_password_async
 from app.db.models.code import VerificationCode
 from app.db.models.user import User
 
-from app.core.session import AsyncSessionLocal, engine
+from app.core.session import AsyncSessionLocal, get_engine
 from app.core.config import settings
 
 
@@ -27,7 +27,7 @@ class AdminAuth(AuthenticationBackend):
             user = result.scalar_one_or_none()
 
             if user and user.is_superuser:
-                if verify_password(password, user.password_hash):
+                if await verify_password_async(password, user.password_hash):
                     request.session.update({"admin": True})
                     return True
         return False
@@ -70,7 +70,7 @@ def setup_admin(app):
 
     admin = Admin(
         app=app,
-        engine=engine,
+        engine=get_engine(),
         authentication_backend=authentication_backend,
         title="VolleyPRO Admin",
         base_url="/admin",
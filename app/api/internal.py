@@ -0,0 +1,33 @@
+import os
+
+from fastapi import APIRouter, Depends
+
+from app.core.config import settings
+from app.core.session import pool_stats
+from app.deps.internal import require_internal_token
+
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    dependencies=[Depends(require_internal_token)],
+)
+
+
+@router.get("/pool", include_in_schema=False)
+async def pool():
+    # Stats are per worker process; total connections per database are
+    # roughly workers x replicas x (pool_size + max_overflow).
+    return {
+        "pid": os.getpid(),
+        "config": {
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout_seconds": settings.db_pool_timeout_seconds,
+            "pool_recycle_seconds": settings.db_pool_recycle_seconds,
+            "pool_pre_ping": settings.db_pool_pre_ping,
+            "statement_cache_size": settings.db_statement_cache_size,
+            "pgbouncer": settings.db_pgbouncer,
+        },
+        "engines": pool_stats(),
+    }
@@ -1,13 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-
-from app.deps.auth import get_auth_service, get_current_active_user
+from typing import Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
+from fastapi.responses import ORJSONResponse
+
+from app.core.config import settings
+from app.core.ratelimit import rate_limit
+from app.core.responses import ModelSerializer
+from app.deps.auth import (
+    get_access_token_payload,
+    get_auth_service,
+    get_current_principal,
+)
+from app.db.models.auth_event import AuthEvent
 from app.deps.user import get_user_service
+from app.services.audit import auth_event_recorder
 from app.schemas.user import UserCreate, UserResponse
 from app.services.auth import AuthService
 from app.services.user import UserService
 from app.schemas.auth import (
+    AuthPrincipal,
     LoginRequest,
     LoginResponse,
+    LogoutRequest,
     RefreshTokenRequest,
     RegisterRequest,
     ResendCodeRequest,
@@ -15,17 +29,45 @@ from app.schemas.auth import (
     VerifyEmailRequest,
 )
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(
+    prefix="/auth", tags=["auth"], default_response_class=ORJSONResponse
+)
+
+login_response = ModelSerializer(LoginResponse)
+token_response = ModelSerializer(Token)
+user_response = ModelSerializer(UserResponse)
 
 
-@router.post("/login", response_model=LoginResponse)
+@router.post(
+    "/login",
+    response_model=LoginResponse,
+    dependencies=[
+        Depends(
+            rate_limit(
+                "login",
+                settings.rate_limit_login_ip_per_minute,
+                settings.rate_limit_login_email_per_minute,
+            )
+        )
+    ],
+)
 async def login(
+    request: Request,
     login_data: LoginRequest,
+    background_tasks: BackgroundTasks,
     auth_service: AuthService = Depends(get_auth_service),
 ):
     user = await auth_service.authenticate_user(
         email=login_data.email,
         password=login_data.password,
+        background_tasks=background_tasks,
+    )
+    auth_event_recorder.record(
+        AuthEvent.EVENT_LOGIN,
+        AuthEvent.OUTCOME_SUCCESS if user else AuthEvent.OUTCOME_FAILURE,
+        user_id=user.id if user else None,
+        email=login_data.email,
+        request=request,
     )
     if not user:
         raise HTTPException(
@@ -33,15 +75,10 @@ async def login(
             detail="Invalid email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    tokens = auth_service.create_tokens(user.id, user.email, user.is_active)
-    return LoginResponse(
-        access_token=tokens["access_token"],
-        refresh_token=tokens["refresh_token"],
-        token_type=tokens["token_type"],
-        user_id=user.id,
-        email=user.email,
-        is_active=user.is_active,
+    tokens = await auth_service.create_tokens(
+        user.id, user.email, user.is_active, user.token_version
     )
+    return login_response.response(tokens)
 
 
 @router.post(
@@ -59,14 +96,10 @@ async def register(
             username=register_data.username,
             password=register_data.password,
         )
-        existing_user = await user_service.get_user_by_email(register_data.email)
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="User with email already exists",
-            )
         user = await user_service.create_user(user_create)
-        return user
+        return user_response.response(user, status_code=status.HTTP_201_CREATED)
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -79,7 +112,19 @@ async def register(
         )
 
 
-@router.post("/verify-email", response_model=dict)
+@router.post(
+    "/verify-email",
+    response_model=dict,
+    dependencies=[
+        Depends(
+            rate_limit(
+                "verify-email",
+                settings.rate_limit_verify_ip_per_minute,
+                settings.rate_limit_verify_email_per_minute,
+            )
+        )
+    ],
+)
 async def verify_email(
     verify_data: VerifyEmailRequest,
     user_service: UserService = Depends(get_user_service),
@@ -100,7 +145,19 @@ async def verify_email(
     }
 
 
-@router.post("/resend-code", response_model=dict)
+@router.post(
+    "/resend-code",
+    response_model=dict,
+    dependencies=[
+        Depends(
+            rate_limit(
+                "resend-code",
+                settings.rate_limit_resend_ip_per_minute,
+                settings.rate_limit_resend_email_per_minute,
+            )
+        )
+    ],
+)
 async def resend_verification_code(
     resend_data: ResendCodeRequest,
     user_service: UserService = Depends(get_user_service),
@@ -119,26 +176,56 @@ async def resend_verification_code(
 
 @router.post("/refresh", response_model=Token)
 async def refresh_token(
+    request: Request,
     refresh_request: RefreshTokenRequest,
     auth_service: AuthService = Depends(get_auth_service),
 ):
     tokens = await auth_service.refresh_tokens(refresh_request.refresh_token)
+    auth_event_recorder.record(
+        AuthEvent.EVENT_REFRESH,
+        AuthEvent.OUTCOME_SUCCESS if tokens else AuthEvent.OUTCOME_FAILURE,
+        user_id=tokens["user_id"] if tokens else None,
+        email=tokens["email"] if tokens else None,
+        request=request,
+    )
     if not tokens:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid refresh token",
         )
 
-    return Token(**tokens)
+    return token_response.response(tokens)
 
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    current_user: UserResponse = Depends(get_current_active_user),
+    principal: AuthPrincipal = Depends(get_current_principal),
+    user_service: UserService = Depends(get_user_service),
 ):
-    return current_user
+    user = await user_service.get_profile(principal.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+    return user_response.response(user)
 
 
-# @router.post("/logout")
-# async def logout():
-#     return {"message": "Successfully logged out"}
+@router.post("/logout", response_model=dict)
+async def logout(
+    request: Request,
+    logout_request: Optional[LogoutRequest] = None,
+    payload: dict = Depends(get_access_token_payload),
+    auth_service: AuthService = Depends(get_auth_service),
+):
+    await auth_service.logout(
+        payload, logout_request.refresh_token if logout_request else None
+    )
+    auth_event_recorder.record(
+        AuthEvent.EVENT_LOGOUT,
+        AuthEvent.OUTCOME_SUCCESS,
+        user_id=int(payload["sub"]) if payload.get("sub") else None,
+        email=payload.get("email"),
+        request=request,
+    )
+    return {"message": "Successfully logged out"}
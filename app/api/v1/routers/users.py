@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+
+from typing import AsyncIterator, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.core.utils.pagination import decode_cursor, encode_cursor
+from app.db.models.user import User
+from app.deps.auth import get_current_superuser
+from app.deps.user import get_user_service
+from app.schemas.user import UserListResponse, UserPage
+from app.services.user import UserService
+
+
+router = APIRouter(
+    prefix="/users",
+    tags=["users"],
+    dependencies=[Depends(get_current_superuser)],
+)
+
+EXPORT_FIELDS = (
+    "id",
+    "email",
+    "username",
+    "is_active",
+    "is_verified",
+    "is_superuser",
+    "created_at",
+)
+
+
+def _export_row(user: User) -> dict:
+    row = {field: getattr(user, field) for field in EXPORT_FIELDS}
+    row["created_at"] = user.created_at.isoformat()
+    return row
+
+
+async def _export_ndjson(users: AsyncIterator[User]) -> AsyncIterator[str]:
+    async for user in users:
+        yield json.dumps(_export_row(user), ensure_ascii=False) + "\n"
+
+
+async def _export_csv(users: AsyncIterator[User]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    async for user in users:
+        writer.writerow(_export_row(user))
+        if buffer.tell() >= 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+@router.get("", response_model=UserPage)
+async def list_users(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    user_service: UserService = Depends(get_user_service),
+):
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+    # One extra row tells whether another page exists, so the last page
+    # comes without a cursor instead of leading to an empty one.
+    users = await user_service.list_users(limit=limit + 1, after=after)
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor(users[-1].created_at, users[-1].id)
+
+    return UserPage(
+        items=[UserListResponse.model_validate(user) for user in users],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/export")
+async def export_users(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    user_service: UserService = Depends(get_user_service),
+):
+    users = user_service.stream_users()
+    if format == "csv":
+        return StreamingResponse(
+            _export_csv(users),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="users.csv"'},
+        )
+    return StreamingResponse(
+        _export_ndjson(users),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="users.ndjson"'},
+    )
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Request, Response, status
+
+from app.core.config import settings
+from app.core.utils.keys import jwks_document
+
+
+router = APIRouter(prefix="/.well-known", tags=["well-known"])
+
+
+@router.get("/jwks.json", include_in_schema=False)
+async def jwks(request: Request):
+    body, etag = jwks_document()
+    headers = {
+        "Cache-Control": (
+            f"public, max-age={settings.jwks_cache_max_age_seconds}, "
+            f"stale-while-revalidate={settings.jwks_stale_while_revalidate_seconds}"
+        ),
+        "ETag": etag,
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,45 @@
+"""Pick argon2 costs for this host from a target verify latency.
+
+    python -m app.cli.calibrate_argon2 --target-ms 250
+    python -m app.cli.calibrate_argon2 --target-ms 150 --max-memory-kib 65536
+
+Prints the settings to put in the environment. Run it on the hardware the
+service is deployed to; existing hashes are upgraded on the next successful
+login, so no password reset is needed.
+"""
+
+import argparse
+import logging
+import sys
+
+from app.core.config import settings
+from app.core.utils.hash_calibration import MIN_MEMORY_COST_KIB, calibrate_argon2
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Calibrate argon2 costs")
+    parser.add_argument(
+        "--target-ms", type=float, default=settings.security_argon2_target_ms
+    )
+    parser.add_argument(
+        "--max-memory-kib", type=int, default=settings.security_argon2_memory_cost
+    )
+    parser.add_argument("--min-memory-kib", type=int, default=MIN_MEMORY_COST_KIB)
+    parser.add_argument(
+        "--parallelism", type=int, default=settings.security_argon2_parallelism
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    (time_cost, memory_cost, parallelism), elapsed_ms = calibrate_argon2(
+        args.target_ms, args.max_memory_kib, args.parallelism, args.min_memory_kib
+    )
+    print(f"# {elapsed_ms:.0f} ms per verify on this host")
+    print(f"SECURITY_ARGON2_TIME_COST={time_cost}")
+    print(f"SECURITY_ARGON2_MEMORY_COST={memory_cost}")
+    print(f"SECURITY_ARGON2_PARALLELISM={parallelism}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
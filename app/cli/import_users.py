@@ -0,0 +1,333 @@
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterator, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import Boolean, Column, Integer, MetaData, String, Table, insert, text
+
+from app.core.config import settings
+from app.core.session import AsyncSessionLocal
+from app.core.utils.email_code import generate_verification_code
+from app.core.utils.security import hash_password, pwd_context
+from app.db.models.outbox import EmailOutbox
+from app.db.models.user import User
+from app.db.repo.bulk import copy_records
+from app.db.repo.code import VerificationCodeRepository
+from app.db.repo.code_store import get_code_store
+from app.schemas.user import UserCreate
+
+
+logger = logging.getLogger(__name__)
+
+
+STAGING_COLUMNS = ("line", "email", "username", "password_hash", "is_active")
+
+staging_table = Table(
+    "tmp_user_import",
+    MetaData(),
+    Column("line", Integer),
+    Column("email", String),
+    Column("username", String(50)),
+    Column("password_hash", String(255)),
+    Column("is_active", Boolean),
+    prefixes=["TEMPORARY"],
+)
+
+INSERT_FROM_STAGING = text(f"""
+    INSERT INTO {User.__tablename__}
+        (email, username, password_hash, is_active, is_verified, is_superuser,
+         token_version)
+    SELECT email, username, password_hash, is_active, is_active, false, 0
+    FROM tmp_user_import
+    ORDER BY line
+    ON CONFLICT (email) DO NOTHING
+    RETURNING id, email
+    """)
+
+
+class ImportRow:
+    __slots__ = ("line", "email", "username", "password", "password_hash")
+
+    def __init__(self, line, email, username, password, password_hash):
+        self.line = line
+        self.email = email
+        self.username = username
+        self.password = password
+        self.password_hash = password_hash
+
+
+class ImportStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.read = 0
+        self.inserted = 0
+        self.conflicts = 0
+        self.invalid = 0
+        self.hash_seconds = 0.0
+        self.load_seconds = 0.0
+
+    def line(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        return (
+            f"read={self.read} inserted={self.inserted} conflicts={self.conflicts} "
+            f"invalid={self.invalid} rate={self.read / elapsed if elapsed else 0:.1f}/s "
+            f"hash={self.hash_seconds:.1f}s load={self.load_seconds:.1f}s"
+        )
+
+
+class RejectReport:
+    def __init__(self, path: Optional[str]):
+        self._file = open(path, "w", newline="", encoding="utf-8") if path else None
+        self._writer = csv.writer(self._file) if self._file else None
+        if self._writer:
+            self._writer.writerow(["line", "email", "reason"])
+
+    def add(self, line: int, email: str, reason: str) -> None:
+        if self._writer:
+            self._writer.writerow([line, email, reason])
+        else:
+            logger.warning(f"line {line}: {email}: {reason}")
+
+    def close(self) -> None:
+        if self._file:
+            self._file.close()
+
+
+def read_records(path: str, fmt: str) -> Iterator[tuple[int, Any]]:
+    # Yields CSV rows as dicts and JSONL lines undecoded; decode_record turns
+    # them into dicts so a bad line is rejected on its own.
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            # Header is line 1, so the first record is line 2.
+            for line, record in enumerate(csv.DictReader(f), start=2):
+                yield line, record
+            return
+        for line, raw in enumerate(f, start=1):
+            if raw.strip():
+                yield line, raw
+
+
+def decode_record(raw: Any) -> dict[str, Any]:
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON: {e.msg}")
+    if not isinstance(raw, dict):
+        raise ValueError("Record is not a JSON object")
+    return raw
+
+
+def parse_record(line: int, record: dict[str, Any]) -> ImportRow:
+    password_hash = record.get("password_hash") or None
+    if password_hash is not None and not isinstance(password_hash, str):
+        raise ValueError("password_hash must be a string")
+    password_hash = (password_hash or "").strip() or None
+    if password_hash is not None:
+        if pwd_context.identify(password_hash) is None:
+            raise ValueError("Unsupported password_hash format")
+        # Validate the remaining fields with a placeholder password.
+        user = UserCreate(
+            email=record.get("email"),
+            username=record.get("username"),
+            password="x" * 8,
+        )
+        return ImportRow(line, user.email, user.username, None, password_hash)
+
+    user = UserCreate(
+        email=record.get("email"),
+        username=record.get("username"),
+        password=record.get("password") or "",
+    )
+    return ImportRow(line, user.email, user.username, user.password, None)
+
+
+def batched_rows(
+    path: str, fmt: str, batch_size: int, stats: ImportStats, report: RejectReport
+) -> Iterator[list[ImportRow]]:
+    batch: list[ImportRow] = []
+    for line, raw in read_records(path, fmt):
+        stats.read += 1
+        record: dict[str, Any] = {}
+        try:
+            record = decode_record(raw)
+            batch.append(parse_record(line, record))
+        except (ValidationError, ValueError) as e:
+            stats.invalid += 1
+            reason = e.errors()[0]["msg"] if isinstance(e, ValidationError) else str(e)
+            report.add(line, str(record.get("email") or ""), reason)
+            continue
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def hash_batch(executor: ProcessPoolExecutor, batch: list[ImportRow]) -> float:
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    pending = [row for row in batch if row.password_hash is None]
+    hashes = await asyncio.gather(
+        *(
+            loop.run_in_executor(executor, hash_password, row.password)
+            for row in pending
+        )
+    )
+    for row, password_hash in zip(pending, hashes):
+        row.password_hash = password_hash
+        row.password = None
+    return time.perf_counter() - started
+
+
+async def load_batch(
+    batch: list[ImportRow], activate: bool, send_verification: bool
+) -> list[tuple[int, str]]:
+    async with AsyncSessionLocal() as session:
+        connection = await session.connection()
+        await connection.run_sync(staging_table.create)
+        await copy_records(
+            session,
+            staging_table,
+            STAGING_COLUMNS,
+            (
+                (row.line, row.email, row.username, row.password_hash, activate)
+                for row in batch
+            ),
+        )
+        inserted = (await session.execute(INSERT_FROM_STAGING)).all()
+        await connection.run_sync(staging_table.drop)
+
+        if send_verification and inserted:
+            codes = {user_id: generate_verification_code() for user_id, _ in inserted}
+            await VerificationCodeRepository(
+                session, store=get_code_store()
+            ).issue_many(codes, settings.verification_code_ttl_minutes * 60)
+            await session.execute(
+                insert(EmailOutbox),
+                [
+                    {
+                        "recipient": email,
+                        "kind": EmailOutbox.KIND_VERIFICATION,
+                        "payload": {"code": codes[user_id]},
+                        "status": EmailOutbox.STATUS_PENDING,
+                        "attempts": 0,
+                    }
+                    for user_id, email in inserted
+                ],
+            )
+
+        await session.commit()
+    return inserted
+
+
+async def run(args: argparse.Namespace) -> ImportStats:
+    stats = ImportStats()
+    report = RejectReport(args.report)
+    executor = ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+    send_verification = args.send_verification and not args.activate
+    pending_load: Optional[asyncio.Task] = None
+    pending_batch: list[ImportRow] = []
+
+    async def finish_load() -> None:
+        inserted = await pending_load
+        inserted_emails = {email for _, email in inserted}
+        stats.inserted += len(inserted)
+        seen = set()
+        for row in pending_batch:
+            if row.email in inserted_emails and row.email not in seen:
+                seen.add(row.email)
+                continue
+            stats.conflicts += 1
+            reason = "duplicate in file" if row.email in seen else "email exists"
+            report.add(row.line, row.email, reason)
+        print(stats.line(), file=sys.stderr)
+
+    try:
+        for batch in batched_rows(
+            args.path, args.format, args.batch_size, stats, report
+        ):
+            # Hashing of this batch overlaps with loading of the previous one.
+            stats.hash_seconds += await hash_batch(executor, batch)
+            if pending_load is not None:
+                await finish_load()
+
+            async def timed_load(batch=batch):
+                started = time.perf_counter()
+                try:
+                    return await load_batch(batch, args.activate, send_verification)
+                finally:
+                    stats.load_seconds += time.perf_counter() - started
+
+            pending_load = asyncio.create_task(timed_load())
+            pending_batch = batch
+        if pending_load is not None:
+            await finish_load()
+    finally:
+        if pending_load is not None and not pending_load.done():
+            pending_load.cancel()
+        executor.shutdown(cancel_futures=True)
+        report.close()
+    return stats
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Bulk import users",
+        epilog=(
+            "Each record needs email, username and either password (hashed "
+            "with the configured argon2 parameters) or password_hash (an "
+            "existing argon2/bcrypt hash, stored as is). Existing emails and "
+            "bad records are skipped and listed in the report."
+        ),
+    )
+    parser.add_argument("path", help="CSV (with header) or JSONL file")
+    parser.add_argument("--format", choices=("csv", "jsonl"))
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--activate",
+        action="store_true",
+        help="mark imported users active and verified (no verification email)",
+    )
+    parser.add_argument(
+        "--send-verification",
+        action="store_true",
+        help="issue codes and enqueue verification emails via the outbox",
+    )
+    parser.add_argument("--report", help="write rejected rows to this CSV file")
+    args = parser.parse_args()
+    if args.send_verification and settings.verification_code_store == "memory":
+        # Codes would live in this process only and vanish when it exits.
+        parser.error(
+            "--send-verification needs VERIFICATION_CODE_STORE=sql or redis, "
+            "the memory store does not outlive this command"
+        )
+    if args.send_verification:
+        try:
+            get_code_store()
+        except RuntimeError as e:
+            parser.error(str(e))
+    if args.format is None:
+        args.format = "jsonl" if args.path.endswith((".jsonl", ".ndjson")) else "csv"
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    stats = asyncio.run(run(args))
+    print(f"done: {stats.line()}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWorker(ABC):
+    name = "background-worker"
+
+    def __init__(self, interval: float, stop_timeout: float = 10.0):
+        self.interval = interval
+        self.stop_timeout = stop_timeout
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name=self.name)
+        logger.info(f"{self.name} started")
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=self.stop_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{self.name} did not stop in time, cancelling")
+            self._task.cancel()
+        finally:
+            self._task = None
+        logger.info(f"{self.name} stopped")
+
+    # One unit of work; True when more work is immediately pending.
+    @abstractmethod
+    async def run_once(self) -> bool: ...
+
+    async def on_stop(self) -> None:
+        pass
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                has_more = await self.run_once()
+            except Exception as e:
+                logger.exception(f"{self.name} iteration failed: {e}")
+                has_more = False
+
+            if has_more:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+        try:
+            await self.on_stop()
+        except Exception as e:
+            logger.exception(f"{self.name} shutdown hook failed: {e}")
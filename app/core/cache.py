@@ -0,0 +1,171 @@
+import json
+import logging
+import time
+
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from app.core.config import settings
+from app.core.redis import get_redis, redis_error
+
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._items: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        value, expires_at = item
+        if expires_at <= time.monotonic():
+            del self._items[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None
+    ) -> None:
+        if ttl_seconds is None:
+            ttl_seconds = self.ttl_seconds
+        self._items[key] = (value, time.monotonic() + ttl_seconds)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, *keys: Hashable) -> None:
+        for key in keys:
+            self._items.pop(key, None)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class RedisCache:
+    def __init__(self, prefix: str, ttl_seconds: int):
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        redis = get_redis()
+        if redis is None:
+            return None
+        try:
+            raw = await redis.get(self._key(key))
+        except redis_error() as e:
+            self.errors += 1
+            logger.warning(f"Redis cache get failed: {e}")
+            return None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any) -> None:
+        redis = get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.set(self._key(key), json.dumps(value), ex=self.ttl_seconds)
+        except redis_error() as e:
+            self.errors += 1
+            logger.warning(f"Redis cache set failed: {e}")
+
+    async def delete(self, *keys: str) -> None:
+        redis = get_redis()
+        if redis is None or not keys:
+            return
+        try:
+            await redis.delete(*(self._key(key) for key in keys))
+        except redis_error() as e:
+            self.errors += 1
+            logger.warning(f"Redis cache delete failed: {e}")
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+class TwoTierCache:
+    def __init__(
+        self,
+        prefix: str,
+        max_size: int,
+        ttl_seconds: int,
+        redis_ttl_seconds: int,
+    ):
+        self.local = LRUCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self.remote = RedisCache(prefix=prefix, ttl_seconds=redis_ttl_seconds)
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        value = await self.remote.get(key)
+        if value is not None:
+            self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        self.local.set(key, value)
+        await self.remote.set(key, value)
+
+    async def delete(self, *keys: str) -> None:
+        self.local.delete(*keys)
+        await self.remote.delete(*keys)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {
+            "local": self.local.stats(),
+            "redis": self.remote.stats(),
+        }
+
+
+user_cache = TwoTierCache(
+    prefix="user",
+    max_size=settings.user_cache_max_size,
+    ttl_seconds=settings.user_cache_ttl_seconds,
+    redis_ttl_seconds=settings.user_cache_redis_ttl_seconds,
+)
+
+
+def get_user_cache() -> Optional[TwoTierCache]:
+    if not settings.user_cache_enabled:
+        return None
+    return user_cache
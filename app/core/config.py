@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -5,17 +7,103 @@ class Settings(BaseSettings):
     app_name: str = "FastAPI VolleyPRO"
     debug: bool = True
     environment: str = "development"
+    # Worker processes per instance, as read by uvicorn and gunicorn.
+    WEB_CONCURRENCY: int = 1
 
     # SECURITY
     secret_key: str = ""
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    # Logout and refresh-token reuse detection are only enforced across
+    # workers with TOKEN_REVOCATION_STORE=redis; with "memory" each worker
+    # tracks its own families, so keep this short if you opt into it.
     refresh_token_expire_days: int = 7
 
+    # Directory of <kid>.pem private keys (Ed25519, RSA or P-256). When set,
+    # tokens are signed asymmetrically and published at /.well-known/jwks.json.
+    jwt_keys_dir: str = ""
+    # Empty = the newest published key in jwt_keys_dir, by the not_before of
+    # an optional <kid>.json next to the key, else by the key file's mtime.
+    jwt_signing_kid: str = ""
+    jwt_keys_reload_seconds: float = 30.0
+    jwt_accept_legacy_hs256: bool = True
+    # A new key only starts signing once it is older than both combined, so
+    # no verifier can still be serving a JWKS document without it.
+    jwks_cache_max_age_seconds: int = 300
+    jwks_stale_while_revalidate_seconds: int = 300
+
+    # redis | memory | none; empty = redis when REDIS_ENABLED, else memory.
+    # redis needs REDIS_ENABLED. memory is per process and is refused when
+    # WEB_CONCURRENCY > 1.
+    token_revocation_store: str = ""
+    # When Redis is unreachable: True = treat tokens as not revoked and skip
+    # reuse detection, False = answer 503. Logout always answers 503.
+    token_revocation_fail_open: bool = False
+
+    # 0 disables the verified token cache
+    jwt_verify_cache_size: int = 10000
+    jwt_verify_cache_max_ttl_seconds: int = 300
+
+    auth_claims_only: bool = False
+    auth_token_version_cache_size: int = 10000
+    auth_token_version_ttl_seconds: int = 60
+
     security_bcrypt_rounds: int = 12
     security_argon2_time_cost: int = 2
     security_argon2_memory_cost: int = 102400
     security_argon2_parallelism: int = 2
+    # Benchmark at startup and pick time/memory costs for the target verify
+    # latency; security_argon2_memory_cost is then the upper memory bound.
+    security_argon2_calibrate: bool = False
+    security_argon2_target_ms: int = 250
+    security_rehash_on_login: bool = True
+    # Relative difference in memory x time cost that triggers a rehash.
+    security_rehash_tolerance: float = 0.25
+
+    # 0 = os.cpu_count()
+    security_hash_pool_size: int = 0
+    security_hash_pool_max_queue: int = 64
+    security_hash_timeout_seconds: float = 10.0
+    security_hash_memory_budget_mb: int = 512
+    security_hash_queue_timeout_seconds: float = 2.0
+    security_hash_retry_after_seconds: int = 1
+
+    admin_enabled: bool = True
+
+    # METRICS
+    metrics_enabled: bool = True
+    # Bearer token for /metrics and /internal/*; empty = both are refused.
+    internal_token: str = ""
+    # /internal/pool with live connection pool statistics; needs
+    # internal_token like /metrics
+    internal_endpoints_enabled: bool = False
+
+    # DATABASE POOL (per engine, per worker process)
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_timeout_seconds: float = 30.0
+    # -1 = never recycle
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+    # PgBouncer in transaction mode: no prepared statement caching and
+    # unique statement names.
+    db_pgbouncer: bool = False
+    db_echo: bool = False
+
+    # RATE LIMITING (requests per minute, 0 = unlimited)
+    rate_limit_enabled: bool = True
+    rate_limit_trust_forwarded_for: bool = False
+    # Number of reverse proxies in front of the app; the client address is
+    # taken this many entries from the right of X-Forwarded-For.
+    rate_limit_trusted_proxies: int = 1
+    rate_limit_local_max_keys: int = 100000
+    rate_limit_login_ip_per_minute: int = 30
+    rate_limit_login_email_per_minute: int = 10
+    rate_limit_verify_ip_per_minute: int = 30
+    rate_limit_verify_email_per_minute: int = 10
+    rate_limit_resend_ip_per_minute: int = 10
+    rate_limit_resend_email_per_minute: int = 3
 
     # POSTGRESQL
     POSTGRES_USER: str = "postgres"
@@ -23,6 +111,10 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "fastapi_pay"
     POSTGRES_HOST: str = "localhost"
     POSTGRES_PORT: str = "5432"
+    # Optional streaming replica for read-only repository queries; same
+    # user, password and database as the primary.
+    POSTGRES_REPLICA_HOST: str = ""
+    POSTGRES_REPLICA_PORT: str = ""
 
     # CORS
     cors_origins: list[str] = ["*"]
@@ -35,6 +127,14 @@ class Settings(BaseSettings):
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
+    REDIS_ENABLED: bool = False
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+
+    # USER CACHE
+    user_cache_enabled: bool = True
+    user_cache_max_size: int = 10000
+    user_cache_ttl_seconds: int = 30
+    user_cache_redis_ttl_seconds: int = 300
 
     # EMAIL
     SMTP_HOST: str = ""
@@ -42,6 +142,42 @@ class Settings(BaseSettings):
     SMTP_USER: str = ""
     SMTP_PASSWORD: str = ""
     EMAIL_FROM: str = ""
+    SMTP_TIMEOUT: float = 10.0
+    SMTP_POOL_SIZE: int = 4
+    SMTP_POOL_IDLE_CHECK_SECONDS: float = 30.0
+    SMTP_POOL_MAX_MESSAGES_PER_CONNECTION: int = 100
+
+    # VERIFICATION CODES
+    # sql | redis | memory
+    verification_code_store: str = "sql"
+    verification_code_ttl_minutes: int = 15
+    verification_code_max_attempts: int = 5
+
+    # EMAIL OUTBOX
+    outbox_worker_enabled: bool = True
+    outbox_poll_interval_seconds: float = 5.0
+    outbox_batch_size: int = 50
+    outbox_concurrency: int = 10
+    outbox_lease_seconds: int = 120
+    outbox_max_attempts: int = 8
+    outbox_backoff_base_seconds: int = 5
+    outbox_backoff_max_seconds: int = 900
+    # Sent and failed rows are deleted by the outbox purger after this.
+    outbox_retention_hours: int = 168
+    outbox_purge_enabled: bool = True
+    outbox_purge_interval_seconds: float = 3600.0
+    outbox_purge_batch_size: int = 5000
+
+    # AUTH EVENTS
+    auth_events_enabled: bool = True
+    auth_events_flush_interval_seconds: float = 2.0
+    auth_events_batch_size: int = 500
+    auth_events_max_buffer: int = 20000
+
+    # MAINTENANCE
+    code_sweeper_enabled: bool = True
+    code_sweeper_interval_seconds: float = 600.0
+    code_sweeper_batch_size: int = 5000
 
     WELCOME_EMAIL_SUBJECT: str = "Добро пожаловать в FastAPI VolleyPRO"
 
@@ -49,6 +185,13 @@ class Settings(BaseSettings):
     def async_database_url(self) -> str:
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    @property
+    def async_replica_database_url(self) -> Optional[str]:
+        if not self.POSTGRES_REPLICA_HOST:
+            return None
+        port = self.POSTGRES_REPLICA_PORT or self.POSTGRES_PORT
+        return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_REPLICA_HOST}:{port}/{self.POSTGRES_DB}"
+
     @property
     def sync_database_url(self) -> str:
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
@@ -0,0 +1,279 @@
+import time
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from prometheus_client import Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+
+http_requests_total = Counter(
+    "http_requests_total",
+    "HTTP requests by route and status code",
+    ["method", "route", "status"],
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+db_queries_per_request = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed while serving one request",
+    ["route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+db_time_per_request_seconds = Histogram(
+    "db_time_per_request_seconds",
+    "Time spent in SQL statements while serving one request",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+db_query_duration_seconds = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement latency by statement type",
+    ["operation"],
+    buckets=QUERY_BUCKETS,
+)
+rate_limited_total = Counter(
+    "rate_limited_total",
+    "Requests rejected by the rate limiter",
+    ["scope"],
+)
+password_hash_duration_seconds = Histogram(
+    "password_hash_duration_seconds",
+    "Password hash/verify latency including admission wait",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+email_send_duration_seconds = Histogram(
+    "email_send_duration_seconds",
+    "Email delivery latency by result",
+    ["kind", "result"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+class RequestDBStats:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+_request_db_stats: ContextVar[Optional[RequestDBStats]] = ContextVar(
+    "request_db_stats", default=None
+)
+
+
+@contextmanager
+def observe(histogram: Histogram, **labels: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.labels(**labels).observe(time.perf_counter() - started)
+
+
+def _statement_operation(statement: str) -> str:
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+    if operation in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH"):
+        return operation.lower()
+    return "other"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    db_query_duration_seconds.labels(_statement_operation(statement)).observe(elapsed)
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+
+def _handle_error(exception_context) -> None:
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+def instrument_engine(sync_engine: Engine) -> None:
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class PrometheusMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stats = RequestDBStats()
+        token = _request_db_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_db_stats.reset(token)
+            # The route template keeps label cardinality bounded; unmatched
+            # paths (404 scans) share one label.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            http_requests_total.labels(method, route, str(status_code)).inc()
+            http_request_duration_seconds.labels(method, route).observe(elapsed)
+            db_queries_per_request.labels(route).observe(stats.queries)
+            db_time_per_request_seconds.labels(route).observe(stats.seconds)
+
+
+# stats() keys that only ever grow, besides the *_total ones; everything
+# else (sizes, queue lengths, last-run values) is a point-in-time gauge.
+_COUNTER_KEYS = frozenset(
+    {
+        "hits",
+        "misses",
+        "evictions",
+        "expirations",
+        "errors",
+        "runs",
+        "skipped",
+        "flushed_batches",
+        "failed_batches",
+    }
+)
+
+
+class AppStatsCollector(Collector):
+    def describe(self):
+        # Without describe() the registry calls collect() at registration,
+        # which would build the engine at import time.
+        return []
+
+    def _family(
+        self, name: str, documentation: str, key: str, value: float
+    ) -> GaugeMetricFamily | CounterMetricFamily:
+        if key in _COUNTER_KEYS or key.endswith("_total"):
+            return CounterMetricFamily(name, documentation, value=value)
+        return GaugeMetricFamily(name, documentation, value=value)
+
+    def collect(self):
+        from app.core.cache import get_user_cache
+        from app.core.session import pool_stats
+        from app.core.utils.jwt import get_token_cache_stats
+        from app.core.utils.security import get_hash_stats
+        from app.core.utils.token_version import token_versions
+        from app.services.audit import auth_event_recorder
+        from app.services.maintenance import code_sweeper, outbox_purger
+        from app.services.rehash import password_rehasher
+
+        pools = pool_stats()
+        pool_gauges = (
+            ("size", "db_pool_size", "Configured pool size"),
+            ("checked_out", "db_pool_checked_out", "Connections in use"),
+            ("idle", "db_pool_checked_in", "Idle connections in the pool"),
+            ("overflow", "db_pool_overflow", "Connections opened above pool_size"),
+            ("wait_seconds_max", "db_pool_wait_seconds_max", "Longest checkout wait"),
+        )
+        for key, name, documentation in pool_gauges:
+            family = GaugeMetricFamily(name, documentation, labels=["engine"])
+            for engine, stats in pools.items():
+                family.add_metric([engine], stats[key])
+            yield family
+        pool_counters = (
+            ("checkouts_total", "db_pool_checkouts", "Connection checkouts"),
+            ("timeouts_total", "db_pool_timeouts", "Checkouts that hit pool_timeout"),
+            ("wait_seconds_total", "db_pool_wait_seconds", "Time spent in checkout"),
+        )
+        for key, name, documentation in pool_counters:
+            family = CounterMetricFamily(name, documentation, labels=["engine"])
+            for engine, stats in pools.items():
+                family.add_metric([engine], stats[key])
+            yield family
+
+        for key, value in get_hash_stats().items():
+            yield self._family(
+                f"password_hash_{key}", f"Hash admission controller {key}", key, value
+            )
+
+        user_cache = get_user_cache()
+        if user_cache is not None:
+            for tier, tier_stats in user_cache.stats().items():
+                for key, value in tier_stats.items():
+                    yield self._family(
+                        f"user_cache_{tier}_{key}",
+                        f"User cache {tier} {key}",
+                        key,
+                        value,
+                    )
+
+        for key, value in get_token_cache_stats().items():
+            yield self._family(
+                f"jwt_verify_cache_{key}", f"Verified token cache {key}", key, value
+            )
+
+        for key, value in token_versions.stats().items():
+            yield self._family(
+                f"token_version_cache_{key}", f"Token version cache {key}", key, value
+            )
+
+        for key, value in auth_event_recorder.stats().items():
+            yield self._family(
+                f"auth_events_{key}", f"Auth event recorder {key}", key, value
+            )
+
+        for key, value in code_sweeper.stats().items():
+            yield self._family(
+                f"code_sweeper_{key}", f"Expired code sweeper {key}", key, value
+            )
+
+        for key, value in outbox_purger.stats().items():
+            yield self._family(
+                f"outbox_purger_{key}", f"Outbox purger {key}", key, value
+            )
+
+        for key, value in password_rehasher.stats().items():
+            yield self._family(
+                f"password_rehash_{key}", f"Password rehash on login {key}", key, value
+            )
@@ -0,0 +1,168 @@
+import hashlib
+import logging
+import math
+import time
+
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+from app.core.metrics import rate_limited_total
+from app.core.redis import get_redis, redis_error
+
+
+logger = logging.getLogger(__name__)
+
+
+# Token buckets for every key are checked and charged atomically: a request
+# consumes one token from each bucket only if all of them have one.
+# KEYS = bucket keys; ARGV = capacity, refill per second for each key.
+# Returns {allowed, retry_after_seconds as string}.
+_TOKEN_BUCKET_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local tokens = {}
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2])
+    local data = redis.call('HMGET', key, 'tokens', 'ts')
+    local available = tonumber(data[1]) or capacity
+    local ts = tonumber(data[2]) or now
+    available = math.min(capacity, available + math.max(0, now - ts) * rate)
+    tokens[i] = available
+    if available < 1 then
+        retry_after = math.max(retry_after, (1 - available) / rate)
+    end
+end
+local allowed = retry_after == 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local rate = tonumber(ARGV[i * 2])
+    local available = tokens[i]
+    if allowed then
+        available = available - 1
+    end
+    redis.call('HSET', key, 'tokens', available, 'ts', now)
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+end
+return {allowed and 1 or 0, tostring(retry_after)}
+"""
+
+
+class Limit:
+    def __init__(self, key: str, per_minute: int):
+        self.key = key
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+
+
+class LocalTokenBuckets:
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def hit(self, limits: list[Limit]) -> float:
+        now = time.monotonic()
+        tokens = []
+        retry_after = 0.0
+        for limit in limits:
+            available, ts = self._buckets.get(limit.key, (limit.capacity, now))
+            available = min(limit.capacity, available + (now - ts) * limit.rate)
+            tokens.append(available)
+            if available < 1:
+                retry_after = max(retry_after, (1 - available) / limit.rate)
+
+        for limit, available in zip(limits, tokens):
+            if not retry_after:
+                available -= 1
+            self._buckets[limit.key] = (available, now)
+            self._buckets.move_to_end(limit.key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+class RateLimiter:
+    def __init__(self, prefix: str = "rl"):
+        self.prefix = prefix
+        self.local = LocalTokenBuckets(max_keys=settings.rate_limit_local_max_keys)
+        self._script = None
+
+    async def _hit_redis(self, limits: list[Limit]) -> Optional[float]:
+        redis = get_redis()
+        if redis is None:
+            return None
+        if self._script is None:
+            self._script = redis.register_script(_TOKEN_BUCKET_SCRIPT)
+        args = []
+        for limit in limits:
+            args.extend((limit.capacity, limit.rate))
+        try:
+            allowed, retry_after = await self._script(
+                keys=[f"{self.prefix}:{limit.key}" for limit in limits], args=args
+            )
+        except redis_error() as e:
+            logger.warning(f"Rate limiter falling back to local buckets: {e}")
+            return None
+        return 0.0 if allowed else float(retry_after)
+
+    async def hit(self, limits: list[Limit]) -> float:
+        limits = [limit for limit in limits if limit.capacity > 0]
+        if not limits:
+            return 0.0
+        retry_after = await self._hit_redis(limits)
+        if retry_after is None:
+            retry_after = self.local.hit(limits)
+        return retry_after
+
+
+rate_limiter = RateLimiter()
+
+
+def client_ip(request: Request) -> str:
+    # Each proxy appends the address it received the request from, so only
+    # the entries added by our own proxies can be trusted; everything to the
+    # left of them is whatever the client chose to send.
+    trusted = settings.rate_limit_trusted_proxies
+    if settings.rate_limit_trust_forwarded_for and trusted > 0:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+            if len(hops) >= trusted:
+                return hops[-trusted]
+    return request.client.host if request.client else "unknown"
+
+
+async def _request_email(request: Request) -> Optional[str]:
+    try:
+        body = await request.json()
+    except ValueError:
+        return None
+    email = body.get("email") if isinstance(body, dict) else None
+    if not isinstance(email, str) or not email:
+        return None
+    return hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+
+
+def rate_limit(scope: str, ip_per_minute: int, email_per_minute: int):
+    async def dependency(request: Request) -> None:
+        if not settings.rate_limit_enabled:
+            return
+        limits = [Limit(f"{scope}:ip:{client_ip(request)}", ip_per_minute)]
+        email = await _request_email(request) if email_per_minute > 0 else None
+        if email is not None:
+            limits.append(Limit(f"{scope}:email:{email}", email_per_minute))
+
+        retry_after = await rate_limiter.hit(limits)
+        if retry_after > 0:
+            rate_limited_total.labels(scope).inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    return dependency
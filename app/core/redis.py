@@ -0,0 +1,43 @@
+from typing import TYPE_CHECKING, Optional
+
+from app.core.config import settings
+
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+
+# The redis package is imported on first use: it is only needed when
+# REDIS_ENABLED is set, and importing it is a noticeable part of startup.
+_redis: Optional["Redis"] = None
+
+
+def get_redis() -> Optional["Redis"]:
+    global _redis
+    if not settings.REDIS_ENABLED:
+        return None
+    if _redis is None:
+        from redis.asyncio import Redis
+
+        _redis = Redis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        )
+    return _redis
+
+
+def redis_error() -> type[Exception]:
+    # For `except redis_error():` clauses, which are only evaluated once an
+    # exception is raised, so callers without Redis never import the package.
+    from redis.exceptions import RedisError
+
+    return RedisError
+
+
+async def close_redis() -> None:
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
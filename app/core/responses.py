@@ -0,0 +1,47 @@
+from typing import Any, Generic, TypeVar
+
+import orjson
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class ModelSerializer(Generic[ModelT]):
+    # Renders objects this service built itself (ORM rows, token dicts)
+    # straight to JSON bytes. Routes return the Response, so FastAPI skips
+    # its response_model validate + serialize pass; response_model stays on
+    # the route for the OpenAPI schema. Output is not re-validated: EmailStr
+    # checks alone cost ~10x the dump.
+    def __init__(self, model: type[ModelT]):
+        self.model = model
+        self.fields = tuple(model.model_fields)
+        self.defaults = {
+            name: field.get_default(call_default_factory=True)
+            for name, field in model.model_fields.items()
+            if not field.is_required()
+        }
+        self.adapter = TypeAdapter(model)
+
+    def dump_json(self, obj: Any) -> bytes:
+        if isinstance(obj, dict):
+            # Token dicts hold JSON primitives only, which orjson renders
+            # exactly like pydantic and without building a model.
+            return orjson.dumps(
+                {
+                    field: obj[field] if field in obj else self.defaults[field]
+                    for field in self.fields
+                }
+            )
+        # ORM rows go through the adapter so datetimes keep pydantic's format.
+        values = {field: getattr(obj, field) for field in self.fields}
+        return self.adapter.dump_json(self.model.model_construct(**values))
+
+    def response(self, obj: Any, status_code: int = 200) -> Response:
+        return Response(
+            content=self.dump_json(obj),
+            status_code=status_code,
+            media_type="application/json",
+        )
@@ -1,35 +1,231 @@
-from typing import AsyncGenerator
+import time
+import uuid
 
-from sqlalchemy import create_engine as create_sync_engine
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, AsyncGenerator, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
 
 
-engine = create_async_engine(
-    settings.async_database_url,
-    echo=settings.debug,
-    pool_size=20,
-    max_overflow=40,
-    pool_pre_ping=True,
-)
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Engine
 
-AsyncSessionLocal = sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
-)
+
+# Engines are built on first use so importing the app does not load DB
+# drivers or open pools; the lifespan touches get_engine() at startup.
+_engine: Optional[AsyncEngine] = None
+_replica_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[sessionmaker] = None
+_sync_engine: Optional["Engine"] = None
+_sync_sessionmaker: Optional[sessionmaker] = None
+
+
+# Execution option marking a SELECT that may be served by the replica.
+REPLICA_OK = "replica_ok"
+_PRIMARY_PINNED = "primary_pinned"
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    # Wait time covers queueing for a free connection and, below the
+    # pool_size + max_overflow limit, opening a new one.
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts_total = 0
+        self.timeouts_total = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts_total += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts_total += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            # QueuePool.overflow() is negative until pool_size connections exist.
+            "overflow": max(0, self.overflow()),
+            "checkouts_total": self.checkouts_total,
+            "timeouts_total": self.timeouts_total,
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_max": self.wait_seconds_max,
+            "wait_seconds_avg": (
+                self.wait_seconds_total / self.checkouts_total
+                if self.checkouts_total
+                else 0.0
+            ),
+        }
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4().hex}__"
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    connect_args = {"prepared_statement_cache_size": settings.db_statement_cache_size}
+    if settings.db_pgbouncer:
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+    return create_async_engine(
+        url,
+        echo=settings.db_echo,
+        poolclass=TimedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=connect_args,
+    )
+
+
+def get_engine() -> AsyncEngine:
+    global _engine
+    if _engine is None:
+        _engine = _create_engine(settings.async_database_url)
+    return _engine
+
+
+def get_replica_engine() -> Optional[AsyncEngine]:
+    global _replica_engine
+    url = settings.async_replica_database_url
+    if _replica_engine is None and url is not None:
+        _replica_engine = _create_engine(url)
+    return _replica_engine
+
+
+def pool_stats() -> dict[str, dict[str, float]]:
+    # Only engines that already exist; this never creates one.
+    engines = {"primary": _engine, "replica": _replica_engine}
+    return {
+        name: engine.pool.stats()
+        for name, engine in engines.items()
+        if engine is not None and isinstance(engine.pool, TimedQueuePool)
+    }
 
 
-sync_engine = create_sync_engine(
-    settings.sync_database_url,
-    echo=settings.debug,
+class RoutingSession(Session):
+    # Statements tagged with REPLICA_OK go to the replica until the session
+    # touches the primary; from then on everything stays on the primary, so
+    # a request reads its own writes.
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = get_replica_engine()
+        if (
+            replica is not None
+            and clause is not None
+            and not self._flushing
+            and not self.info.get(_PRIMARY_PINNED)
+            and clause.get_execution_options().get(REPLICA_OK)
+        ):
+            return replica.sync_engine
+        self.info[_PRIMARY_PINNED] = True
+        return get_engine().sync_engine
+
+
+def pin_primary(session: AsyncSession) -> None:
+    # For read-then-write flows that must not start from a lagging replica.
+    session.info[_PRIMARY_PINNED] = True
+
+
+def get_sessionmaker() -> sessionmaker:
+    global _sessionmaker
+    if _sessionmaker is None:
+        _sessionmaker = sessionmaker(
+            get_engine(),
+            class_=AsyncSession,
+            sync_session_class=(
+                RoutingSession if get_replica_engine() is not None else Session
+            ),
+            expire_on_commit=False,
+            autocommit=False,
+            autoflush=False,
+        )
+    return _sessionmaker
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    return get_sessionmaker()()
+
+
+def get_sync_engine() -> "Engine":
+    global _sync_engine
+    if _sync_engine is None:
+        from sqlalchemy import create_engine
+
+        _sync_engine = create_engine(
+            settings.sync_database_url,
+            echo=settings.db_echo,
+        )
+    return _sync_engine
+
+
+async def dispose_engines() -> None:
+    global _engine, _replica_engine, _sessionmaker, _sync_engine, _sync_sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+    if _replica_engine is not None:
+        await _replica_engine.dispose()
+    if _sync_engine is not None:
+        _sync_engine.dispose()
+    _engine = _replica_engine = _sessionmaker = None
+    _sync_engine = _sync_sessionmaker = None
+
+
+class _SessionScope:
+    __slots__ = ("session",)
+
+    def __init__(self):
+        self.session: Optional[AsyncSession] = None
+
+
+_session_scope: ContextVar[Optional[_SessionScope]] = ContextVar(
+    "db_session_scope", default=None
 )
 
 
+def current_session() -> AsyncSession:
+    scope = _session_scope.get()
+    if scope is None:
+        raise RuntimeError("No database session scope is active")
+    if scope.session is None:
+        scope.session = AsyncSessionLocal()
+    return scope.session
+
+
+async def session_scope() -> AsyncGenerator[None, None]:
+    # Request-scoped dependency. The session is only created when a
+    # repository first uses it, so requests answered from caches or token
+    # claims never touch the pool. The scope lives in the request's own
+    # context, so it is not reset here.
+    scope = _SessionScope()
+    _session_scope.set(scope)
+    try:
+        yield
+    finally:
+        if scope.session is not None:
+            await scope.session.close()
+            scope.session = None
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         try:
@@ -39,14 +235,16 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 
 
 def get_sync_db():
+    global _sync_sessionmaker
     from sqlalchemy.orm import Session as SyncSession
 
-    SyncSessionLocal = sessionmaker(
-        sync_engine,
-        class_=SyncSession,
-        expire_on_commit=False,
-    )
-    db = SyncSessionLocal()
+    if _sync_sessionmaker is None:
+        _sync_sessionmaker = sessionmaker(
+            get_sync_engine(),
+            class_=SyncSession,
+            expire_on_commit=False,
+        )
+    db = _sync_sessionmaker()
     try:
         yield db
     finally:
@@ -0,0 +1,60 @@
+import logging
+import statistics
+import time
+
+from passlib.hash import argon2
+
+
+logger = logging.getLogger(__name__)
+
+
+# OWASP minimum for argon2id (19 MiB with t=2).
+MIN_MEMORY_COST_KIB = 19456
+MAX_TIME_COST = 10
+
+_SAMPLE_PASSWORD = "calibration-password"
+
+
+def measure_verify_ms(
+    time_cost: int, memory_cost: int, parallelism: int, rounds: int = 3
+) -> float:
+    handler = argon2.using(
+        time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+    )
+    hashed = handler.hash(_SAMPLE_PASSWORD)
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        handler.verify(_SAMPLE_PASSWORD, hashed)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def calibrate_argon2(
+    target_ms: float,
+    max_memory_cost: int,
+    parallelism: int,
+    min_memory_cost: int = MIN_MEMORY_COST_KIB,
+) -> tuple[tuple[int, int, int], float]:
+    # Memory hardness first: start at the memory ceiling and halve it only
+    # while a single pass is already over target, then spend the remaining
+    # budget on passes. Halving keeps the memory values identical across
+    # hosts of similar speed.
+    memory_cost = max(max_memory_cost, 8 * parallelism)
+    min_memory_cost = min(min_memory_cost, memory_cost)
+    single_pass_ms = measure_verify_ms(1, memory_cost, parallelism)
+    while single_pass_ms > target_ms and memory_cost > min_memory_cost:
+        memory_cost = max(min_memory_cost, memory_cost // 2)
+        single_pass_ms = measure_verify_ms(1, memory_cost, parallelism)
+
+    time_cost = max(1, min(MAX_TIME_COST, int(target_ms // single_pass_ms)))
+    elapsed_ms = measure_verify_ms(time_cost, memory_cost, parallelism)
+    while time_cost > 1 and elapsed_ms > target_ms:
+        time_cost -= 1
+        elapsed_ms = measure_verify_ms(time_cost, memory_cost, parallelism)
+
+    logger.info(
+        f"Calibrated argon2 to t={time_cost} m={memory_cost} p={parallelism}: "
+        f"{elapsed_ms:.0f} ms per verify (target {target_ms:.0f} ms)"
+    )
+    return (time_cost, memory_cost, parallelism), elapsed_ms
@@ -1,9 +1,68 @@
+import hashlib
+import time
+
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 import jwt
 from fastapi import HTTPException, status
 
+from app.core.cache import LRUCache
 from app.core.config import settings
+from app.core.utils.keys import get_keyring
+
+
+# Decoded payloads of recently verified tokens, keyed by sha256(token).
+# Entries live until the token's exp, capped so that removed signing keys
+# stop being honoured within jwt_verify_cache_max_ttl_seconds. Only the
+# signature check is cached: revocation (logout, token_version) is looked up
+# on every request, so logout has nothing to evict here.
+verified_tokens = LRUCache(
+    max_size=settings.jwt_verify_cache_size,
+    ttl_seconds=settings.jwt_verify_cache_max_ttl_seconds,
+)
+
+
+def _token_cache_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def get_token_cache_stats() -> dict[str, float]:
+    stats = verified_tokens.stats()
+    lookups = stats["hits"] + stats["misses"]
+    return {**stats, "hit_ratio": stats["hits"] / lookups if lookups else 0.0}
+
+
+def _encode(payload: dict) -> str:
+    keyring = get_keyring()
+    if keyring is None:
+        return jwt.encode(payload, settings.secret_key, algorithm=settings.algorithm)
+    signing_key = keyring.current()
+    return jwt.encode(
+        payload,
+        signing_key.private_key,
+        algorithm=signing_key.algorithm,
+        headers={"kid": signing_key.kid},
+    )
+
+
+def _decode(token: str) -> dict:
+    keyring = get_keyring()
+    if keyring is None:
+        return jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+
+    kid = jwt.get_unverified_header(token).get("kid")
+    if kid is None:
+        # Tokens issued before the switch to asymmetric keys carry no kid.
+        if not settings.jwt_accept_legacy_hs256 or not settings.secret_key:
+            raise jwt.InvalidTokenError("Missing kid")
+        return jwt.decode(token, settings.secret_key, algorithms=["HS256"])
+
+    signing_key = keyring.get(kid)
+    if signing_key is None:
+        raise jwt.InvalidTokenError("Unknown kid")
+    return jwt.decode(
+        token, signing_key.public_key, algorithms=[signing_key.algorithm]
+    )
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -17,7 +76,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         )
 
     to_encode.update({"exp": expire, "type": "access"})
-    return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+    return _encode(to_encode)
 
 
 def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -31,22 +90,41 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None)
         )
 
     to_encode.update({"exp": expire, "type": "refresh"})
-    return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+    return _encode(to_encode)
+
+
+def _token_expired() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token has expired",
+    )
 
 
 def verify_token(token: str) -> dict:
+    cache_key = None
+    if settings.jwt_verify_cache_size > 0:
+        cache_key = _token_cache_key(token)
+        payload = verified_tokens.get(cache_key)
+        if payload is not None:
+            if payload["exp"] <= time.time():
+                verified_tokens.delete(cache_key)
+                raise _token_expired()
+            return dict(payload)
+
     try:
-        payload = jwt.decode(
-            token, settings.secret_key, algorithms=[settings.algorithm]
-        )
-        return payload
+        payload = _decode(token)
     except jwt.ExpiredSignatureError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has expired",
-        )
+        raise _token_expired()
     except jwt.InvalidTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
         )
+
+    if cache_key is not None and isinstance(payload.get("exp"), (int, float)):
+        ttl_seconds = min(
+            payload["exp"] - time.time(), settings.jwt_verify_cache_max_ttl_seconds
+        )
+        if ttl_seconds > 0:
+            verified_tokens.set(cache_key, dict(payload), ttl_seconds=ttl_seconds)
+    return payload
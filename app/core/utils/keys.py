@@ -0,0 +1,196 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm, RSAAlgorithm
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def jwks_publication_delay_seconds() -> int:
+    # How long a verifier may keep serving a JWKS document it fetched.
+    return (
+        settings.jwks_cache_max_age_seconds
+        + settings.jwks_stale_while_revalidate_seconds
+    )
+
+
+class SigningKey:
+    def __init__(self, kid: str, private_key: Any, not_before: float = 0.0):
+        self.kid = kid
+        self.not_before = not_before
+        self.private_key = private_key
+        self.public_key = private_key.public_key()
+        if isinstance(private_key, ed25519.Ed25519PrivateKey):
+            self.algorithm = "EdDSA"
+            jwk = OKPAlgorithm.to_jwk(self.public_key, as_dict=True)
+        elif isinstance(private_key, rsa.RSAPrivateKey):
+            self.algorithm = "RS256"
+            jwk = RSAAlgorithm.to_jwk(self.public_key, as_dict=True)
+        elif isinstance(private_key, ec.EllipticCurvePrivateKey):
+            self.algorithm = "ES256"
+            jwk = ECAlgorithm.to_jwk(self.public_key, as_dict=True)
+        else:
+            raise ValueError(f"Unsupported key type for kid {kid}")
+        jwk.update({"kid": kid, "use": "sig", "alg": self.algorithm})
+        self.jwk = jwk
+
+
+class KeyRing:
+    def __init__(self, keys_dir: str, signing_kid: str = ""):
+        self.keys_dir = Path(keys_dir)
+        self.signing_kid = signing_kid
+        self.keys: dict[str, SigningKey] = {}
+        self.signing_key: Optional[SigningKey] = None
+        self.jwks_body = b'{"keys":[]}'
+        self.jwks_etag = ""
+        self._mtime_ns = -1
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _directory_mtime_ns(self) -> int:
+        # The directory mtime covers added/removed files, the file mtimes
+        # cover keys and not_before files replaced in place.
+        return max(
+            [self.keys_dir.stat().st_mtime_ns]
+            + [
+                entry.stat().st_mtime_ns
+                for pattern in ("*.pem", "*.json")
+                for entry in self.keys_dir.glob(pattern)
+            ]
+        )
+
+    def _select_signing_key(self) -> SigningKey:
+        if self.signing_kid:
+            if self.signing_kid not in self.keys:
+                raise RuntimeError(
+                    f"Signing key {self.signing_kid} not found in {self.keys_dir}"
+                )
+            return self.keys[self.signing_kid]
+        # A new key is published in the JWKS first and only signs once every
+        # downstream cache of the previous document has expired, including
+        # the stale-while-revalidate window.
+        keys = sorted(self.keys.values(), key=lambda k: k.not_before, reverse=True)
+        for newer, older in zip(keys, keys[1:]):
+            # Secret mounts and image layers often give every file the same
+            # mtime; picking by name could then sign with an unpublished key.
+            if newer.not_before == older.not_before:
+                raise RuntimeError(
+                    f"Signing keys {older.kid} and {newer.kid} have the same "
+                    f"not_before; add a <kid>.json with not_before or set "
+                    f"JWT_SIGNING_KID"
+                )
+        published_before = time.time() - jwks_publication_delay_seconds()
+        for key in keys:
+            if key.not_before <= published_before:
+                return key
+        return keys[-1]
+
+    def _not_before(self, path: Path) -> float:
+        # <kid>.json may carry {"not_before": <unix time or ISO 8601>}; the
+        # key file's mtime is the fallback.
+        meta_path = path.with_suffix(".json")
+        if not meta_path.exists():
+            return path.stat().st_mtime
+        value = json.loads(meta_path.read_text())["not_before"]
+        if isinstance(value, (int, float)):
+            return float(value)
+        moment = datetime.fromisoformat(value)
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return moment.timestamp()
+
+    def load(self) -> None:
+        keys: dict[str, SigningKey] = {}
+        for path in sorted(self.keys_dir.glob("*.pem")):
+            private_key = load_pem_private_key(path.read_bytes(), password=None)
+            keys[path.stem] = SigningKey(
+                path.stem, private_key, not_before=self._not_before(path)
+            )
+        if not keys:
+            raise RuntimeError(f"No *.pem signing keys found in {self.keys_dir}")
+
+        body = json.dumps(
+            {"keys": [keys[kid].jwk for kid in sorted(keys)]},
+            separators=(",", ":"),
+        ).encode()
+        previous = self.keys
+        self.keys = keys
+        try:
+            self.signing_key = self._select_signing_key()
+        except RuntimeError:
+            self.keys = previous
+            raise
+        self.jwks_body = body
+        self.jwks_etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self._mtime_ns = self._directory_mtime_ns()
+        logger.info(
+            f"Loaded {len(keys)} JWT signing keys, signing with {self.signing_key.kid}"
+        )
+
+    def refresh(self) -> None:
+        now = time.monotonic()
+        if (
+            self._mtime_ns >= 0
+            and now - self._checked_at < settings.jwt_keys_reload_seconds
+        ):
+            return
+        with self._lock:
+            if (
+                self._mtime_ns >= 0
+                and now - self._checked_at < settings.jwt_keys_reload_seconds
+            ):
+                return
+            self._checked_at = now
+            try:
+                if self._directory_mtime_ns() != self._mtime_ns:
+                    self.load()
+                    return
+                signing_key = self._select_signing_key()
+                if signing_key is not self.signing_key:
+                    logger.info(f"Rotated JWT signing key to {signing_key.kid}")
+                    self.signing_key = signing_key
+            except Exception as e:
+                if self._mtime_ns < 0:
+                    raise
+                logger.error(
+                    f"Failed to reload JWT signing keys, keeping previous: {e}"
+                )
+
+    def get(self, kid: str) -> Optional[SigningKey]:
+        self.refresh()
+        return self.keys.get(kid)
+
+    def current(self) -> SigningKey:
+        self.refresh()
+        return self.signing_key
+
+
+_keyring: Optional[KeyRing] = None
+
+
+def get_keyring() -> Optional[KeyRing]:
+    global _keyring
+    if not settings.jwt_keys_dir:
+        return None
+    if _keyring is None:
+        _keyring = KeyRing(settings.jwt_keys_dir, settings.jwt_signing_kid)
+    return _keyring
+
+
+def jwks_document() -> tuple[bytes, str]:
+    keyring = get_keyring()
+    if keyring is None:
+        return b'{"keys":[]}', '"empty"'
+    keyring.refresh()
+    return keyring.jwks_body, keyring.jwks_etag
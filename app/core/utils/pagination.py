@@ -0,0 +1,18 @@
+import base64
+import json
+
+from datetime import datetime
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -1,10 +1,20 @@
+import asyncio
 import logging
+import multiprocessing
+import os
+import re
 
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 from passlib.exc import UnknownHashError
 
 from app.core.config import settings
-
+from app.core.metrics import observe, password_hash_duration_seconds
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +30,171 @@ pwd_context = CryptContext(
 )
 
 
+# (time_cost, memory_cost, parallelism) currently used for new argon2 hashes.
+_argon2_params: tuple[int, int, int] = (
+    settings.security_argon2_time_cost,
+    settings.security_argon2_memory_cost,
+    settings.security_argon2_parallelism,
+)
+
+_hash_executor: Optional[ProcessPoolExecutor] = None
+_hash_pool_size: int = 0
+
+_ARGON2_MEMORY_RE = re.compile(r"\$m=(\d+)")
+_ARGON2_HASH_RE = re.compile(r"^\$argon2(id|i|d)\$v=(\d+)\$m=(\d+),t=(\d+),p=(\d+)\$")
+_BCRYPT_MEMORY_COST_KIB = 64
+
+
+def configure_argon2(time_cost: int, memory_cost: int, parallelism: int) -> None:
+    # Also the hash pool initializer, so workers hash with the same costs.
+    # Call before get_hash_executor() in the main process.
+    global _argon2_params
+    pwd_context.update(
+        argon2__time_cost=time_cost,
+        argon2__memory_cost=memory_cost,
+        argon2__parallelism=parallelism,
+    )
+    _argon2_params = (time_cost, memory_cost, parallelism)
+
+
+def get_argon2_params() -> tuple[int, int, int]:
+    return _argon2_params
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    match = _ARGON2_HASH_RE.match(hashed_password)
+    if match is None:
+        try:
+            return pwd_context.needs_update(hashed_password)
+        except (UnknownHashError, ValueError):
+            return False
+    variant, version, memory_cost, time_cost, parallelism = match.groups()
+    current_time_cost, current_memory_cost, current_parallelism = _argon2_params
+    handler = pwd_context.handler("argon2")
+    if (
+        variant != handler.type
+        or int(version) < handler.version
+        or int(parallelism) != current_parallelism
+    ):
+        return True
+    # Compare total cost rather than exact parameters: workers that
+    # calibrated to slightly different values must not keep rehashing
+    # each other's hashes.
+    memory_cost, time_cost = int(memory_cost), int(time_cost)
+    ratio = (memory_cost * time_cost) / (current_memory_cost * current_time_cost)
+    return abs(ratio - 1) > settings.security_rehash_tolerance
+
+
+class HashAdmissionController:
+    def __init__(
+        self,
+        memory_budget_kib: int,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: float,
+    ):
+        self.memory_budget_kib = memory_budget_kib
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self.in_flight = 0
+        self.memory_in_use_kib = 0
+        self.admitted_total = 0
+        self.waited_total = 0
+        self.rejected_total = 0
+        self._waiters: deque[tuple[int, asyncio.Future]] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _fits(self, cost_kib: int) -> bool:
+        if self.in_flight >= self.max_concurrency:
+            return False
+        # A single hash larger than the budget is still admitted when idle.
+        return (
+            self.in_flight == 0
+            or self.memory_in_use_kib + cost_kib <= self.memory_budget_kib
+        )
+
+    def _admit(self, cost_kib: int) -> None:
+        self.in_flight += 1
+        self.memory_in_use_kib += cost_kib
+        self.admitted_total += 1
+
+    def _wake_waiters(self) -> None:
+        while self._waiters and self._fits(self._waiters[0][0]):
+            cost_kib, waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._admit(cost_kib)
+            waiter.set_result(None)
+
+    async def acquire(self, cost_kib: int) -> None:
+        if not self._waiters and self._fits(cost_kib):
+            self._admit(cost_kib)
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.rejected_total += 1
+            logger.warning("Password hashing queue is full, rejecting request")
+            raise _hashing_overloaded()
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (cost_kib, waiter)
+        self._waiters.append(entry)
+        self.waited_total += 1
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                self.release(cost_kib)
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected_total += 1
+                logger.warning("Password hashing queue wait timed out")
+                raise _hashing_overloaded()
+            raise
+
+    def release(self, cost_kib: int) -> None:
+        self.in_flight -= 1
+        self.memory_in_use_kib -= cost_kib
+        self._wake_waiters()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "memory_in_use_kib": self.memory_in_use_kib,
+            "memory_budget_kib": self.memory_budget_kib,
+            "admitted_total": self.admitted_total,
+            "waited_total": self.waited_total,
+            "rejected_total": self.rejected_total,
+        }
+
+
+_hash_admission: Optional[HashAdmissionController] = None
+
+
+def _hashing_overloaded() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server is busy, try again later",
+        headers={"Retry-After": str(settings.security_hash_retry_after_seconds)},
+    )
+
+
+def _hash_memory_cost_kib(hashed_password: Optional[str] = None) -> int:
+    if hashed_password is None:
+        return _argon2_params[1]
+    match = _ARGON2_MEMORY_RE.search(hashed_password)
+    if match:
+        return int(match.group(1))
+    return _BCRYPT_MEMORY_COST_KIB
+
+
 def hash_password(password: str) -> str:
     if not password:
         raise ValueError("Password cannot be empty")
@@ -41,3 +216,113 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     except Exception as e:
         logger.error(f"Error verifying password: {e}")
         return False
+
+
+def get_hash_executor() -> ProcessPoolExecutor:
+    global _hash_executor, _hash_pool_size
+    if _hash_executor is None:
+        _hash_pool_size = settings.security_hash_pool_size or os.cpu_count() or 1
+        _hash_executor = ProcessPoolExecutor(
+            max_workers=_hash_pool_size,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=configure_argon2,
+            initargs=_argon2_params,
+        )
+    return _hash_executor
+
+
+def get_hash_admission() -> HashAdmissionController:
+    global _hash_admission
+    if _hash_admission is None:
+        get_hash_executor()
+        _hash_admission = HashAdmissionController(
+            memory_budget_kib=settings.security_hash_memory_budget_mb * 1024,
+            max_concurrency=_hash_pool_size,
+            max_queue=settings.security_hash_pool_max_queue,
+            queue_timeout=settings.security_hash_queue_timeout_seconds,
+        )
+    return _hash_admission
+
+
+def get_hash_stats() -> dict[str, int]:
+    return get_hash_admission().stats()
+
+
+def shutdown_hash_executor() -> None:
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False, cancel_futures=True)
+        _hash_executor = None
+
+
+def _release_from_pool(
+    loop: asyncio.AbstractEventLoop,
+    admission: HashAdmissionController,
+    cost_kib: int,
+) -> None:
+    # Runs in the executor's management thread.
+    try:
+        loop.call_soon_threadsafe(admission.release, cost_kib)
+    except RuntimeError:
+        # The event loop is closed; there is nobody left to admit.
+        pass
+
+
+def _discard_broken_executor(executor: ProcessPoolExecutor) -> None:
+    global _hash_executor
+    logger.error("Password hashing pool is broken, recreating")
+    if _hash_executor is executor:
+        _hash_executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run_in_hash_pool(
+    cost_kib: int, func: Callable[..., Any], *args: Any
+) -> Any:
+    admission = get_hash_admission()
+    await admission.acquire(cost_kib)
+    loop = asyncio.get_running_loop()
+    executor = get_hash_executor()
+    try:
+        future = executor.submit(func, *args)
+    except BrokenProcessPool:
+        admission.release(cost_kib)
+        _discard_broken_executor(executor)
+        raise _hashing_overloaded()
+    except BaseException:
+        admission.release(cost_kib)
+        raise
+    # The slot is held until the job is actually finished, not just until we
+    # stop waiting: a running job cannot be cancelled and keeps its worker
+    # and its memory until it completes.
+    future.add_done_callback(lambda _: _release_from_pool(loop, admission, cost_kib))
+    try:
+        return await asyncio.wait_for(
+            asyncio.wrap_future(future),
+            timeout=settings.security_hash_timeout_seconds,
+        )
+    except asyncio.TimeoutError:
+        logger.error(f"Password hashing timed out ({func.__name__})")
+        raise _hashing_overloaded()
+    except BrokenProcessPool:
+        _discard_broken_executor(executor)
+        raise _hashing_overloaded()
+
+
+async def hash_password_async(password: str) -> str:
+    if not password:
+        raise ValueError("Password cannot be empty")
+    with observe(password_hash_duration_seconds, operation="hash"):
+        return await _run_in_hash_pool(_hash_memory_cost_kib(), hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    if not plain_password or not hashed_password:
+        return False
+    with observe(password_hash_duration_seconds, operation="verify"):
+        return await _run_in_hash_pool(
+            _hash_memory_cost_kib(hashed_password),
+            verify_password,
+            plain_password,
+            hashed_password,
+        )
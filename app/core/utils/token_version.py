@@ -0,0 +1,10 @@
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+
+# Last known token_version per user id, for claims-only authentication.
+token_versions = LRUCache(
+    max_size=settings.auth_token_version_cache_size,
+    ttl_seconds=settings.auth_token_version_ttl_seconds,
+)
+
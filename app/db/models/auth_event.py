@@ -0,0 +1,65 @@
+from typing import Optional
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import AuditBase
+
+
+class AuthEvent(AuditBase):
+    __tablename__ = "auth_event"
+    __table_args__ = (
+        Index("ix_auth_event_user_id_occurred_at", "user_id", "occurred_at"),
+    )
+
+    EVENT_LOGIN = "login"
+    EVENT_REFRESH = "refresh"
+    EVENT_LOGOUT = "logout"
+
+    OUTCOME_SUCCESS = "success"
+    OUTCOME_FAILURE = "failure"
+
+    # No foreign key: events outlive deleted users and are written in bulk.
+    user_id: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        nullable=True,
+        doc="Пользователь",
+    )
+    email: Mapped[Optional[str]] = mapped_column(
+        String(255),
+        nullable=True,
+        doc="Email из запроса",
+    )
+    event: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        doc="Тип события",
+    )
+    outcome: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        doc="Результат",
+    )
+    ip: Mapped[Optional[str]] = mapped_column(
+        String(45),
+        nullable=True,
+        doc="IP-адрес клиента",
+    )
+    user_agent: Mapped[Optional[str]] = mapped_column(
+        String(255),
+        nullable=True,
+        doc="User-Agent клиента",
+    )
+    occurred_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        doc="Время события",
+    )
+
+    def __repr__(self):
+        return (
+            f"<AuthEvent(id={self.id}, event={self.event}, "
+            f"outcome={self.outcome}, user_id={self.user_id})>"
+        )
@@ -2,7 +2,7 @@ from typing import TYPE_CHECKING
 
 from datetime import datetime
 
-from sqlalchemy import String, DateTime, ForeignKey
+from sqlalchemy import String, DateTime, ForeignKey, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import AuditBase
@@ -27,6 +27,13 @@ class VerificationCode(AuditBase):
         doc="Код подтверждения",
     )
     is_used: Mapped[bool] = mapped_column(default=False, doc="Был ли использован")
+    attempts: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+        doc="Количество неверных попыток",
+    )
     expires_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
@@ -36,7 +43,7 @@ class VerificationCode(AuditBase):
     user: Mapped["User"] = relationship(
         "User",
         back_populates="verification_codes",
-        lazy="joined",
+        lazy="select",
         doc="Пользователь",
     )
 
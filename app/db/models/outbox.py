@@ -0,0 +1,65 @@
+from typing import Any, Optional
+
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, Index, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.db.base import AuditBase
+
+
+class EmailOutbox(AuditBase):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    STATUS_PENDING = "pending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+
+    KIND_VERIFICATION = "verification"
+
+    recipient: Mapped[str] = mapped_column(
+        String(255),
+        nullable=False,
+        doc="Получатель",
+    )
+    kind: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False,
+        doc="Тип письма",
+    )
+    payload: Mapped[Optional[dict[str, Any]]] = mapped_column(
+        JSON,
+        nullable=True,
+        default=dict,
+        doc="Данные для шаблона (очищаются после отправки)",
+    )
+    status: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        default=STATUS_PENDING,
+        doc="Статус доставки",
+    )
+    attempts: Mapped[int] = mapped_column(default=0, doc="Количество попыток")
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        doc="Время следующей попытки",
+    )
+    last_error: Mapped[Optional[str]] = mapped_column(
+        Text,
+        nullable=True,
+        doc="Последняя ошибка",
+    )
+    sent_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        doc="Время отправки",
+    )
+
+    def __repr__(self):
+        return f"<EmailOutbox(id={self.id}, kind={self.kind}, status={self.status})>"
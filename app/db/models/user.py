@@ -1,5 +1,5 @@
 from typing import TYPE_CHECKING
-from sqlalchemy import String
+from sqlalchemy import Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import AuditBase
@@ -11,6 +11,7 @@ if TYPE_CHECKING:
 
 class User(AuditBase):
     __tablename__ = "user_account"
+    __table_args__ = (Index("ix_user_account_created_at_id", "created_at", "id"),)
 
     email: Mapped[str] = mapped_column(
         String,
@@ -32,12 +33,20 @@ class User(AuditBase):
     is_active: Mapped[bool] = mapped_column(default=False, doc="Активный")
     is_superuser: Mapped[bool] = mapped_column(default=False, doc="Администратор")
     is_verified: Mapped[bool] = mapped_column(default=False, doc="Верифицирован")
+    token_version: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+        doc="Версия токенов",
+    )
 
     verification_codes: Mapped[list["VerificationCode"]] = relationship(
         "VerificationCode",
         back_populates="user",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,
+        lazy="select",
         doc="Коды верификации пользователя",
     )
 
@@ -0,0 +1,26 @@
+from typing import Any, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.auth_event import AuthEvent
+from app.db.repo.base import BaseRepository
+from app.db.repo.bulk import copy_records
+
+
+class AuthEventRepository(BaseRepository):
+    COLUMNS = (
+        "user_id",
+        "email",
+        "event",
+        "outcome",
+        "ip",
+        "user_agent",
+        "occurred_at",
+    )
+
+    def __init__(self, db: Optional[AsyncSession] = None):
+        super().__init__(db)
+
+    async def bulk_insert(self, records: Sequence[tuple[Any, ...]]) -> None:
+        await copy_records(self.db, AuthEvent.__table__, self.COLUMNS, records)
+        await self.db.commit()
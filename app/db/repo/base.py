@@ -0,0 +1,18 @@
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.session import current_session
+
+
+class BaseRepository:
+    # Repositories built without a session are stateless and shared; they use
+    # the session of the current request scope (see session_scope).
+    def __init__(self, db: Optional[AsyncSession] = None):
+        self._db = db
+
+    @property
+    def db(self) -> AsyncSession:
+        if self._db is not None:
+            return self._db
+        return current_session()
@@ -0,0 +1,25 @@
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy import Table, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def copy_records(
+    db: AsyncSession,
+    table: Table,
+    columns: Sequence[str],
+    records: Iterable[Sequence[Any]],
+) -> None:
+    connection = await db.connection()
+    if connection.dialect.driver == "asyncpg":
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            table.name,
+            records=records,
+            columns=list(columns),
+            schema_name=table.schema,
+        )
+        return
+    rows = [dict(zip(columns, record)) for record in records]
+    if rows:
+        await db.execute(insert(table), rows)
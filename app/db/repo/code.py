@@ -1,16 +1,45 @@
 from typing import Optional
 
-from datetime import datetime, timezone
-
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, delete, or_
+from sqlalchemy.sql import func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
+from app.core.config import settings
 from app.db.models.code import VerificationCode
+from app.db.repo.base import BaseRepository
+from app.db.repo.code_store import (
+    SqlVerificationCodeStore,
+    VerificationCodeStore,
+    active_code_filter,
+)
+
+
+class VerificationCodeRepository(BaseRepository):
+    def __init__(
+        self,
+        db: Optional[AsyncSession] = None,
+        store: Optional[VerificationCodeStore] = None,
+    ):
+        super().__init__(db)
+        if store is None:
+            store = SqlVerificationCodeStore(settings.verification_code_max_attempts)
+        if db is not None and isinstance(store, SqlVerificationCodeStore):
+            # The SQL store works on this repository's session.
+            store = SqlVerificationCodeStore(store.max_attempts, db)
+        self.store = store
 
+    async def issue(self, user_id: int, code: str, ttl_seconds: int) -> None:
+        await self.store.issue(user_id, code, ttl_seconds)
 
-class VerificationCodeRepository:
-    def __init__(self, db: AsyncSession):
-        self.db = db
+    async def issue_many(self, codes: dict[int, str], ttl_seconds: int) -> None:
+        await self.store.issue_many(codes, ttl_seconds)
+
+    async def get_active_code(self, user_id: int) -> Optional[str]:
+        return await self.store.get_active_code(user_id)
+
+    async def consume(self, user_id: int, code: str) -> bool:
+        return await self.store.consume(user_id, code)
 
     async def create(self, verification_code: VerificationCode) -> VerificationCode:
         self.db.add(verification_code)
@@ -18,8 +47,12 @@ class VerificationCodeRepository:
         await self.db.refresh(verification_code)
         return verification_code
 
-    async def get_by_id(self, code_id: int) -> Optional[VerificationCode]:
+    async def get_by_id(
+        self, code_id: int, with_user: bool = False
+    ) -> Optional[VerificationCode]:
         stmt = select(VerificationCode).where(VerificationCode.id == code_id)
+        if with_user:
+            stmt = stmt.options(joinedload(VerificationCode.user))
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
@@ -32,19 +65,40 @@ class VerificationCodeRepository:
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_active_by_user(self, user_id: int) -> list[VerificationCode]:
+        stmt = (
+            select(VerificationCode)
+            .where(
+                active_code_filter(user_id, settings.verification_code_max_attempts)
+            )
+            .order_by(VerificationCode.expires_at.desc())
+        )
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+
     async def update(self, verification_code: VerificationCode) -> VerificationCode:
         await self.db.commit()
         await self.db.refresh(verification_code)
         return verification_code
 
-    async def delete_expired(self) -> int:
-        stmt = select(VerificationCode).where(
-            VerificationCode.expires_at <= datetime.now(timezone.utc)
+    async def delete_expired(self, batch_size: int = 5000) -> int:
+        expired_ids = (
+            select(VerificationCode.id)
+            .where(
+                or_(
+                    VerificationCode.expires_at <= func.now(),
+                    VerificationCode.is_used.is_(True),
+                )
+            )
+            .order_by(VerificationCode.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            delete(VerificationCode)
+            .where(VerificationCode.id.in_(expired_ids))
+            .execution_options(synchronize_session=False)
         )
         result = await self.db.execute(stmt)
-        expired_codes = result.scalars().all()
-        count = len(expired_codes)
-        for code in expired_codes:
-            await self.db.delete(code)
-        await self.db.commit()
-        return count
+        return result.rowcount
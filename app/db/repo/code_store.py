@@ -0,0 +1,239 @@
+import logging
+import time
+
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+from app.core.redis import get_redis, redis_error
+from app.db.models.code import VerificationCode
+from app.db.repo.base import BaseRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+_CONSUME_SCRIPT = """
+local data = redis.call('HMGET', KEYS[1], 'code', 'attempts')
+if not data[1] then
+    return 0
+end
+if data[1] == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return 1
+end
+local attempts = redis.call('HINCRBY', KEYS[1], 'attempts', 1)
+if attempts >= tonumber(ARGV[2]) then
+    redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _store_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Verification codes are temporarily unavailable, try again later",
+    )
+
+
+class VerificationCodeStore(ABC):
+    @abstractmethod
+    async def issue(self, user_id: int, code: str, ttl_seconds: int) -> None: ...
+
+    @abstractmethod
+    async def get_active_code(self, user_id: int) -> Optional[str]: ...
+
+    @abstractmethod
+    async def consume(self, user_id: int, code: str) -> bool: ...
+
+    async def issue_many(self, codes: dict[int, str], ttl_seconds: int) -> None:
+        for user_id, code in codes.items():
+            await self.issue(user_id, code, ttl_seconds)
+
+
+def active_code_filter(user_id: int, max_attempts: int) -> ColumnElement[bool]:
+    return and_(
+        VerificationCode.user_id == user_id,
+        VerificationCode.is_used.is_(False),
+        VerificationCode.expires_at > datetime.now(timezone.utc),
+        VerificationCode.attempts < max_attempts,
+    )
+
+
+class SqlVerificationCodeStore(BaseRepository, VerificationCodeStore):
+    # Codes live in verification_code. Issuing is left to the caller's
+    # transaction; consume commits, like the single Redis call it mirrors.
+    def __init__(self, max_attempts: int, db: Optional[AsyncSession] = None):
+        super().__init__(db)
+        self.max_attempts = max_attempts
+
+    def _values(self, user_id: int, code: str, ttl_seconds: int) -> dict:
+        return {
+            "user_id": user_id,
+            "code": code,
+            "is_used": False,
+            "expires_at": datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds),
+        }
+
+    async def issue(self, user_id: int, code: str, ttl_seconds: int) -> None:
+        await self.db.execute(
+            insert(VerificationCode).values(**self._values(user_id, code, ttl_seconds))
+        )
+
+    async def issue_many(self, codes: dict[int, str], ttl_seconds: int) -> None:
+        if codes:
+            await self.db.execute(
+                insert(VerificationCode),
+                [
+                    self._values(user_id, code, ttl_seconds)
+                    for user_id, code in codes.items()
+                ],
+            )
+
+    async def get_active_code(self, user_id: int) -> Optional[str]:
+        result = await self.db.execute(
+            select(VerificationCode.code)
+            .where(active_code_filter(user_id, self.max_attempts))
+            .order_by(VerificationCode.expires_at.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def consume(self, user_id: int, code: str) -> bool:
+        active = active_code_filter(user_id, self.max_attempts)
+        stmt = (
+            update(VerificationCode)
+            .where(and_(active, VerificationCode.code == code))
+            .values(is_used=True)
+            .returning(VerificationCode.id)
+        )
+        result = await self.db.execute(stmt)
+        consumed = result.first() is not None
+        if not consumed:
+            # Same limit as the Redis store: a wrong guess counts against the
+            # user's active codes, which stop matching at max attempts.
+            await self.db.execute(
+                update(VerificationCode)
+                .where(active)
+                .values(attempts=VerificationCode.attempts + 1)
+                .execution_options(synchronize_session=False)
+            )
+        await self.db.commit()
+        return consumed
+
+
+class InMemoryVerificationCodeStore(VerificationCodeStore):
+    def __init__(self, max_attempts: int):
+        self.max_attempts = max_attempts
+        self._codes: dict[int, tuple[str, float, int]] = {}
+
+    def _get(self, user_id: int) -> Optional[tuple[str, float, int]]:
+        item = self._codes.get(user_id)
+        if item is not None and item[1] <= time.monotonic():
+            del self._codes[user_id]
+            return None
+        return item
+
+    async def issue(self, user_id: int, code: str, ttl_seconds: int) -> None:
+        self._codes[user_id] = (code, time.monotonic() + ttl_seconds, 0)
+
+    async def get_active_code(self, user_id: int) -> Optional[str]:
+        item = self._get(user_id)
+        return item[0] if item else None
+
+    async def consume(self, user_id: int, code: str) -> bool:
+        item = self._get(user_id)
+        if item is None:
+            return False
+        stored_code, expires_at, attempts = item
+        if stored_code == code:
+            del self._codes[user_id]
+            return True
+        attempts += 1
+        if attempts >= self.max_attempts:
+            del self._codes[user_id]
+        else:
+            self._codes[user_id] = (stored_code, expires_at, attempts)
+        return False
+
+
+class RedisVerificationCodeStore(VerificationCodeStore):
+    def __init__(self, max_attempts: int, prefix: str = "vcode"):
+        self.max_attempts = max_attempts
+        self.prefix = prefix
+
+    def _key(self, user_id: int) -> str:
+        return f"{self.prefix}:{user_id}"
+
+    # Codes only live in Redis, so there is nothing to fall back to: an
+    # outage is reported as 503 instead of surfacing as a 500.
+    async def issue(self, user_id: int, code: str, ttl_seconds: int) -> None:
+        redis = get_redis()
+        key = self._key(user_id)
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.hset(key, mapping={"code": code, "attempts": 0})
+                pipe.expire(key, ttl_seconds)
+                await pipe.execute()
+        except redis_error() as e:
+            logger.warning(f"Could not store verification code of user {user_id}: {e}")
+            raise _store_unavailable()
+
+    async def get_active_code(self, user_id: int) -> Optional[str]:
+        redis = get_redis()
+        try:
+            return await redis.hget(self._key(user_id), "code")
+        except redis_error() as e:
+            logger.warning(f"Could not read verification code of user {user_id}: {e}")
+            raise _store_unavailable()
+
+    async def consume(self, user_id: int, code: str) -> bool:
+        redis = get_redis()
+        try:
+            result = await redis.eval(
+                _CONSUME_SCRIPT, 1, self._key(user_id), code, self.max_attempts
+            )
+        except redis_error() as e:
+            logger.warning(f"Could not check verification code of user {user_id}: {e}")
+            raise _store_unavailable()
+        return bool(result)
+
+
+_code_store: Optional[VerificationCodeStore] = None
+_code_store_resolved = False
+
+
+def get_code_store() -> VerificationCodeStore:
+    global _code_store, _code_store_resolved
+    if _code_store_resolved:
+        return _code_store
+
+    backend = settings.verification_code_store
+    max_attempts = settings.verification_code_max_attempts
+    if backend == "sql":
+        _code_store = SqlVerificationCodeStore(max_attempts)
+    elif backend == "redis":
+        if not settings.REDIS_ENABLED:
+            raise RuntimeError(
+                "VERIFICATION_CODE_STORE=redis requires REDIS_ENABLED=True"
+            )
+        _code_store = RedisVerificationCodeStore(max_attempts)
+    elif backend == "memory":
+        if settings.WEB_CONCURRENCY > 1:
+            raise RuntimeError(
+                "VERIFICATION_CODE_STORE=memory is per process and cannot be "
+                "used with WEB_CONCURRENCY > 1; use sql or redis"
+            )
+        _code_store = InMemoryVerificationCodeStore(max_attempts)
+    else:
+        raise RuntimeError(f"Unknown VERIFICATION_CODE_STORE {backend!r}")
+    _code_store_resolved = True
+    return _code_store
@@ -0,0 +1,108 @@
+from typing import Any, Optional
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, insert, null, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.outbox import EmailOutbox
+from app.db.repo.base import BaseRepository
+
+
+class EmailOutboxRepository(BaseRepository):
+    def __init__(self, db: Optional[AsyncSession] = None):
+        super().__init__(db)
+
+    async def enqueue(self, recipient: str, kind: str, payload: dict[str, Any]) -> None:
+        stmt = insert(EmailOutbox).values(
+            recipient=recipient,
+            kind=kind,
+            payload=payload,
+            status=EmailOutbox.STATUS_PENDING,
+            attempts=0,
+        )
+        await self.db.execute(stmt)
+
+    async def claim_batch(self, limit: int, lease_seconds: int) -> list[EmailOutbox]:
+        # Same clock as the retry times written by mark_failed.
+        now = datetime.now(timezone.utc)
+        due_ids = (
+            select(EmailOutbox.id)
+            .where(
+                EmailOutbox.status == EmailOutbox.STATUS_PENDING,
+                EmailOutbox.next_attempt_at <= now,
+            )
+            .order_by(EmailOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(due_ids))
+            .values(
+                attempts=EmailOutbox.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=lease_seconds),
+            )
+            .returning(EmailOutbox)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        messages = list(result.scalars().all())
+        await self.db.commit()
+        return messages
+
+    async def mark_sent(self, message_id: int) -> None:
+        stmt = (
+            update(EmailOutbox)
+            .where(EmailOutbox.id == message_id)
+            .values(
+                status=EmailOutbox.STATUS_SENT,
+                sent_at=datetime.now(timezone.utc),
+                last_error=None,
+                # The payload holds the verification code; it is not needed
+                # once the mail is out.
+                payload=null(),
+            )
+        )
+        await self.db.execute(stmt)
+
+    async def mark_failed(
+        self,
+        message_id: int,
+        error: str,
+        retry_at: Optional[datetime],
+    ) -> None:
+        values: dict[str, Any] = {"last_error": error}
+        if retry_at is None:
+            values["status"] = EmailOutbox.STATUS_FAILED
+            values["payload"] = null()
+        else:
+            values["next_attempt_at"] = retry_at
+        stmt = update(EmailOutbox).where(EmailOutbox.id == message_id).values(**values)
+        await self.db.execute(stmt)
+
+    async def delete_finished(self, older_than: datetime, batch_size: int) -> int:
+        finished_ids = (
+            select(EmailOutbox.id)
+            .where(
+                EmailOutbox.status.in_(
+                    (EmailOutbox.STATUS_SENT, EmailOutbox.STATUS_FAILED)
+                ),
+                EmailOutbox.updated_at < older_than,
+            )
+            .order_by(EmailOutbox.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            delete(EmailOutbox)
+            .where(EmailOutbox.id.in_(finished_ids))
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        return result.rowcount
+
+    async def commit(self) -> None:
+        await self.db.commit()
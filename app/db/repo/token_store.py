@@ -0,0 +1,222 @@
+import logging
+import time
+
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.redis import get_redis, redis_error
+
+
+logger = logging.getLogger(__name__)
+
+
+FAMILY_REVOKED = "revoked"
+
+# KEYS[1] = family key; ARGV = presented jti, new jti, ttl seconds.
+# An unknown family (issued before tracking, or expired) is adopted.
+_ROTATE_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if (not current) or current == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+    return 1
+end
+if current ~= 'revoked' then
+    redis.call('SET', KEYS[1], 'revoked', 'EX', ARGV[3])
+end
+return 0
+"""
+
+
+def _store_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Token revocation is temporarily unavailable, try again later",
+    )
+
+
+class TokenRevocationStore(ABC):
+    @abstractmethod
+    async def start_family(self, family: str, jti: str, ttl_seconds: int) -> None: ...
+
+    @abstractmethod
+    async def rotate(
+        self, family: str, jti: str, new_jti: str, ttl_seconds: int
+    ) -> bool: ...
+
+    @abstractmethod
+    async def revoke(
+        self, jti: Optional[str], family: Optional[str], ttl_seconds: int
+    ) -> None: ...
+
+    @abstractmethod
+    async def is_revoked(self, jti: Optional[str], family: Optional[str]) -> bool: ...
+
+
+class InMemoryTokenRevocationStore(TokenRevocationStore):
+    def __init__(self, prune_threshold: int = 10000):
+        self._families: dict[str, tuple[str, float]] = {}
+        self._revoked: dict[str, float] = {}
+        self._prune_threshold = prune_threshold
+
+    def _prune(self) -> None:
+        if len(self._families) + len(self._revoked) < self._prune_threshold:
+            return
+        now = time.monotonic()
+        self._families = {k: v for k, v in self._families.items() if v[1] > now}
+        self._revoked = {k: v for k, v in self._revoked.items() if v > now}
+        self._prune_threshold = max(
+            self._prune_threshold, 2 * (len(self._families) + len(self._revoked))
+        )
+
+    def _get(self, items: dict, key: Optional[str]):
+        if key is None:
+            return None
+        item = items.get(key)
+        if item is None:
+            return None
+        expires_at = item[1] if isinstance(item, tuple) else item
+        if expires_at <= time.monotonic():
+            del items[key]
+            return None
+        return item
+
+    async def start_family(self, family: str, jti: str, ttl_seconds: int) -> None:
+        self._prune()
+        self._families[family] = (jti, time.monotonic() + ttl_seconds)
+
+    async def rotate(
+        self, family: str, jti: str, new_jti: str, ttl_seconds: int
+    ) -> bool:
+        item = self._get(self._families, family)
+        expires_at = time.monotonic() + ttl_seconds
+        if item is None or item[0] == jti:
+            self._families[family] = (new_jti, expires_at)
+            return True
+        self._families[family] = (FAMILY_REVOKED, expires_at)
+        return False
+
+    async def revoke(
+        self, jti: Optional[str], family: Optional[str], ttl_seconds: int
+    ) -> None:
+        self._prune()
+        expires_at = time.monotonic() + ttl_seconds
+        if jti is not None:
+            self._revoked[jti] = expires_at
+        if family is not None:
+            self._families[family] = (FAMILY_REVOKED, expires_at)
+
+    async def is_revoked(self, jti: Optional[str], family: Optional[str]) -> bool:
+        if self._get(self._revoked, jti) is not None:
+            return True
+        item = self._get(self._families, family)
+        return item is not None and item[0] == FAMILY_REVOKED
+
+
+class RedisTokenRevocationStore(TokenRevocationStore):
+    def __init__(self, prefix: str = "rt", fail_open: bool = False):
+        self.prefix = prefix
+        self.fail_open = fail_open
+
+    def _family_key(self, family: str) -> str:
+        return f"{self.prefix}:fam:{family}"
+
+    def _jti_key(self, jti: str) -> str:
+        return f"{self.prefix}:jti:{jti}"
+
+    def _check_failed(self, operation: str, e: Exception) -> None:
+        if not self.fail_open:
+            logger.warning(f"Token store {operation} failed: {e}")
+            raise _store_unavailable()
+        logger.warning(f"Token store {operation} failed, failing open: {e}")
+
+    async def start_family(self, family: str, jti: str, ttl_seconds: int) -> None:
+        try:
+            await get_redis().set(self._family_key(family), jti, ex=ttl_seconds)
+        except redis_error() as e:
+            # An untracked family is adopted by its first rotation.
+            self._check_failed("start_family", e)
+
+    async def rotate(
+        self, family: str, jti: str, new_jti: str, ttl_seconds: int
+    ) -> bool:
+        try:
+            result = await get_redis().eval(
+                _ROTATE_SCRIPT, 1, self._family_key(family), jti, new_jti, ttl_seconds
+            )
+        except redis_error() as e:
+            self._check_failed("rotate", e)
+            return True
+        return bool(result)
+
+    async def revoke(
+        self, jti: Optional[str], family: Optional[str], ttl_seconds: int
+    ) -> None:
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                if jti is not None:
+                    pipe.set(self._jti_key(jti), 1, ex=ttl_seconds)
+                if family is not None:
+                    pipe.set(self._family_key(family), FAMILY_REVOKED, ex=ttl_seconds)
+                await pipe.execute()
+        except redis_error() as e:
+            # A logout that was not recorded must not look successful.
+            logger.warning(f"Token store revoke failed: {e}")
+            raise _store_unavailable()
+
+    async def is_revoked(self, jti: Optional[str], family: Optional[str]) -> bool:
+        keys = []
+        if jti is not None:
+            keys.append(self._jti_key(jti))
+        if family is not None:
+            keys.append(self._family_key(family))
+        if not keys:
+            return False
+        try:
+            values = await get_redis().mget(keys)
+        except redis_error() as e:
+            self._check_failed("is_revoked", e)
+            return False
+        if jti is not None and values[0] is not None:
+            return True
+        return family is not None and values[-1] == FAMILY_REVOKED
+
+
+_token_store: Optional[TokenRevocationStore] = None
+_token_store_resolved = False
+
+
+def get_token_store() -> Optional[TokenRevocationStore]:
+    global _token_store, _token_store_resolved
+    if _token_store_resolved:
+        return _token_store
+
+    backend = settings.token_revocation_store or (
+        "redis" if settings.REDIS_ENABLED else "memory"
+    )
+    if backend == "redis":
+        if not settings.REDIS_ENABLED:
+            raise RuntimeError(
+                "TOKEN_REVOCATION_STORE=redis requires REDIS_ENABLED=True"
+            )
+        _token_store = RedisTokenRevocationStore(
+            fail_open=settings.token_revocation_fail_open
+        )
+    elif backend == "memory":
+        if settings.WEB_CONCURRENCY > 1:
+            raise RuntimeError(
+                "TOKEN_REVOCATION_STORE=memory is per process and cannot be "
+                "used with WEB_CONCURRENCY > 1; use redis"
+            )
+        logger.warning(
+            "TOKEN_REVOCATION_STORE=memory: logout and refresh token reuse "
+            "detection only apply within this process. Use redis for any "
+            "deployment with more than one worker or instance."
+        )
+        _token_store = InMemoryTokenRevocationStore()
+    elif backend != "none":
+        raise RuntimeError(f"Unknown TOKEN_REVOCATION_STORE {backend!r}")
+    _token_store_resolved = True
+    return _token_store
@@ -1,30 +1,212 @@
-from typing import Optional
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional
 
-from sqlalchemy import select
+from sqlalchemy import inspect, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.cache import TwoTierCache
+from app.core.session import REPLICA_OK, pin_primary
 from app.db.models.user import User
+from app.db.repo.base import BaseRepository
 
 
-class UserRepository:
-    def __init__(self, db: AsyncSession):
-        self.db = db
+_CACHED_COLUMNS = (
+    "id",
+    "email",
+    "username",
+    "is_active",
+    "is_superuser",
+    "is_verified",
+    "token_version",
+    "created_at",
+    "updated_at",
+)
+_DATETIME_COLUMNS = ("created_at", "updated_at")
+# password_hash is never cached: credential material stays out of Redis and
+# is read with a narrow select when a login needs it.
 
-    async def get_by_id(self, user_id: int) -> Optional[User]:
-        stmt = select(User).where(User.id == user_id)
+
+def _id_key(user_id: int) -> str:
+    return f"id:{user_id}"
+
+
+def _email_key(email: str) -> str:
+    return f"email:{email}"
+
+
+def _dump_user(user: User) -> dict[str, Any]:
+    data = {column: getattr(user, column) for column in _CACHED_COLUMNS}
+    for column in _DATETIME_COLUMNS:
+        data[column] = data[column].isoformat()
+    return data
+
+
+def _build_user(data: dict[str, Any]) -> User:
+    values = {column: data[column] for column in _CACHED_COLUMNS}
+    for column in _DATETIME_COLUMNS:
+        values[column] = datetime.fromisoformat(values[column])
+    return User(**values)
+
+
+class UserRepository(BaseRepository):
+    def __init__(
+        self,
+        db: Optional[AsyncSession] = None,
+        cache: Optional[TwoTierCache] = None,
+    ):
+        super().__init__(db)
+        self.cache = cache
+
+    def use_primary(self) -> None:
+        pin_primary(self.db)
+
+    async def _load_cached(self, data: dict[str, Any]) -> User:
+        user = _build_user(data)
+        make_transient_to_detached(user)
+        return await self.db.merge(user, load=False)
+
+    async def get_cached(self, user_id: int) -> Optional[User]:
+        # A transient copy for read-only use; never touches the session.
+        if self.cache is None:
+            return None
+        data = await self.cache.get(_id_key(user_id))
+        if data is None:
+            return None
+        return _build_user(data)
+
+    async def _store(self, user: Optional[User]) -> None:
+        if self.cache is None or user is None:
+            return
+        await self.cache.set(_id_key(user.id), _dump_user(user))
+        await self.cache.set(_email_key(user.email), user.id)
+
+    async def _invalidate(self, user_id: int, email: Optional[str] = None) -> None:
+        if self.cache is None:
+            return
+        keys = [_id_key(user_id)]
+        if email is not None:
+            keys.append(_email_key(email))
+        await self.cache.delete(*keys)
+
+    async def get_by_id(
+        self, user_id: int, with_codes: bool = False, fresh: bool = False
+    ) -> Optional[User]:
+        # fresh=True skips the cache read, for decisions that must not be
+        # made on a row another worker has since changed.
+        if with_codes:
+            stmt = (
+                select(User)
+                .where(User.id == user_id)
+                .options(selectinload(User.verification_codes))
+            )
+            result = await self.db.execute(stmt)
+            return result.scalar_one_or_none()
+
+        if self.cache is not None and not fresh:
+            data = await self.cache.get(_id_key(user_id))
+            if data is not None:
+                return await self._load_cached(data)
+
+        stmt = (
+            select(User)
+            .where(User.id == user_id)
+            .execution_options(**{REPLICA_OK: True})
+        )
         result = await self.db.execute(stmt)
-        return result.scalar_one_or_none()
+        user = result.scalar_one_or_none()
+        await self._store(user)
+        return user
+
+    async def email_exists(self, email: str) -> bool:
+        # Straight from the primary: a cached or replicated row may belong to
+        # a user another worker has just deleted.
+        result = await self.db.execute(
+            select(User.id).where(User.email == email).limit(1)
+        )
+        return result.first() is not None
 
     async def get_by_email(self, email: str) -> Optional[User]:
-        stmt = select(User).where(User.email == email)
+        if self.cache is not None:
+            user_id = await self.cache.get(_email_key(email))
+            if user_id is not None:
+                data = await self.cache.get(_id_key(user_id))
+                if data is not None and data["email"] == email:
+                    return await self._load_cached(data)
+
+        stmt = (
+            select(User)
+            .where(User.email == email)
+            .execution_options(**{REPLICA_OK: True})
+        )
         result = await self.db.execute(stmt)
-        return result.scalar_one_or_none()
+        user = result.scalar_one_or_none()
+        await self._store(user)
+        return user
 
-    async def get_all(self, skip: int = 0, limit: int = 100) -> list[User]:
-        stmt = select(User).offset(skip).limit(limit)
+    async def load_credentials(self, user: User) -> Optional[str]:
+        # Returns the password hash. Rows served from the cache carry no hash
+        # and may be stale: the local tier is only invalidated in the worker
+        # that wrote. The hash is read from the primary together with
+        # is_active and token_version, which overwrite the cached values.
+        # None when the user no longer exists.
+        if "password_hash" not in inspect(user).unloaded:
+            return user.password_hash
+        stmt = select(
+            User.password_hash, User.is_active, User.token_version
+        ).where(User.id == user.id)
+        result = await self.db.execute(stmt)
+        row = result.one_or_none()
+        if row is None:
+            await self._invalidate(user.id, user.email)
+            return None
+        if (row.is_active, row.token_version) != (user.is_active, user.token_version):
+            set_committed_value(user, "is_active", row.is_active)
+            set_committed_value(user, "token_version", row.token_version)
+            await self._store(user)
+        return row.password_hash
+
+    async def get_all(
+        self,
+        limit: int = 100,
+        after: Optional[tuple[datetime, int]] = None,
+    ) -> list[User]:
+        stmt = (
+            select(User)
+            .order_by(User.created_at, User.id)
+            .limit(limit)
+            .execution_options(**{REPLICA_OK: True})
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(User.created_at, User.id) > tuple_(*after))
         result = await self.db.execute(stmt)
         return result.scalars().all()
 
+    async def stream_all(self, batch_size: int = 1000) -> AsyncIterator[User]:
+        stmt = (
+            select(User)
+            .order_by(User.created_at, User.id)
+            .execution_options(yield_per=batch_size, **{REPLICA_OK: True})
+        )
+        result = await self.db.stream_scalars(stmt)
+        async for user in result:
+            yield user
+
+    async def insert_if_absent(self, **values: Any) -> Optional[User]:
+        stmt = (
+            insert(User)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def commit(self) -> None:
+        await self.db.commit()
+
     async def create(self, user: User) -> User:
         self.db.add(user)
         await self.db.commit()
@@ -33,13 +215,54 @@ class UserRepository:
 
     async def update(self, user: User) -> User:
         await self.db.commit()
+        await self._invalidate(user.id, user.email)
         await self.db.refresh(user)
+        # Write the fresh row through so readers do not refill the cache
+        # from a replica that has not caught up yet.
+        await self._store(user)
         return user
 
+    async def increment_token_version(self, user_id: int) -> Optional[int]:
+        # Incremented in the database, so concurrent revocations never write
+        # the same version.
+        stmt = (
+            update(User)
+            .where(User.id == user_id)
+            .values(token_version=User.token_version + 1)
+            .returning(User.token_version, User.email)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.execute(stmt)
+        row = result.one_or_none()
+        await self.db.commit()
+        if row is None:
+            return None
+        await self._invalidate(user_id, row.email)
+        return row.token_version
+
+    async def replace_password_hash(
+        self, user_id: int, email: str, old_hash: str, new_hash: str
+    ) -> bool:
+        # Only replaces the hash the caller verified against, so a password
+        # change that happened in the meantime is never overwritten.
+        stmt = (
+            update(User)
+            .where(User.id == user_id, User.password_hash == old_hash)
+            .values(password_hash=new_hash)
+        )
+        result = await self.db.execute(stmt)
+        await self.db.commit()
+        if not result.rowcount:
+            return False
+        await self._invalidate(user_id, email)
+        return True
+
     async def delete(self, user_id: int) -> bool:
         user = await self.get_by_id(user_id)
         if user:
+            email = user.email
             await self.db.delete(user)
             await self.db.commit()
+            await self._invalidate(user_id, email)
             return True
         return False
@@ -1,46 +1,123 @@
-from typing import AsyncGenerator
+from typing import Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
+from app.core.config import settings
+from app.core.session import session_scope
 from app.db.models.user import User
-from app.deps.user import get_user_service
+from app.db.repo.token_store import get_token_store
+from app.deps.user import get_user_service, shared_user_service
+from app.schemas.auth import AuthPrincipal
 from app.services.auth import AuthService
 from app.services.user import UserService
 from app.core.utils.jwt import verify_token
+from app.core.utils.token_version import token_versions
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
+def _get_user_id(payload: dict) -> int:
+    user_id = payload.get("sub")
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token payload",
+        )
+    return int(user_id)
+
+
+async def _ensure_not_revoked(payload: dict) -> None:
+    token_store = get_token_store()
+    if token_store is None:
+        return
+    if await token_store.is_revoked(payload.get("jti"), payload.get("fam")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+        )
+
+
+async def _load_active_user(user_service: UserService, payload: dict) -> User:
+    user = await user_service.get_user(_get_user_id(payload))
+
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user",
+        )
+
+    token_version = payload.get("ver")
+    if token_version is not None and token_version != user.token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+        )
+    token_versions.set(user.id, user.token_version)
+
+    return user
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     user_service: UserService = Depends(get_user_service),
 ) -> User:
     try:
         payload = verify_token(token)
+        await _ensure_not_revoked(payload)
+        return await _load_active_user(user_service, payload)
 
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token payload",
-            )
-        
-        user = await user_service.get_user(int(user_id))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Could not validate credentials: {e}",
+        )
 
-        if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found",
-            )
 
-        if not user.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Inactive user",
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    user_service: UserService = Depends(get_user_service),
+) -> AuthPrincipal:
+    try:
+        payload = verify_token(token)
+        await _ensure_not_revoked(payload)
+        user_id = _get_user_id(payload)
+        token_version = payload.get("ver")
+
+        if (
+            settings.auth_claims_only
+            and payload.get("type") == "access"
+            and isinstance(token_version, int)
+            and payload.get("is_active") is not None
+            and token_versions.get(user_id) == token_version
+        ):
+            if not payload["is_active"]:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Inactive user",
+                )
+            return AuthPrincipal(
+                id=user_id,
+                email=payload.get("email", ""),
+                is_active=True,
+                token_version=token_version,
             )
 
-        return user
+        user = await _load_active_user(user_service, payload)
+        return AuthPrincipal(
+            id=user.id,
+            email=user.email,
+            is_active=user.is_active,
+            token_version=user.token_version,
+        )
 
     except HTTPException:
         raise
@@ -51,13 +128,37 @@ async def get_current_user(
         )
 
 
+async def get_access_token_payload(token: str = Depends(oauth2_scheme)) -> dict:
+    payload = verify_token(token)
+    if payload.get("type") != "access":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token type",
+        )
+    await _ensure_not_revoked(payload)
+    return payload
+
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 
-async def get_auth_service(
-    user_service: UserService = Depends(get_user_service),
-) -> AsyncGenerator[AuthService, None]:
-    yield AuthService(user_service)
+async def get_current_superuser(current_user: User = Depends(get_current_user)):
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+    return current_user
+
+
+_auth_service: Optional[AuthService] = None
+
+
+async def get_auth_service(_: None = Depends(session_scope)) -> AuthService:
+    global _auth_service
+    if _auth_service is None:
+        _auth_service = AuthService(shared_user_service(), get_token_store())
+    return _auth_service
@@ -0,0 +1,29 @@
+import hmac
+
+from typing import Optional
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from app.core.config import settings
+
+
+internal_bearer = HTTPBearer(auto_error=False)
+
+
+async def require_internal_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(internal_bearer),
+) -> None:
+    # Operational endpoints (metrics, pool stats) are for scrapers and
+    # operators only; without a configured token nobody gets in.
+    if (
+        not settings.internal_token
+        or credentials is None
+        or not hmac.compare_digest(
+            credentials.credentials.encode(), settings.internal_token.encode()
+        )
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not allowed",
+        )
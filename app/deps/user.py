@@ -1,28 +1,31 @@
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 
 from fastapi import Depends
 
+from app.core.cache import get_user_cache
+from app.core.session import session_scope
 from app.db.repo.code import VerificationCodeRepository
+from app.db.repo.code_store import get_code_store
+from app.db.repo.outbox import EmailOutboxRepository
 from app.db.repo.user import UserRepository
-from app.core.session import get_db
 from app.services.user import UserService
 
 
-async def get_user_repo(
-    db: AsyncSession = Depends(get_db),
-) -> AsyncGenerator[UserRepository, None]:
-    yield UserRepository(db)
+_user_service: Optional[UserService] = None
 
 
-async def get_verification_code_repo(
-    db: AsyncSession = Depends(get_db),
-) -> AsyncGenerator[VerificationCodeRepository, None]:
-    yield VerificationCodeRepository(db)
+def shared_user_service() -> UserService:
+    # Services and repositories hold no per-request state; the request's
+    # session comes from session_scope, so one instance serves every request.
+    global _user_service
+    if _user_service is None:
+        _user_service = UserService(
+            UserRepository(cache=get_user_cache()),
+            VerificationCodeRepository(store=get_code_store()),
+            EmailOutboxRepository(),
+        )
+    return _user_service
 
 
-async def get_user_service(
-    user_repo: UserRepository = Depends(get_user_repo),
-    code_repo: VerificationCodeRepository = Depends(get_verification_code_repo),
-) -> AsyncGenerator[UserService, None]:
-    yield UserService(user_repo, code_repo)
+async def get_user_service(_: None = Depends(session_scope)) -> UserService:
+    return shared_user_service()
@@ -1,21 +1,104 @@
+import asyncio
 import logging
 
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from typing import Optional
+
+from fastapi import Depends, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from app.admin import setup_admin
 from app.core.config import settings
+from app.core.metrics import AppStatsCollector, PrometheusMiddleware, instrument_engine
+from app.core.redis import close_redis
+from app.core.session import dispose_engines, get_engine, get_replica_engine
+from app.core.utils.keys import get_keyring
+from app.core.utils.hash_calibration import calibrate_argon2
+from app.core.utils.security import (
+    configure_argon2,
+    get_hash_executor,
+    shutdown_hash_executor,
+)
+from app.db.repo.code_store import get_code_store
+from app.db.repo.token_store import get_token_store
+from app.services.audit import auth_event_recorder
+from app.services.email import smtp_pool
+from app.services.maintenance import code_sweeper, outbox_purger
+from app.services.outbox import outbox_worker
 from app.api.v1.routers import api_router
+from app.api.internal import router as internal_router
+from app.api.well_known import router as well_known_router
+from app.deps.internal import require_internal_token
 
 
 logger = logging.getLogger(__name__)
 
 
+class LazyAdminApp:
+    # sqladmin (and its templates/forms stack) is imported and built on the
+    # first /admin request instead of at worker start.
+    def __init__(self):
+        self._app: Optional[ASGIApp] = None
+
+    def _get_app(self) -> ASGIApp:
+        if self._app is None:
+            from starlette.applications import Starlette
+
+            from app.admin import setup_admin
+
+            self._app = setup_admin(Starlette()).admin
+        return self._app
+
+    @property
+    def routes(self):
+        return self._get_app().routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self._get_app()(scope, receive, send)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    engine = get_engine()
+    replica_engine = get_replica_engine()
+    if settings.metrics_enabled:
+        instrument_engine(engine.sync_engine)
+        if replica_engine is not None:
+            instrument_engine(replica_engine.sync_engine)
+    keyring = get_keyring()
+    if keyring is not None:
+        keyring.load()
+    # Resolved here so a misconfigured store stops startup, not a request.
+    get_token_store()
+    get_code_store()
+    if settings.security_argon2_calibrate:
+        params, _ = await asyncio.to_thread(
+            calibrate_argon2,
+            settings.security_argon2_target_ms,
+            settings.security_argon2_memory_cost,
+            settings.security_argon2_parallelism,
+        )
+        configure_argon2(*params)
+    get_hash_executor()
+    if settings.outbox_worker_enabled:
+        outbox_worker.start()
+    if settings.code_sweeper_enabled:
+        code_sweeper.start()
+    if settings.outbox_purge_enabled:
+        outbox_purger.start()
+    if settings.auth_events_enabled:
+        auth_event_recorder.start()
     yield
+    await auth_event_recorder.stop()
+    await code_sweeper.stop()
+    await outbox_purger.stop()
+    await outbox_worker.stop()
+    await smtp_pool.close()
+    shutdown_hash_executor()
+    await close_redis()
+    await dispose_engines()
 
 
 app = FastAPI(
@@ -27,7 +110,8 @@ app = FastAPI(
     redoc_url="/redoc" if settings.debug else None,
     openapi_url="/openapi.json" if settings.debug else None,
 )
-admin = setup_admin(app)
+if settings.admin_enabled:
+    app.mount("/admin", LazyAdminApp(), name="admin")
 
 if settings.cors_origins:
     app.add_middleware(
@@ -38,6 +122,18 @@ if settings.cors_origins:
         allow_headers=["*"],
     )
 
+if settings.metrics_enabled:
+    REGISTRY.register(AppStatsCollector())
+    app.add_middleware(PrometheusMiddleware)
+
+    @app.get(
+        "/metrics",
+        include_in_schema=False,
+        dependencies=[Depends(require_internal_token)],
+    )
+    async def metrics():
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 
 @app.get("/")
 async def root():
@@ -50,3 +146,6 @@ async def root():
 
 
 app.include_router(api_router, prefix="/api/v1")
+app.include_router(well_known_router)
+if settings.internal_endpoints_enabled:
+    app.include_router(internal_router)
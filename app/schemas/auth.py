@@ -11,11 +11,22 @@ class Token(BaseModel):
 class TokenPayload(BaseModel):
     sub: Optional[str] = None
     email: Optional[str] = None
+    is_active: Optional[bool] = None
+    ver: Optional[int] = None
+    jti: Optional[str] = None
+    fam: Optional[str] = None
     exp: Optional[int] = None
     iat: Optional[int] = None
     type: Optional[str] = None
 
 
+class AuthPrincipal(BaseModel):
+    id: int
+    email: str
+    is_active: bool
+    token_version: int = 0
+
+
 class LoginRequest(BaseModel):
     email: EmailStr
     password: str
@@ -54,6 +54,11 @@ class UserListResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserPage(BaseModel):
+    items: list[UserListResponse]
+    next_cursor: Optional[str] = None
+
+
 class UserDeleteRequest(BaseModel):
     confirm: bool = Field(
         default=False,
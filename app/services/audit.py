@@ -0,0 +1,116 @@
+import logging
+
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from fastapi import Request
+
+from app.core.background import BackgroundWorker
+from app.core.config import settings
+from app.core.ratelimit import client_ip
+from app.core.session import AsyncSessionLocal
+from app.db.repo.auth_event import AuthEventRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+class AuthEventRecorder(BackgroundWorker):
+    name = "auth-event-recorder"
+
+    def __init__(self):
+        super().__init__(interval=settings.auth_events_flush_interval_seconds)
+        self.batch_size = settings.auth_events_batch_size
+        self.max_buffer = settings.auth_events_max_buffer
+        self._buffer: deque[tuple[Any, ...]] = deque()
+        self.recorded_total = 0
+        self.written_total = 0
+        self.dropped_total = 0
+        self.flushed_batches = 0
+        self.failed_batches = 0
+
+    def record(
+        self,
+        event: str,
+        outcome: str,
+        user_id: Optional[int] = None,
+        email: Optional[str] = None,
+        request: Optional[Request] = None,
+    ) -> None:
+        if not settings.auth_events_enabled:
+            return
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped_total += 1
+            return
+
+        ip = user_agent = None
+        if request is not None:
+            ip = client_ip(request)[:45]
+            user_agent = (request.headers.get("user-agent") or "")[:255] or None
+        self._buffer.append(
+            (
+                user_id,
+                email[:255] if email else None,
+                event,
+                outcome,
+                ip,
+                user_agent,
+                datetime.now(timezone.utc),
+            )
+        )
+        self.recorded_total += 1
+        if len(self._buffer) >= self.batch_size:
+            self.notify()
+
+    async def _flush_batch(self) -> bool:
+        batch = [
+            self._buffer.popleft()
+            for _ in range(min(self.batch_size, len(self._buffer)))
+        ]
+        if not batch:
+            return False
+        try:
+            async with AsyncSessionLocal() as session:
+                await AuthEventRepository(session).bulk_insert(batch)
+        except Exception as e:
+            self.failed_batches += 1
+            # Put the batch back if there is room; otherwise it is dropped so
+            # a database outage cannot grow the buffer without bound.
+            room = self.max_buffer - len(self._buffer)
+            requeued = batch[-room:] if room > 0 else []
+            self._buffer.extendleft(reversed(requeued))
+            self.dropped_total += len(batch) - len(requeued)
+            logger.error(f"Failed to write {len(batch)} auth events: {e}")
+            raise
+        self.flushed_batches += 1
+        self.written_total += len(batch)
+        return True
+
+    async def run_once(self) -> bool:
+        await self._flush_batch()
+        return len(self._buffer) >= self.batch_size
+
+    async def on_stop(self) -> None:
+        try:
+            while await self._flush_batch():
+                pass
+        except Exception:
+            pass
+        if self._buffer:
+            logger.warning(f"Dropped {len(self._buffer)} auth events on shutdown")
+            self.dropped_total += len(self._buffer)
+            self._buffer.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "buffered": len(self._buffer),
+            "recorded_total": self.recorded_total,
+            "written_total": self.written_total,
+            "dropped_total": self.dropped_total,
+            "flushed_batches": self.flushed_batches,
+            "failed_batches": self.failed_batches,
+        }
+
+
+auth_event_recorder = AuthEventRecorder()
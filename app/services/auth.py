@@ -1,51 +1,73 @@
 import jwt
+import logging
+import time
+import uuid
 
 from typing import Any, Optional
 
-from fastapi import HTTPException, status
+from fastapi import BackgroundTasks, HTTPException, status
 
 from app.core.config import settings
 from app.core.utils.jwt import create_access_token, create_refresh_token, verify_token
-from app.core.utils.security import verify_password
+from app.core.utils.security import verify_password_async
+from app.db.repo.token_store import TokenRevocationStore
+from app.services.rehash import password_rehasher
 from app.services.user import UserService
 
+logger = logging.getLogger(__name__)
+
 
 class AuthService:
-    def __init__(self, user_service: UserService):
+    def __init__(
+        self,
+        user_service: UserService,
+        token_store: Optional[TokenRevocationStore] = None,
+    ):
         self.user_service = user_service
+        self.token_store = token_store
         self.secret = settings.secret_key
         self.algorithm = settings.algorithm
 
-    async def authenticate_user(self, email: str, password: str) -> Optional[dict]:
-        user = await self.user_service.get_user_by_email(email)
-        if not user:
+    async def authenticate_user(
+        self,
+        email: str,
+        password: str,
+        background_tasks: Optional[BackgroundTasks] = None,
+    ) -> Optional[dict]:
+        user, password_hash = await self.user_service.get_login_user(email)
+        if not user or not password_hash:
             return None
-        if not verify_password(password, user.password_hash):
+        if not await verify_password_async(password, password_hash):
             return None
         if not user.is_active:
             return None
+        if background_tasks is not None and password_rehasher.needed(password_hash):
+            background_tasks.add_task(
+                password_rehasher.rehash, user.id, user.email, password, password_hash
+            )
         return user
 
-    def create_tokens(
+    def _refresh_ttl_seconds(self) -> int:
+        return settings.refresh_token_expire_days * 24 * 3600
+
+    def _build_tokens(
         self,
         user_id: int,
         email: str,
         is_active: bool,
-    ) -> dict[str, Any]:
-        access_token = create_access_token(
-            data={
-                "sub": str(user_id),
-                "email": email,
-                "is_active": is_active,
-            }
-        )
-        refresh_token = create_refresh_token(
-            data={
-                "sub": str(user_id),
-                "email": email,
-                "is_active": is_active,
-            }
-        )
+        token_version: int,
+        family: str,
+    ) -> tuple[dict[str, Any], str]:
+        claims = {
+            "sub": str(user_id),
+            "email": email,
+            "is_active": is_active,
+            "ver": token_version,
+            "fam": family,
+        }
+        refresh_jti = uuid.uuid4().hex
+        access_token = create_access_token(data={**claims, "jti": uuid.uuid4().hex})
+        refresh_token = create_refresh_token(data={**claims, "jti": refresh_jti})
 
         return {
             "access_token": access_token,
@@ -54,7 +76,24 @@ class AuthService:
             "user_id": user_id,
             "email": email,
             "is_active": is_active,
-        }
+        }, refresh_jti
+
+    async def create_tokens(
+        self,
+        user_id: int,
+        email: str,
+        is_active: bool,
+        token_version: int = 0,
+    ) -> dict[str, Any]:
+        family = uuid.uuid4().hex
+        tokens, refresh_jti = self._build_tokens(
+            user_id, email, is_active, token_version, family
+        )
+        if self.token_store is not None:
+            await self.token_store.start_family(
+                family, refresh_jti, self._refresh_ttl_seconds()
+            )
+        return tokens
 
     async def refresh_tokens(self, refresh_token: str) -> Optional[dict[str, Any]]:
         try:
@@ -67,12 +106,63 @@ class AuthService:
                 )
 
             user_id = int(payload.get("sub"))
-            email = payload.get("email")
+            jti = payload.get("jti")
+            family = payload.get("fam")
+
+            if self.token_store is not None and await self.token_store.is_revoked(
+                jti, family
+            ):
+                return None
+
+            user = await self.user_service.get_fresh_user(user_id)
+            if not user or not user.is_active:
+                return None
+            if payload.get("ver", 0) != user.token_version:
+                return None
 
-            user = await self.user_service.get_user(user_id)
-            if not user:
+            if family is None or jti is None:
+                # Refresh tokens issued before rotation start a new family.
+                return await self.create_tokens(
+                    user.id, user.email, user.is_active, user.token_version
+                )
+
+            tokens, refresh_jti = self._build_tokens(
+                user.id, user.email, user.is_active, user.token_version, family
+            )
+            if self.token_store is not None and not await self.token_store.rotate(
+                family, jti, refresh_jti, self._refresh_ttl_seconds()
+            ):
+                logger.warning(
+                    f"Refresh token reuse detected for user {user.id}, "
+                    f"family {family} revoked"
+                )
                 return None
-            return self.create_tokens(user_id, email)
+            return tokens
 
         except (jwt.PyJWTError, ValueError, KeyError):
             return None
+
+    async def logout(
+        self, access_payload: dict, refresh_token: Optional[str] = None
+    ) -> None:
+        if self.token_store is None:
+            return
+
+        access_ttl = max(1, int(access_payload.get("exp", 0) - time.time()))
+        await self.token_store.revoke(access_payload.get("jti"), None, access_ttl)
+        await self.token_store.revoke(
+            None, access_payload.get("fam"), self._refresh_ttl_seconds()
+        )
+
+        if not refresh_token:
+            return
+        try:
+            refresh_payload = verify_token(refresh_token)
+        except HTTPException:
+            return
+        if refresh_payload.get("sub") == access_payload.get(
+            "sub"
+        ) and refresh_payload.get("fam") != access_payload.get("fam"):
+            await self.token_store.revoke(
+                None, refresh_payload.get("fam"), self._refresh_ttl_seconds()
+            )
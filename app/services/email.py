@@ -1,25 +1,180 @@
 import aiosmtplib
 
+import asyncio
 import logging
+import time
 
+from email.message import Message
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from typing import Optional
 
 from app.core.config import settings
+from app.core.metrics import email_send_duration_seconds
 
 
 logger = logging.getLogger(__name__)
 
 
+class PooledSMTPConnection:
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+        self.sent = 0
+
+
+class SMTPConnectionPool:
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: str,
+        password: str,
+        size: int,
+        idle_check_seconds: float,
+        timeout: float,
+        max_messages_per_connection: int,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self.idle_check_seconds = idle_check_seconds
+        self.timeout = timeout
+        self.max_messages_per_connection = max_messages_per_connection
+        self._slots: Optional[asyncio.Queue[Optional[PooledSMTPConnection]]] = None
+
+    def _get_slots(self) -> asyncio.Queue:
+        if self._slots is None:
+            self._slots = asyncio.Queue(maxsize=self.size)
+            for _ in range(self.size):
+                self._slots.put_nowait(None)
+        return self._slots
+
+    async def _connect(self) -> PooledSMTPConnection:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            use_tls=False,
+            start_tls=True,
+            timeout=self.timeout,
+        )
+        await smtp.connect()
+        try:
+            await smtp.login(self.username, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        logger.info(f"Открыто SMTP-соединение с {self.hostname}:{self.port}")
+        return PooledSMTPConnection(smtp)
+
+    async def _is_alive(self, connection: PooledSMTPConnection) -> bool:
+        if not connection.smtp.is_connected:
+            return False
+        if time.monotonic() - connection.last_used < self.idle_check_seconds:
+            return True
+        try:
+            await connection.smtp.noop()
+            return True
+        except (aiosmtplib.SMTPException, OSError):
+            return False
+
+    async def _close_connection(self, connection: PooledSMTPConnection) -> None:
+        try:
+            await connection.smtp.quit()
+        except (aiosmtplib.SMTPException, OSError):
+            connection.smtp.close()
+
+    async def _reset(self, connection: PooledSMTPConnection) -> bool:
+        try:
+            await connection.smtp.rset()
+            return True
+        except (aiosmtplib.SMTPException, OSError):
+            return False
+
+    async def _acquire(self) -> PooledSMTPConnection:
+        slots = self._get_slots()
+        connection = await slots.get()
+        try:
+            if connection is not None and not await self._is_alive(connection):
+                connection.smtp.close()
+                connection = None
+            if connection is None:
+                connection = await self._connect()
+            return connection
+        except BaseException:
+            slots.put_nowait(None)
+            raise
+
+    async def _release(
+        self, connection: PooledSMTPConnection, reusable: bool = True
+    ) -> None:
+        if reusable and connection.sent < self.max_messages_per_connection:
+            connection.last_used = time.monotonic()
+            self._get_slots().put_nowait(connection)
+            return
+        self._get_slots().put_nowait(None)
+        if reusable:
+            await self._close_connection(connection)
+        else:
+            connection.smtp.close()
+
+    async def send_message(self, message: Message) -> None:
+        for attempt in range(2):
+            connection = await self._acquire()
+            try:
+                await connection.smtp.send_message(message)
+            except (aiosmtplib.SMTPServerDisconnected, ConnectionError) as e:
+                await self._release(connection, reusable=False)
+                if attempt:
+                    raise
+                logger.warning(f"SMTP-соединение потеряно, переподключаюсь: {e}")
+                continue
+            except (aiosmtplib.SMTPResponseException, aiosmtplib.SMTPRecipientsRefused):
+                # The server answered and refused this message; the connection
+                # is only reused once RSET has cleared the transaction.
+                await self._release(connection, reusable=await self._reset(connection))
+                raise
+            except BaseException:
+                # Cancelled or timed out somewhere inside the transaction: the
+                # protocol state is unknown, so the connection is dropped.
+                await self._release(connection, reusable=False)
+                raise
+            connection.sent += 1
+            await self._release(connection)
+            return
+
+    async def close(self) -> None:
+        if self._slots is None:
+            return
+        while not self._slots.empty():
+            connection = self._slots.get_nowait()
+            if connection is not None:
+                await self._close_connection(connection)
+        self._slots = None
+
+
+smtp_pool = SMTPConnectionPool(
+    hostname=settings.SMTP_HOST,
+    port=settings.SMTP_PORT,
+    username=settings.SMTP_USER,
+    password=settings.SMTP_PASSWORD,
+    size=settings.SMTP_POOL_SIZE,
+    idle_check_seconds=settings.SMTP_POOL_IDLE_CHECK_SECONDS,
+    timeout=settings.SMTP_TIMEOUT,
+    max_messages_per_connection=settings.SMTP_POOL_MAX_MESSAGES_PER_CONNECTION,
+)
+
+
 class EmailService:
-    def __init__(self):
-        self.smtp_host = settings.SMTP_HOST
-        self.smtp_port = settings.SMTP_PORT
-        self.smtp_user = settings.SMTP_USER
-        self.smtp_password = settings.SMTP_PASSWORD
+    def __init__(self, pool: SMTPConnectionPool = smtp_pool):
+        self.pool = pool
         self.email_from = settings.EMAIL_FROM
 
     async def send_verification_email(self, email: str, code: str) -> bool:
+        started = time.perf_counter()
+        result = "error"
         try:
             message = MIMEMultipart("alternative")
             message["From"] = self.email_from
@@ -53,18 +208,10 @@ class EmailService:
 
             message.attach(MIMEText(html, "html", "utf-8"))
 
-            async with aiosmtplib.SMTP(
-                hostname=self.smtp_host,
-                port=self.smtp_port,
-                use_tls=False,
-                start_tls=True,
-            ) as smtp:
-                logger.info("Подключено, логинюсь")
-                await smtp.login(self.smtp_user, self.smtp_password)
-                logger.info("Логин успешен, отправляю")
-                await smtp.send_message(message)
-                logger.info(f"Email успешно отправлен на {email}")
-                return True
+            await self.pool.send_message(message)
+            result = "sent"
+            logger.info(f"Email успешно отправлен на {email}")
+            return True
 
         except aiosmtplib.SMTPAuthenticationError as e:
             logger.error(f"Ошибка аутентификации SMTP: {e}")
@@ -76,3 +223,7 @@ class EmailService:
         except Exception as e:
             logger.error(f"Неожиданная ошибка: {type(e).__name__}: {e}")
             return False
+        finally:
+            email_send_duration_seconds.labels("verification", result).observe(
+                time.perf_counter() - started
+            )
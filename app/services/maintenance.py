@@ -0,0 +1,123 @@
+import logging
+import time
+import zlib
+
+from abc import abstractmethod
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from app.core.background import BackgroundWorker
+from app.core.config import settings
+from app.core.session import AsyncSessionLocal
+from app.db.repo.code import VerificationCodeRepository
+from app.db.repo.outbox import EmailOutboxRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+_CODE_SWEEPER_LOCK_KEY = zlib.crc32(b"volleypro:expired-code-sweeper")
+_OUTBOX_PURGER_LOCK_KEY = zlib.crc32(b"volleypro:outbox-purger")
+
+
+class BatchSweeper(BackgroundWorker):
+    # Deletes rows in batches, one transaction per batch, on one instance at
+    # a time.
+    lock_key: int
+    description = "rows"
+
+    def __init__(self, interval: float, batch_size: int):
+        super().__init__(interval=interval)
+        self.batch_size = batch_size
+        self.runs = 0
+        self.skipped = 0
+        self.rows_deleted_total = 0
+        self.last_rows_deleted = 0
+        self.last_duration_seconds = 0.0
+
+    @abstractmethod
+    async def delete_batch(self, session: AsyncSession) -> int: ...
+
+    async def run_once(self) -> bool:
+        started = time.perf_counter()
+        deleted = 0
+        async with AsyncSessionLocal() as session:
+            while True:
+                # A transaction-level lock: it is released by the batch commit
+                # and survives pgbouncer transaction pooling, so no connection
+                # has to sit idle in a transaction holding it.
+                locked = await session.scalar(
+                    select(func.pg_try_advisory_xact_lock(self.lock_key))
+                )
+                if not locked:
+                    await session.rollback()
+                    break
+                batch = await self.delete_batch(session)
+                await session.commit()
+                deleted += batch
+                if batch < self.batch_size:
+                    break
+        duration = time.perf_counter() - started
+
+        if not locked and not deleted:
+            self.skipped += 1
+            return False
+        self.runs += 1
+        self.rows_deleted_total += deleted
+        self.last_rows_deleted = deleted
+        self.last_duration_seconds = duration
+        logger.info(f"Deleted {deleted} {self.description} in {duration:.3f}s")
+        return False
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "rows_deleted_total": self.rows_deleted_total,
+            "last_rows_deleted": self.last_rows_deleted,
+            "last_duration_seconds": self.last_duration_seconds,
+        }
+
+
+class ExpiredCodeSweeper(BatchSweeper):
+    name = "expired-code-sweeper"
+    lock_key = _CODE_SWEEPER_LOCK_KEY
+    description = "expired verification codes"
+
+    def __init__(self):
+        super().__init__(
+            interval=settings.code_sweeper_interval_seconds,
+            batch_size=settings.code_sweeper_batch_size,
+        )
+
+    async def delete_batch(self, session: AsyncSession) -> int:
+        return await VerificationCodeRepository(session).delete_expired(
+            batch_size=self.batch_size
+        )
+
+
+class OutboxPurger(BatchSweeper):
+    name = "outbox-purger"
+    lock_key = _OUTBOX_PURGER_LOCK_KEY
+    description = "finished outbox messages"
+
+    def __init__(self):
+        super().__init__(
+            interval=settings.outbox_purge_interval_seconds,
+            batch_size=settings.outbox_purge_batch_size,
+        )
+
+    async def delete_batch(self, session: AsyncSession) -> int:
+        cutoff = datetime.now(timezone.utc) - timedelta(
+            hours=settings.outbox_retention_hours
+        )
+        return await EmailOutboxRepository(session).delete_finished(
+            cutoff, batch_size=self.batch_size
+        )
+
+
+code_sweeper = ExpiredCodeSweeper()
+outbox_purger = OutboxPurger()
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+
+from datetime import datetime, timedelta, timezone
+
+from app.core.background import BackgroundWorker
+from app.core.config import settings
+from app.core.session import AsyncSessionLocal
+from app.db.models.outbox import EmailOutbox
+from app.db.repo.outbox import EmailOutboxRepository
+from app.services.email import EmailService
+
+
+logger = logging.getLogger(__name__)
+
+
+class EmailOutboxWorker(BackgroundWorker):
+    name = "email-outbox-worker"
+
+    def __init__(self):
+        super().__init__(interval=settings.outbox_poll_interval_seconds)
+        self.email_service = EmailService()
+        self._semaphore = asyncio.Semaphore(settings.outbox_concurrency)
+
+    def _retry_at(self, attempts: int) -> datetime:
+        delay = min(
+            settings.outbox_backoff_base_seconds * 2 ** (attempts - 1),
+            settings.outbox_backoff_max_seconds,
+        )
+        return datetime.now(timezone.utc) + timedelta(seconds=delay)
+
+    async def _send(self, message: EmailOutbox) -> bool:
+        async with self._semaphore:
+            if message.kind == EmailOutbox.KIND_VERIFICATION:
+                return await self.email_service.send_verification_email(
+                    message.recipient, message.payload["code"]
+                )
+            logger.error(f"Unknown outbox message kind: {message.kind}")
+            return False
+
+    async def run_once(self) -> bool:
+        async with AsyncSessionLocal() as session:
+            messages = await EmailOutboxRepository(session).claim_batch(
+                limit=settings.outbox_batch_size,
+                lease_seconds=settings.outbox_lease_seconds,
+            )
+        if not messages:
+            return False
+
+        results = await asyncio.gather(
+            *(self._send(message) for message in messages),
+            return_exceptions=True,
+        )
+
+        async with AsyncSessionLocal() as session:
+            repo = EmailOutboxRepository(session)
+            for message, result in zip(messages, results):
+                if result is True:
+                    await repo.mark_sent(message.id)
+                    continue
+                error = (
+                    repr(result) if isinstance(result, BaseException) else "send failed"
+                )
+                if message.attempts >= settings.outbox_max_attempts:
+                    logger.error(
+                        f"Outbox message {message.id} to {message.recipient} "
+                        f"failed after {message.attempts} attempts: {error}"
+                    )
+                    await repo.mark_failed(message.id, error, retry_at=None)
+                else:
+                    await repo.mark_failed(
+                        message.id, error, retry_at=self._retry_at(message.attempts)
+                    )
+            await repo.commit()
+
+        return len(messages) >= settings.outbox_batch_size
+
+
+outbox_worker = EmailOutboxWorker()
@@ -0,0 +1,57 @@
+import logging
+
+from app.core.config import settings
+from app.core.session import AsyncSessionLocal
+from app.core.utils.security import hash_password_async, password_needs_rehash
+from app.db.repo.user import UserRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordRehasher:
+    # Upgrades legacy bcrypt hashes and outdated argon2 costs after a
+    # successful login. It runs as a background task of the login response:
+    # the plaintext password lives no longer than that request, the client
+    # does not wait for the extra hash, and the hash still goes through the
+    # same admission controller as every other one.
+    def __init__(self):
+        self.submitted_total = 0
+        self.rehashed_total = 0
+        self.skipped_total = 0
+        self.failed_total = 0
+
+    def needed(self, old_hash: str) -> bool:
+        return settings.security_rehash_on_login and password_needs_rehash(old_hash)
+
+    async def rehash(
+        self, user_id: int, email: str, password: str, old_hash: str
+    ) -> None:
+        # Runs after the response, when the request's session is gone.
+        self.submitted_total += 1
+        try:
+            new_hash = await hash_password_async(password)
+            async with AsyncSessionLocal() as session:
+                replaced = await UserRepository(session).replace_password_hash(
+                    user_id, email, old_hash, new_hash
+                )
+        except Exception as e:
+            # The login itself succeeded; the next one tries again.
+            self.failed_total += 1
+            logger.warning(f"Could not rehash password of user {user_id}: {e}")
+            return
+        if replaced:
+            self.rehashed_total += 1
+        else:
+            self.skipped_total += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "submitted_total": self.submitted_total,
+            "rehashed_total": self.rehashed_total,
+            "skipped_total": self.skipped_total,
+            "failed_total": self.failed_total,
+        }
+
+
+password_rehasher = PasswordRehasher()
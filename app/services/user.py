@@ -1,14 +1,17 @@
-from datetime import datetime, timedelta, timezone
 import logging
-from typing import Optional
+from datetime import datetime
+from typing import AsyncIterator, Optional
 
-from app.core.utils.security import hash_password
-from app.db.models.code import VerificationCode
+from app.core.config import settings
+from app.core.utils.security import hash_password_async
+from app.core.utils.token_version import token_versions
 from app.db.models.user import User
+from app.db.models.outbox import EmailOutbox
 from app.db.repo.code import VerificationCodeRepository
+from app.db.repo.outbox import EmailOutboxRepository
 from app.db.repo.user import UserRepository
 from app.schemas.user import UserCreate
-from app.services.email import EmailService
+from app.services.outbox import outbox_worker
 
 from app.core.utils.email_code import generate_verification_code
 
@@ -21,61 +24,89 @@ class UserService:
         self,
         user_repository: UserRepository,
         code_repository: VerificationCodeRepository,
+        outbox_repository: EmailOutboxRepository,
     ):
         self.user_repo = user_repository
         self.code_repo = code_repository
-        self.email_service = EmailService()
+        self.outbox_repo = outbox_repository
+
+    @staticmethod
+    def _code_ttl_seconds() -> int:
+        return settings.verification_code_ttl_minutes * 60
+
+    async def _enqueue_verification_email(self, email: str, code: str) -> None:
+        await self.outbox_repo.enqueue(
+            recipient=email,
+            kind=EmailOutbox.KIND_VERIFICATION,
+            payload={"code": code},
+        )
 
     async def get_user(self, user_id: int) -> Optional[User]:
         return await self.user_repo.get_by_id(user_id)
 
+    async def get_profile(self, user_id: int) -> Optional[User]:
+        # Read-only view for responses: served from the user cache when
+        # possible so claims-only requests never open a session.
+        user = await self.user_repo.get_cached(user_id)
+        if user is None:
+            user = await self.user_repo.get_by_id(user_id)
+        return user
+
+    async def get_fresh_user(self, user_id: int) -> Optional[User]:
+        # Bypasses the user cache and the replica, for token decisions.
+        self.user_repo.use_primary()
+        return await self.user_repo.get_by_id(user_id, fresh=True)
+
     async def get_user_by_email(self, email: str) -> Optional[User]:
         return await self.user_repo.get_by_email(email)
 
+    async def get_login_user(self, email: str) -> tuple[Optional[User], Optional[str]]:
+        # The user and password hash, with is_active and token_version read
+        # from the primary alongside the hash.
+        self.user_repo.use_primary()
+        user = await self.user_repo.get_by_email(email)
+        if user is None:
+            return None, None
+        return user, await self.user_repo.load_credentials(user)
+
     async def create_user(self, user_create: UserCreate) -> User:
-        existing_user = await self.get_user_by_email(user_create.email)
-        if existing_user:
-            raise ValueError("User with this email already exists")
-        hashed_password = hash_password(user_create.password)
-        db_user = User(
+        # Rejects known emails before paying for a hash; the insert's
+        # ON CONFLICT DO NOTHING still catches races.
+        if await self.user_repo.email_exists(user_create.email):
+            raise ValueError("User with email already exists")
+        hashed_password = await hash_password_async(user_create.password)
+        return await self.create_user_with_hash(user_create, hashed_password)
+
+    async def create_user_with_hash(
+        self, user_create: UserCreate, password_hash: str
+    ) -> User:
+        user = await self.user_repo.insert_if_absent(
             email=user_create.email,
-            password_hash=hashed_password,
+            password_hash=password_hash,
             username=user_create.username,
             is_active=False,
             is_verified=False,
             is_superuser=False,
+            token_version=0,
         )
-        user = await self.user_repo.create(db_user)
+        if user is None:
+            raise ValueError("User with email already exists")
         code = generate_verification_code()
-        verification_code = VerificationCode(
-            user_id=user.id,
-            code=code,
-            expires_at=datetime.now(timezone.utc) + timedelta(minutes=10),
-        )
-        await self.code_repo.create(verification_code)
-        success = await self.email_service.send_verification_email(user.email, code)
-        if success:
-            logger.info("Email отправлен успешно")
-        else:
-            logger.warning("Не удалось отправить email, но пользователь создан")
+        await self.code_repo.issue(user.id, code, self._code_ttl_seconds())
+        await self._enqueue_verification_email(user.email, code)
+        await self.user_repo.commit()
+        outbox_worker.notify()
         return user
 
     async def verify_email(self, email: str, code: str) -> bool:
+        self.user_repo.use_primary()
         user = await self.get_user_by_email(email)
         if not user:
             return False
 
-        verification_code = await self.code_repo.get_by_user_and_code(user.id, code)
-        if not verification_code:
-            return False
-
-        now = datetime.now(timezone.utc)
-        if verification_code.is_used or verification_code.expires_at <= now:
+        if not await self.code_repo.consume(user.id, code):
             return False
 
-        verification_code.is_used = True
-        await self.code_repo.update(verification_code)
-
         user.is_active = True
         user.is_verified = True
         await self.user_repo.update(user)
@@ -84,23 +115,42 @@ class UserService:
         return True
 
     async def resend_verification_code(self, email) -> bool:
+        self.user_repo.use_primary()
         user = await self.get_user_by_email(email)
         if not user or user.is_verified:
             return False
-        actice_codes = await self.code_repo.get_active_by_user(user.id)
-        if actice_codes:
-            code = actice_codes[0].code
-            await self.email_service.send_verification_email(email, code)
-        else:
+        code = await self.code_repo.get_active_code(user.id)
+        if code is None:
             code = generate_verification_code()
-            verification_code = VerificationCode(
-                user_id=user.id,
-                code=code,
-                expires_at=datetime.now(timezone.utc) + timedelta(minutes=15),
-            )
-            await self.code_repo.create(verification_code)
-            await self.email_service.send_verification_email(user.email, code)
+            await self.code_repo.issue(user.id, code, self._code_ttl_seconds())
+        await self._enqueue_verification_email(user.email, code)
+        await self.user_repo.commit()
+        outbox_worker.notify()
+        return True
+
+    async def replace_password_hash(
+        self, user_id: int, email: str, old_hash: str, new_hash: str
+    ) -> bool:
+        return await self.user_repo.replace_password_hash(
+            user_id, email, old_hash, new_hash
+        )
+
+    async def list_users(
+        self, limit: int, after: Optional[tuple[datetime, int]] = None
+    ) -> list[User]:
+        return await self.user_repo.get_all(limit=limit, after=after)
+
+    def stream_users(self, batch_size: int = 1000) -> AsyncIterator[User]:
+        return self.user_repo.stream_all(batch_size=batch_size)
+
+    async def revoke_tokens(self, user_id: int) -> bool:
+        token_version = await self.user_repo.increment_token_version(user_id)
+        if token_version is None:
+            return False
+        token_versions.set(user_id, token_version)
         return True
 
     async def delete_user(self, user_id: int) -> bool:
+        self.user_repo.use_primary()
+        token_versions.delete(user_id)
         return await self.user_repo.delete(user_id)
@@ -0,0 +1,62 @@
+"""Offline micro-benchmarks for the auth hot paths.
+
+    python -m benchmarks                              # run everything
+    python -m benchmarks -k jwt                       # only matching benchmarks
+    python -m benchmarks -o results.json              # save results
+    python -m benchmarks -b baseline.json --max-regression 0.15
+
+With --baseline the run exits with status 1 if any benchmark lost more than
+--max-regression of its throughput or its p95 grew by more than that.
+"""
+
+import argparse
+import os
+import sys
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-not-for-production")
+os.environ.setdefault("TOKEN_REVOCATION_STORE", "memory")
+
+from benchmarks import harness  # noqa: E402
+from benchmarks import auth  # noqa: E402,F401
+from benchmarks import dependencies  # noqa: E402,F401
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Auth hot path micro-benchmarks")
+    parser.add_argument("-k", "--filter", help="substring of benchmark name or group")
+    parser.add_argument("-o", "--output", help="write results as JSON")
+    parser.add_argument("-b", "--baseline", help="compare against a saved JSON run")
+    parser.add_argument("--max-regression", type=float, default=0.15)
+    parser.add_argument(
+        "--time-scale",
+        type=float,
+        default=1.0,
+        help="multiply every benchmark's minimum run time",
+    )
+    args = parser.parse_args()
+
+    results = [
+        harness.run_benchmark(bench, time_scale=args.time_scale)
+        for bench in harness.registered(args.filter)
+    ]
+
+    regressions = []
+    if args.baseline:
+        regressions = harness.compare(
+            results, harness.load_results(args.baseline), args.max_regression
+        )
+
+    harness.print_table(results)
+    if args.output:
+        harness.save_results(args.output, results)
+
+    if regressions:
+        print("\nRegressions:", file=sys.stderr)
+        for line in regressions:
+            print(f"  {line}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+from datetime import datetime, timezone
+
+from fastapi.responses import JSONResponse
+
+from app.api.v1.routers.auth import login_response, router, user_response
+from app.core.utils.jwt import (
+    _decode,
+    create_access_token,
+    create_refresh_token,
+    verify_token,
+)
+from app.core.utils.security import hash_password, verify_password
+from app.db.models.code import VerificationCode  # noqa: F401
+from app.db.models.user import User
+from app.schemas.auth import LoginResponse
+from app.schemas.user import UserResponse
+
+from benchmarks.harness import benchmark
+
+
+PASSWORD = "correct-horse-battery-staple"
+PASSWORD_HASH = hash_password(PASSWORD)
+CLAIMS = {"sub": "42", "email": "player@example.com", "is_active": True, "ver": 0}
+ACCESS_TOKEN = create_access_token(CLAIMS)
+
+NOW = datetime.now(timezone.utc)
+USER = User(
+    id=42,
+    email="player@example.com",
+    username="player_42",
+    password_hash=PASSWORD_HASH,
+    is_active=True,
+    is_superuser=False,
+    is_verified=True,
+    token_version=0,
+    created_at=NOW,
+    updated_at=NOW,
+)
+LOGIN_RESPONSE_DATA = {
+    "access_token": ACCESS_TOKEN,
+    "refresh_token": ACCESS_TOKEN,
+    "token_type": "bearer",
+    "user_id": 42,
+    "email": "player@example.com",
+    "is_active": True,
+}
+LOGIN_RESPONSE = LoginResponse(**LOGIN_RESPONSE_DATA)
+USER_RESPONSE = UserResponse.model_validate(USER)
+RESPONSE_FIELDS = {route.path: route.response_field for route in router.routes}
+
+
+def _fastapi_response_model(path: str, content) -> bytes:
+    # What FastAPI does for a route with response_model that returns content.
+    field = RESPONSE_FIELDS[path]
+    value, _ = field.validate(content, {}, loc=("response",))
+    return JSONResponse(field.serialize(value, by_alias=True)).body
+
+
+@benchmark("password", min_time=3.0, warmup=1)
+def argon2_hash():
+    hash_password(PASSWORD)
+
+
+@benchmark("password", min_time=3.0, warmup=1)
+def argon2_verify():
+    verify_password(PASSWORD, PASSWORD_HASH)
+
+
+@benchmark("jwt")
+def jwt_create_access_token():
+    create_access_token(CLAIMS)
+
+
+@benchmark("jwt")
+def jwt_create_refresh_token():
+    create_refresh_token(CLAIMS)
+
+
+@benchmark("jwt")
+def jwt_verify_token():
+    verify_token(ACCESS_TOKEN)
+
+
+@benchmark("jwt")
+def jwt_decode_uncached():
+    _decode(ACCESS_TOKEN)
+
+
+@benchmark("schemas")
+def login_response_validate():
+    LoginResponse(**LOGIN_RESPONSE_DATA)
+
+
+@benchmark("schemas")
+def login_response_dump_json():
+    LOGIN_RESPONSE.model_dump_json()
+
+
+@benchmark("schemas")
+def user_response_from_orm():
+    UserResponse.model_validate(USER)
+
+
+@benchmark("schemas")
+def user_response_dump_json():
+    USER_RESPONSE.model_dump_json()
+
+
+@benchmark("serialization")
+def login_response_model_path():
+    _fastapi_response_model("/auth/login", LoginResponse(**LOGIN_RESPONSE_DATA))
+
+
+@benchmark("serialization")
+def login_response_fast_path():
+    login_response.response(LOGIN_RESPONSE_DATA)
+
+
+@benchmark("serialization")
+def user_response_model_path():
+    _fastapi_response_model("/auth/me", USER)
+
+
+@benchmark("serialization")
+def user_response_fast_path():
+    user_response.response(USER)
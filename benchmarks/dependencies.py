@@ -0,0 +1,122 @@
+import asyncio
+
+from typing import AsyncGenerator
+
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import get_user_cache
+from app.core.session import AsyncSessionLocal
+from app.db.repo.code import VerificationCodeRepository
+from app.db.repo.code_store import get_code_store
+from app.db.repo.outbox import EmailOutboxRepository
+from app.db.repo.token_store import get_token_store
+from app.db.repo.user import UserRepository
+from app.deps.auth import get_auth_service
+from app.services.auth import AuthService
+from app.services.user import UserService
+
+from benchmarks.harness import benchmark
+
+
+# The per-request dependency chain used before services became singletons.
+async def legacy_get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def legacy_get_user_repo(
+    db: AsyncSession = Depends(legacy_get_db),
+) -> AsyncGenerator[UserRepository, None]:
+    yield UserRepository(db, cache=get_user_cache())
+
+
+async def legacy_get_code_repo(
+    db: AsyncSession = Depends(legacy_get_db),
+) -> AsyncGenerator[VerificationCodeRepository, None]:
+    yield VerificationCodeRepository(db, store=get_code_store())
+
+
+async def legacy_get_outbox_repo(
+    db: AsyncSession = Depends(legacy_get_db),
+) -> AsyncGenerator[EmailOutboxRepository, None]:
+    yield EmailOutboxRepository(db)
+
+
+async def legacy_get_user_service(
+    user_repo: UserRepository = Depends(legacy_get_user_repo),
+    code_repo: VerificationCodeRepository = Depends(legacy_get_code_repo),
+    outbox_repo: EmailOutboxRepository = Depends(legacy_get_outbox_repo),
+) -> AsyncGenerator[UserService, None]:
+    yield UserService(user_repo, code_repo, outbox_repo)
+
+
+async def legacy_get_auth_service(
+    user_service: UserService = Depends(legacy_get_user_service),
+) -> AsyncGenerator[AuthService, None]:
+    yield AuthService(user_service, get_token_store())
+
+
+app = FastAPI()
+
+
+@app.get("/baseline")
+async def baseline():
+    return None
+
+
+@app.get("/legacy")
+async def legacy(auth_service: AuthService = Depends(legacy_get_auth_service)):
+    return None
+
+
+@app.get("/current")
+async def current(auth_service: AuthService = Depends(get_auth_service)):
+    return None
+
+
+LOOP = asyncio.new_event_loop()
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message):
+    pass
+
+
+def _request(path: str) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    LOOP.run_until_complete(app(scope, _receive, _send))
+
+
+@benchmark("deps")
+def request_no_dependencies():
+    _request("/baseline")
+
+
+@benchmark("deps")
+def request_legacy_auth_service():
+    _request("/legacy")
+
+
+@benchmark("deps")
+def request_singleton_auth_service():
+    _request("/current")
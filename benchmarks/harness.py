@@ -0,0 +1,210 @@
+import gc
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Optional
+
+
+@dataclass
+class Benchmark:
+    name: str
+    func: Callable[[], Any]
+    group: str
+    min_time: float = 1.0
+    max_iterations: int = 100_000
+    warmup: int = 3
+
+
+@dataclass
+class Result:
+    name: str
+    group: str
+    iterations: int
+    ops_per_sec: float
+    mean_us: float
+    p50_us: float
+    p95_us: float
+    p99_us: float
+    peak_python_kib: float
+    peak_rss_growth_kib: float
+    extra: dict[str, Any] = field(default_factory=dict)
+
+
+_registry: list[Benchmark] = []
+
+
+def benchmark(
+    group: str,
+    name: Optional[str] = None,
+    min_time: float = 1.0,
+    max_iterations: int = 100_000,
+    warmup: int = 3,
+):
+    def decorator(func: Callable[[], Any]) -> Callable[[], Any]:
+        _registry.append(
+            Benchmark(
+                name=name or func.__name__,
+                func=func,
+                group=group,
+                min_time=min_time,
+                max_iterations=max_iterations,
+                warmup=warmup,
+            )
+        )
+        return func
+
+    return decorator
+
+
+def registered(pattern: Optional[str] = None) -> list[Benchmark]:
+    if pattern is None:
+        return list(_registry)
+    return [b for b in _registry if pattern in b.name or pattern in b.group]
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    index = min(
+        len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1)))
+    )
+    return sorted_values[index]
+
+
+def _max_rss_kib() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KiB on Linux.
+    return rss / 1024 if sys.platform == "darwin" else float(rss)
+
+
+def _peak_rss_growth_kib(func: Callable[[], Any]) -> float:
+    # ru_maxrss only ever grows, so one call is measured in a forked child
+    # to capture native allocations (argon2 memory) per benchmark.
+    if not hasattr(os, "fork"):
+        return 0.0
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        before = _max_rss_kib()
+        func()
+        os.write(write_fd, str(_max_rss_kib() - before).encode())
+        os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        output = f.read()
+    os.waitpid(pid, 0)
+    return max(0.0, float(output or 0))
+
+
+def run_benchmark(bench: Benchmark, time_scale: float = 1.0) -> Result:
+    for _ in range(bench.warmup):
+        bench.func()
+
+    gc.collect()
+    rss_growth = _peak_rss_growth_kib(bench.func)
+    tracemalloc.start()
+    bench.func()
+    _, peak_python = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings: list[float] = []
+    deadline = time.perf_counter() + bench.min_time * time_scale
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while len(timings) < bench.max_iterations:
+            started = time.perf_counter_ns()
+            bench.func()
+            timings.append((time.perf_counter_ns() - started) / 1000)
+            if time.perf_counter() >= deadline:
+                break
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    timings.sort()
+    mean = statistics.fmean(timings)
+    return Result(
+        name=bench.name,
+        group=bench.group,
+        iterations=len(timings),
+        ops_per_sec=1_000_000 / mean if mean else float("inf"),
+        mean_us=mean,
+        p50_us=_percentile(timings, 50),
+        p95_us=_percentile(timings, 95),
+        p99_us=_percentile(timings, 99),
+        peak_python_kib=peak_python / 1024,
+        peak_rss_growth_kib=rss_growth,
+    )
+
+
+def environment() -> dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def save_results(path: str, results: list[Result]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                "environment": environment(),
+                "results": [asdict(r) for r in results],
+            },
+            f,
+            indent=2,
+        )
+
+
+def load_results(path: str) -> dict[str, dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return {r["name"]: r for r in data["results"]}
+
+
+def compare(
+    results: list[Result],
+    baseline: dict[str, dict[str, Any]],
+    max_regression: float,
+) -> list[str]:
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if base is None:
+            continue
+        throughput_change = result.ops_per_sec / base["ops_per_sec"] - 1
+        p95_change = result.p95_us / base["p95_us"] - 1
+        result.extra["ops_change"] = throughput_change
+        result.extra["p95_change"] = p95_change
+        if throughput_change < -max_regression or p95_change > max_regression:
+            regressions.append(
+                f"{result.name}: ops/sec {throughput_change:+.1%}, p95 {p95_change:+.1%}"
+            )
+    return regressions
+
+
+def print_table(results: list[Result]) -> None:
+    header = (
+        f"{'benchmark':<34}{'ops/sec':>12}{'p50 us':>11}{'p95 us':>11}"
+        f"{'p99 us':>11}{'py KiB':>10}{'rss KiB':>10}{'vs base':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        change = r.extra.get("ops_change")
+        change_str = f"{change:+.1%}" if change is not None else ""
+        print(
+            f"{r.name:<34}{r.ops_per_sec:>12,.1f}{r.p50_us:>11.1f}{r.p95_us:>11.1f}"
+            f"{r.p99_us:>11.1f}{r.peak_python_kib:>10.1f}"
+            f"{r.peak_rss_growth_kib:>10.0f}{change_str:>9}"
+        )
@@ -0,0 +1,220 @@
+"""Round trips and latency of the registration write path.
+
+Compares the previous flow (email checked twice, separate commit+refresh for
+the user and the verification code) with UserService.create_user. For new
+emails, password hashing is done once up front so only database work is
+measured. The duplicate rows register an existing email and include
+hashing: "dup-hash" hashes before the insert hits its conflict, "dup-check"
+is create_user, which rejects the email with one primary lookup first.
+Runs against the database from Settings and removes the users it creates:
+
+    python -m benchmarks.register_roundtrips --iterations 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, event
+
+from app.core.cache import get_user_cache
+from app.core.session import AsyncSessionLocal, dispose_engines, get_engine
+from app.core.utils.security import (
+    hash_password,
+    hash_password_async,
+    shutdown_hash_executor,
+)
+from app.db.models.code import VerificationCode
+from app.db.models.outbox import EmailOutbox
+from app.db.models.user import User
+from app.db.repo.code import VerificationCodeRepository
+from app.db.repo.outbox import EmailOutboxRepository
+from app.db.repo.user import UserRepository
+from app.schemas.user import UserCreate
+from app.services.user import UserService
+
+EMAIL_DOMAIN = "bench.example.com"
+
+
+class RoundTripCounter:
+    def __init__(self):
+        self.statements = 0
+        self.begins = 0
+        self.commits = 0
+
+    def install(self) -> None:
+        sync_engine = get_engine().sync_engine
+        event.listen(sync_engine, "before_cursor_execute", self._on_execute)
+        event.listen(sync_engine, "begin", self._on_begin)
+        event.listen(sync_engine, "commit", self._on_commit)
+
+    def reset(self) -> None:
+        self.statements = self.begins = self.commits = 0
+
+    @property
+    def round_trips(self) -> int:
+        return self.statements + self.begins + self.commits
+
+    def _on_execute(self, *args) -> None:
+        self.statements += 1
+
+    def _on_begin(self, *args) -> None:
+        self.begins += 1
+
+    def _on_commit(self, *args) -> None:
+        self.commits += 1
+
+
+async def legacy_register(user_create: UserCreate, password_hash: str) -> None:
+    async with AsyncSessionLocal() as session:
+        user_repo = UserRepository(session)
+        await user_repo.get_by_email(user_create.email)
+        await user_repo.get_by_email(user_create.email)
+        user = await user_repo.create(
+            User(
+                email=user_create.email,
+                password_hash=password_hash,
+                username=user_create.username,
+                is_active=False,
+                is_verified=False,
+                is_superuser=False,
+            )
+        )
+        await VerificationCodeRepository(session).create(
+            VerificationCode(
+                user_id=user.id,
+                code="123456",
+                expires_at=datetime.now(timezone.utc) + timedelta(minutes=15),
+            )
+        )
+
+
+def _service(session) -> UserService:
+    return UserService(
+        UserRepository(session, cache=get_user_cache()),
+        VerificationCodeRepository(session),
+        EmailOutboxRepository(session),
+    )
+
+
+async def current_register(user_create: UserCreate, password_hash: str) -> None:
+    # UserService.create_user without the hash: email check, then insert.
+    async with AsyncSessionLocal() as session:
+        service = _service(session)
+        if await service.user_repo.email_exists(user_create.email):
+            raise ValueError("User with email already exists")
+        await service.create_user_with_hash(user_create, password_hash)
+
+
+async def duplicate_hash_first(user_create: UserCreate, password_hash: str) -> None:
+    async with AsyncSessionLocal() as session:
+        new_hash = await hash_password_async(user_create.password)
+        try:
+            await _service(session).create_user_with_hash(user_create, new_hash)
+        except ValueError:
+            pass
+
+
+async def duplicate_check_first(user_create: UserCreate, password_hash: str) -> None:
+    async with AsyncSessionLocal() as session:
+        try:
+            await _service(session).create_user(user_create)
+        except ValueError:
+            pass
+
+
+def _new_user() -> UserCreate:
+    return UserCreate(
+        email=f"{uuid.uuid4().hex}@{EMAIL_DOMAIN}",
+        username="bench_user",
+        password="benchmark-password",
+    )
+
+
+async def measure(
+    name, register, iterations, password_hash, counter, user_create=None
+) -> dict:
+    latencies = []
+    counter.reset()
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await register(user_create or _new_user(), password_hash)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    latencies.sort()
+    return {
+        "path": name,
+        "round_trips": counter.round_trips / iterations,
+        "statements": counter.statements / iterations,
+        "transactions": counter.commits / iterations,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+async def cleanup() -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            delete(EmailOutbox).where(EmailOutbox.recipient.like(f"%@{EMAIL_DOMAIN}"))
+        )
+        await session.execute(delete(User).where(User.email.like(f"%@{EMAIL_DOMAIN}")))
+        await session.commit()
+
+
+async def main(iterations: int) -> None:
+    password_hash = hash_password("benchmark-password")
+    counter = RoundTripCounter()
+    counter.install()
+    try:
+        existing = _new_user()
+        await current_register(existing, password_hash)
+        results = [
+            await measure(
+                "before", legacy_register, iterations, password_hash, counter
+            ),
+            await measure(
+                "after", current_register, iterations, password_hash, counter
+            ),
+            await measure(
+                "dup-hash",
+                duplicate_hash_first,
+                iterations,
+                password_hash,
+                counter,
+                existing,
+            ),
+            await measure(
+                "dup-check",
+                duplicate_check_first,
+                iterations,
+                password_hash,
+                counter,
+                existing,
+            ),
+        ]
+    finally:
+        await cleanup()
+        await dispose_engines()
+        shutdown_hash_executor()
+
+    print(
+        f"{'path':<10}{'round trips':>12}{'statements':>12}"
+        f"{'commits':>10}{'p50 ms':>10}{'p95 ms':>10}"
+    )
+    for r in results:
+        print(
+            f"{r['path']:<10}{r['round_trips']:>12.1f}{r['statements']:>12.1f}"
+            f"{r['transactions']:>10.1f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+        )
+    print("'before' excludes the inline SMTP send it used to perform.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
@@ -0,0 +1,76 @@
+"""Cold import time of the application, as paid by every new worker.
+
+Runs `python -X importtime -c "import app.main"` in fresh interpreters and
+reports the median cumulative import time plus the modules that cost the most.
+With --budget-ms it exits non-zero when the median is over budget, so it can
+guard startup in CI:
+
+    python -m benchmarks.startup --runs 7 --budget-ms 750
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from collections import defaultdict
+
+TARGET = "app.main"
+
+
+def import_profile(module: str) -> dict[str, tuple[int, int]]:
+    env = dict(os.environ)
+    env.setdefault("SECRET_KEY", "startup-benchmark")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        profile[name.strip()] = (int(self_us), int(cumulative_us))
+    return profile
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--module", default=TARGET)
+    parser.add_argument("--budget-ms", type=float)
+    args = parser.parse_args()
+
+    totals = []
+    self_times = defaultdict(list)
+    for _ in range(args.runs):
+        profile = import_profile(args.module)
+        totals.append(profile[args.module][1] / 1000)
+        for name, (self_us, _) in profile.items():
+            self_times[name].append(self_us / 1000)
+
+    median = statistics.median(totals)
+    print(
+        f"import {args.module}: median {median:.1f} ms "
+        f"(min {min(totals):.1f}, max {max(totals):.1f}, runs {args.runs})"
+    )
+    print(f"\n{'self ms':>10}  module")
+    slowest = sorted(
+        self_times.items(), key=lambda item: statistics.median(item[1]), reverse=True
+    )
+    for name, times in slowest[: args.top]:
+        print(f"{statistics.median(times):>10.1f}  {name}")
+
+    if args.budget_ms is not None and median > args.budget_ms:
+        print(f"\nover budget: {median:.1f} ms > {args.budget_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
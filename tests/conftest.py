@@ -0,0 +1,147 @@
+import os
+
+# Settings are read at import time, so the environment is prepared before any
+# app module is imported: cheap argon2 costs, no Redis, no background workers.
+os.environ.update(
+    {
+        "SECRET_KEY": "test-secret-key-with-enough-length-for-hs256",
+        "REDIS_ENABLED": "false",
+        "TOKEN_REVOCATION_STORE": "memory",
+        "VERIFICATION_CODE_STORE": "sql",
+        "RATE_LIMIT_ENABLED": "false",
+        "AUTH_EVENTS_ENABLED": "false",
+        "OUTBOX_WORKER_ENABLED": "false",
+        "CODE_SWEEPER_ENABLED": "false",
+        "OUTBOX_PURGE_ENABLED": "false",
+        "SECURITY_REHASH_ON_LOGIN": "false",
+        "SECURITY_ARGON2_TIME_COST": "1",
+        "SECURITY_ARGON2_MEMORY_COST": "1024",
+        "SECURITY_ARGON2_PARALLELISM": "1",
+        "SECURITY_HASH_POOL_SIZE": "1",
+        "ADMIN_ENABLED": "false",
+    }
+)
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+import app.core.session as session_module  # noqa: E402
+from app.core.cache import user_cache  # noqa: E402
+from app.core.utils.jwt import verified_tokens  # noqa: E402
+from app.core.utils.security import hash_password, shutdown_hash_executor  # noqa: E402
+from app.core.utils.token_version import token_versions  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.models.auth_event import AuthEvent  # noqa: E402,F401
+from app.db.models.code import VerificationCode  # noqa: E402,F401
+from app.db.models.outbox import EmailOutbox  # noqa: E402,F401
+from app.db.models.user import User  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+PASSWORD = "correct-horse-battery"
+
+
+class StatementCounter:
+    def __init__(self):
+        self.statements: list[str] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def reset(self) -> None:
+        self.statements.clear()
+
+
+class SessionTracker:
+    def __init__(self):
+        self.created = 0
+
+    def __call__(self):
+        self.created += 1
+        return session_module.get_sessionmaker()()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def hash_pool():
+    yield
+    shutdown_hash_executor()
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_module._engine = engine
+    session_module._sessionmaker = None
+    user_cache.local.clear()
+    verified_tokens.clear()
+    token_versions.clear()
+    yield engine
+    await session_module.dispose_engines()
+
+
+@pytest.fixture
+def statements(engine):
+    counter = StatementCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(engine.sync_engine, "before_cursor_execute", counter)
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    tracker = SessionTracker()
+    monkeypatch.setattr(session_module, "AsyncSessionLocal", tracker)
+    return tracker
+
+
+@pytest.fixture
+async def client(engine):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+@pytest.fixture
+def password():
+    return PASSWORD
+
+
+@pytest.fixture
+async def user(engine):
+    async with session_module.AsyncSessionLocal() as session:
+        user = User(
+            email="player@example.com",
+            username="player",
+            password_hash=hash_password(PASSWORD),
+            is_active=True,
+            is_verified=True,
+            is_superuser=False,
+            token_version=0,
+        )
+        session.add(user)
+        await session.commit()
+        await session.refresh(user)
+        return user
+
+
+@pytest.fixture
+async def access_token(client, user):
+    response = await client.post(
+        "/api/v1/auth/login", json={"email": user.email, "password": PASSWORD}
+    )
+    assert response.status_code == 200
+    return response.json()["access_token"]
@@ -0,0 +1,83 @@
+import pytest
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.session import AsyncSessionLocal
+from app.db.models.auth_event import AuthEvent
+from app.db.repo.auth_event import AuthEventRepository
+from app.services.audit import AuthEventRecorder
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    monkeypatch.setattr(settings, "auth_events_enabled", True)
+    monkeypatch.setattr(settings, "auth_events_batch_size", 2)
+    monkeypatch.setattr(settings, "auth_events_max_buffer", 3)
+    return AuthEventRecorder()
+
+
+def record(recorder, *emails):
+    for email in emails:
+        recorder.record("login", "success", email=email)
+
+
+def buffered_emails(recorder):
+    return [item[1] for item in recorder._buffer]
+
+
+def test_full_buffer_drops_new_events(recorder):
+    record(recorder, "a@x.io", "b@x.io", "c@x.io", "d@x.io", "e@x.io")
+
+    assert buffered_emails(recorder) == ["a@x.io", "b@x.io", "c@x.io"]
+    assert recorder.recorded_total == 3
+    assert recorder.dropped_total == 2
+
+
+async def test_failed_batch_is_requeued_in_order(recorder, monkeypatch):
+    async def broken_insert(self, records):
+        raise ConnectionError("database is down")
+
+    monkeypatch.setattr(AuthEventRepository, "bulk_insert", broken_insert)
+    record(recorder, "a@x.io", "b@x.io", "c@x.io")
+
+    with pytest.raises(ConnectionError):
+        await recorder.run_once()
+
+    assert buffered_emails(recorder) == ["a@x.io", "b@x.io", "c@x.io"]
+    assert recorder.failed_batches == 1
+    assert recorder.dropped_total == 0
+
+
+async def test_failed_batch_is_dropped_when_the_buffer_refilled(
+    recorder, monkeypatch
+):
+    async def broken_insert(self, records):
+        # New events arrive while the write is in flight.
+        record(recorder, "d@x.io", "e@x.io")
+        raise ConnectionError("database is down")
+
+    monkeypatch.setattr(AuthEventRepository, "bulk_insert", broken_insert)
+    record(recorder, "a@x.io", "b@x.io", "c@x.io")
+
+    with pytest.raises(ConnectionError):
+        await recorder.run_once()
+
+    assert buffered_emails(recorder) == ["c@x.io", "d@x.io", "e@x.io"]
+    assert recorder.dropped_total == 2
+
+
+async def test_stop_flushes_the_buffer(engine, recorder):
+    recorder.start()
+    record(recorder, "a@x.io", "b@x.io", "c@x.io")
+
+    await recorder.stop()
+
+    async with AsyncSessionLocal() as session:
+        written = await session.scalar(select(func.count(AuthEvent.id)))
+    assert written == 3
+    assert recorder.written_total == 3
+    assert recorder.stats()["buffered"] == 0
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from app.core.background import BackgroundWorker
+
+
+pytestmark = pytest.mark.anyio
+
+
+class CountingWorker(BackgroundWorker):
+    name = "counting-worker"
+
+    def __init__(self, pending: int):
+        super().__init__(interval=60.0, stop_timeout=1.0)
+        self.pending = pending
+        self.runs = 0
+        self.stopped = False
+
+    async def run_once(self) -> bool:
+        self.runs += 1
+        self.pending = max(self.pending - 1, 0)
+        return self.pending > 0
+
+    async def on_stop(self) -> None:
+        self.stopped = True
+
+
+def test_run_once_is_required():
+    class Incomplete(BackgroundWorker):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete(interval=1.0)
+
+
+async def test_worker_drains_pending_work_then_waits_for_notify():
+    worker = CountingWorker(pending=3)
+    worker.start()
+    await asyncio.sleep(0.01)
+    assert worker.runs == 3
+
+    worker.notify()
+    await asyncio.sleep(0.01)
+    assert worker.runs == 4
+
+    await worker.stop()
+    assert worker.stopped
+    assert not worker.running
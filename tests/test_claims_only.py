@@ -0,0 +1,89 @@
+import asyncio
+
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.core.config import settings
+from app.core.session import AsyncSessionLocal, session_scope
+from app.core.utils.token_version import token_versions
+from app.db.models.user import User
+from app.deps.user import shared_user_service
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def claims_only(monkeypatch):
+    monkeypatch.setattr(settings, "auth_claims_only", True)
+
+
+async def test_me_from_claims_does_not_open_a_session(
+    claims_only, client, access_token, sessions, statements
+):
+    # The first call fills the user cache and the token version cache.
+    response = await client.get(
+        "/api/v1/auth/me", headers={"Authorization": f"Bearer {access_token}"}
+    )
+    assert response.status_code == 200
+
+    sessions.created = 0
+    statements.reset()
+    response = await client.get(
+        "/api/v1/auth/me", headers={"Authorization": f"Bearer {access_token}"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["email"] == "player@example.com"
+    assert sessions.created == 0
+    assert statements.count == 0
+
+
+async def test_me_without_claims_only_checks_the_user(
+    client, access_token, sessions
+):
+    await client.get(
+        "/api/v1/auth/me", headers={"Authorization": f"Bearer {access_token}"}
+    )
+    sessions.created = 0
+
+    response = await client.get(
+        "/api/v1/auth/me", headers={"Authorization": f"Bearer {access_token}"}
+    )
+
+    assert response.status_code == 200
+    assert sessions.created == 1
+
+
+async def test_claims_only_rejects_a_revoked_token_version(
+    claims_only, client, access_token, user
+):
+    await client.get(
+        "/api/v1/auth/me", headers={"Authorization": f"Bearer {access_token}"}
+    )
+    async with asynccontextmanager(session_scope)():
+        assert await shared_user_service().revoke_tokens(user.id)
+
+    response = await client.get(
+        "/api/v1/auth/me", headers={"Authorization": f"Bearer {access_token}"}
+    )
+
+    assert response.status_code == 401
+
+
+async def revoke(user_id):
+    async with asynccontextmanager(session_scope)():
+        return await shared_user_service().revoke_tokens(user_id)
+
+
+async def test_concurrent_revocations_each_bump_the_version(user):
+    assert await asyncio.gather(revoke(user.id), revoke(user.id)) == [True, True]
+
+    async with AsyncSessionLocal() as session:
+        assert (await session.get(User, user.id)).token_version == 2
+    assert token_versions.get(user.id) in (1, 2)
+
+
+async def test_revoking_an_unknown_user(engine):
+    assert not await revoke(12345)
@@ -0,0 +1,166 @@
+import pytest
+
+from fastapi import HTTPException
+from redis.exceptions import ConnectionError
+
+import app.db.repo.code_store as code_store
+from app.core.config import settings
+from app.core.session import AsyncSessionLocal
+from app.db.repo.code import VerificationCodeRepository
+from app.db.repo.code_store import (
+    InMemoryVerificationCodeStore,
+    RedisVerificationCodeStore,
+    SqlVerificationCodeStore,
+    get_code_store,
+)
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def store():
+    return InMemoryVerificationCodeStore(max_attempts=3)
+
+
+async def test_consume_accepts_the_code_once(store):
+    await store.issue(1, "123456", 900)
+
+    assert await store.get_active_code(1) == "123456"
+    assert await store.consume(1, "123456")
+    assert not await store.consume(1, "123456")
+    assert await store.get_active_code(1) is None
+
+
+async def test_codes_are_per_user(store):
+    await store.issue(1, "123456", 900)
+
+    assert not await store.consume(2, "123456")
+    assert await store.consume(1, "123456")
+
+
+async def test_wrong_codes_burn_the_code_after_max_attempts(store):
+    await store.issue(1, "123456", 900)
+
+    assert not await store.consume(1, "000000")
+    assert not await store.consume(1, "000000")
+    assert await store.get_active_code(1) == "123456"
+    assert not await store.consume(1, "000000")
+
+    assert await store.get_active_code(1) is None
+    assert not await store.consume(1, "123456")
+
+
+async def test_reissue_resets_attempts(store):
+    await store.issue(1, "123456", 900)
+    await store.consume(1, "000000")
+    await store.consume(1, "000000")
+    await store.issue(1, "654321", 900)
+
+    assert not await store.consume(1, "000000")
+    assert await store.consume(1, "654321")
+
+
+async def test_expired_codes_are_rejected(store, monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(code_store.time, "monotonic", lambda: now)
+    await store.issue(1, "123456", 60)
+
+    now += 60
+
+    assert await store.get_active_code(1) is None
+    assert not await store.consume(1, "123456")
+
+
+class BrokenRedis:
+    def pipeline(self, transaction=True):
+        raise ConnectionError("connection refused")
+
+    async def hget(self, *args):
+        raise ConnectionError("connection refused")
+
+    async def eval(self, *args):
+        raise ConnectionError("connection refused")
+
+
+@pytest.mark.parametrize(
+    "call",
+    [
+        lambda store: store.issue(1, "123456", 900),
+        lambda store: store.get_active_code(1),
+        lambda store: store.consume(1, "123456"),
+    ],
+)
+async def test_redis_outage_is_reported_as_unavailable(call, monkeypatch):
+    monkeypatch.setattr(code_store, "get_redis", lambda: BrokenRedis())
+
+    with pytest.raises(HTTPException) as exc_info:
+        await call(RedisVerificationCodeStore(max_attempts=3))
+
+    assert exc_info.value.status_code == 503
+
+
+@pytest.fixture
+def unresolved(monkeypatch):
+    monkeypatch.setattr(code_store, "_code_store", None)
+    monkeypatch.setattr(code_store, "_code_store_resolved", False)
+
+
+def test_redis_store_without_redis_fails_fast(unresolved, monkeypatch):
+    monkeypatch.setattr(settings, "verification_code_store", "redis")
+    monkeypatch.setattr(settings, "REDIS_ENABLED", False)
+
+    with pytest.raises(RuntimeError):
+        get_code_store()
+
+
+def test_unknown_store_fails_fast(unresolved, monkeypatch):
+    monkeypatch.setattr(settings, "verification_code_store", "redsi")
+
+    with pytest.raises(RuntimeError):
+        get_code_store()
+
+
+def test_sql_store(unresolved, monkeypatch):
+    monkeypatch.setattr(settings, "verification_code_store", "sql")
+
+    assert isinstance(get_code_store(), SqlVerificationCodeStore)
+
+
+def test_memory_store_is_refused_with_several_workers(unresolved, monkeypatch):
+    monkeypatch.setattr(settings, "verification_code_store", "memory")
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+
+    with pytest.raises(RuntimeError):
+        get_code_store()
+
+
+async def test_sql_codes_are_burned_after_max_attempts(user, monkeypatch):
+    monkeypatch.setattr(settings, "verification_code_max_attempts", 3)
+    async with AsyncSessionLocal() as session:
+        repo = VerificationCodeRepository(session)
+        await repo.issue(user.id, "123456", 900)
+        await session.commit()
+
+        assert not await repo.consume(user.id, "000000")
+        assert not await repo.consume(user.id, "000000")
+        assert await repo.get_active_code(user.id) == "123456"
+        assert not await repo.consume(user.id, "000000")
+
+        assert await repo.get_active_code(user.id) is None
+        assert not await repo.consume(user.id, "123456")
+
+
+async def test_sql_reissue_gets_fresh_attempts(user, monkeypatch):
+    monkeypatch.setattr(settings, "verification_code_max_attempts", 2)
+    async with AsyncSessionLocal() as session:
+        repo = VerificationCodeRepository(session)
+        await repo.issue(user.id, "123456", 900)
+        await session.commit()
+        await repo.consume(user.id, "000000")
+        await repo.consume(user.id, "000000")
+        await repo.issue(user.id, "654321", 900)
+        await session.commit()
+
+        assert not await repo.consume(user.id, "123456")
+        assert await repo.consume(user.id, "654321")
@@ -0,0 +1,149 @@
+import asyncio
+
+from email.message import Message
+
+import aiosmtplib
+import pytest
+
+import app.services.email as email_module
+from app.services.email import SMTPConnectionPool
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeSMTP:
+    instances: list["FakeSMTP"] = []
+    # Exceptions raised by the next send_message calls, None = success.
+    send_results: list = []
+    noop_error = None
+
+    def __init__(self, **kwargs):
+        self.is_connected = False
+        self.sent = 0
+        self.calls = []
+        FakeSMTP.instances.append(self)
+
+    async def connect(self):
+        self.is_connected = True
+
+    async def login(self, username, password):
+        pass
+
+    async def noop(self):
+        self.calls.append("noop")
+        if FakeSMTP.noop_error is not None:
+            raise FakeSMTP.noop_error
+
+    async def rset(self):
+        self.calls.append("rset")
+
+    async def send_message(self, message):
+        error = FakeSMTP.send_results.pop(0) if FakeSMTP.send_results else None
+        if error is not None:
+            raise error
+        self.sent += 1
+
+    async def quit(self):
+        self.calls.append("quit")
+        self.is_connected = False
+
+    def close(self):
+        self.calls.append("close")
+        self.is_connected = False
+
+
+@pytest.fixture(autouse=True)
+def fake_smtp(monkeypatch):
+    FakeSMTP.instances = []
+    FakeSMTP.send_results = []
+    FakeSMTP.noop_error = None
+    monkeypatch.setattr(email_module.aiosmtplib, "SMTP", FakeSMTP)
+
+
+def pool(size=1, idle_check_seconds=60.0, max_messages_per_connection=100):
+    return SMTPConnectionPool(
+        hostname="smtp.example.com",
+        port=587,
+        username="user",
+        password="secret",
+        size=size,
+        idle_check_seconds=idle_check_seconds,
+        timeout=1.0,
+        max_messages_per_connection=max_messages_per_connection,
+    )
+
+
+async def test_connection_is_reused():
+    smtp_pool = pool()
+
+    await smtp_pool.send_message(Message())
+    await smtp_pool.send_message(Message())
+
+    assert len(FakeSMTP.instances) == 1
+    assert FakeSMTP.instances[0].sent == 2
+
+
+async def test_connection_is_recycled_after_max_messages():
+    smtp_pool = pool(max_messages_per_connection=2)
+
+    for _ in range(3):
+        await smtp_pool.send_message(Message())
+
+    first, second = FakeSMTP.instances
+    assert first.sent == 2 and "quit" in first.calls
+    assert second.sent == 1
+
+
+async def test_failed_noop_on_acquire_opens_a_new_connection():
+    smtp_pool = pool(idle_check_seconds=0)
+    await smtp_pool.send_message(Message())
+    FakeSMTP.noop_error = aiosmtplib.SMTPServerDisconnected("gone")
+
+    await smtp_pool.send_message(Message())
+
+    first, second = FakeSMTP.instances
+    assert first.calls == ["noop", "close"]
+    assert second.sent == 1
+
+
+@pytest.mark.parametrize(
+    "error",
+    [asyncio.CancelledError(), aiosmtplib.SMTPTimeoutError("timed out in DATA")],
+)
+async def test_connection_is_closed_on_an_interrupted_send(error):
+    smtp_pool = pool()
+    FakeSMTP.send_results = [error]
+
+    with pytest.raises(type(error)):
+        await smtp_pool.send_message(Message())
+    await smtp_pool.send_message(Message())
+
+    first, second = FakeSMTP.instances
+    assert "close" in first.calls
+    assert "rset" not in first.calls
+    assert second.sent == 1
+
+
+async def test_refused_message_resets_and_keeps_the_connection():
+    smtp_pool = pool()
+    FakeSMTP.send_results = [aiosmtplib.SMTPResponseException(550, "no such user")]
+
+    with pytest.raises(aiosmtplib.SMTPResponseException):
+        await smtp_pool.send_message(Message())
+    await smtp_pool.send_message(Message())
+
+    (connection,) = FakeSMTP.instances
+    assert connection.calls == ["rset"]
+    assert connection.sent == 1
+
+
+async def test_lost_connection_is_retried_once_on_a_new_one():
+    smtp_pool = pool()
+    FakeSMTP.send_results = [aiosmtplib.SMTPServerDisconnected("gone")]
+
+    await smtp_pool.send_message(Message())
+
+    first, second = FakeSMTP.instances
+    assert first.calls == ["close"]
+    assert second.sent == 1
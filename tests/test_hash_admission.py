@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from fastapi import HTTPException
+
+from app.core.utils.security import HashAdmissionController
+
+
+pytestmark = pytest.mark.anyio
+
+
+def controller(
+    memory_budget_kib=100, max_concurrency=1, max_queue=2, queue_timeout=5.0
+):
+    return HashAdmissionController(
+        memory_budget_kib=memory_budget_kib,
+        max_concurrency=max_concurrency,
+        max_queue=max_queue,
+        queue_timeout=queue_timeout,
+    )
+
+
+async def waiting(admission, cost_kib):
+    task = asyncio.create_task(admission.acquire(cost_kib))
+    await asyncio.sleep(0)
+    assert not task.done()
+    return task
+
+
+async def test_full_queue_is_rejected_with_503():
+    admission = controller(max_queue=1)
+    await admission.acquire(10)
+    queued = await waiting(admission, 10)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await admission.acquire(10)
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"]
+    assert admission.rejected_total == 1
+    queued.cancel()
+    await asyncio.gather(queued, return_exceptions=True)
+
+
+async def test_queue_timeout_is_rejected_with_503():
+    admission = controller(queue_timeout=0.01)
+    await admission.acquire(10)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await admission.acquire(10)
+
+    assert exc_info.value.status_code == 503
+    assert admission.queued == 0
+    assert admission.in_flight == 1
+
+
+async def test_waiters_are_woken_in_order():
+    admission = controller()
+    await admission.acquire(10)
+    first = await waiting(admission, 10)
+    second = await waiting(admission, 10)
+
+    admission.release(10)
+    await asyncio.sleep(0)
+    assert first.done()
+    assert not second.done()
+
+    admission.release(10)
+    await asyncio.sleep(0)
+    assert second.done()
+    assert admission.in_flight == 1
+    assert admission.waited_total == 2
+
+
+async def test_memory_budget_blocks_below_the_concurrency_limit():
+    admission = controller(memory_budget_kib=100, max_concurrency=4)
+    await admission.acquire(60)
+    queued = await waiting(admission, 60)
+
+    admission.release(60)
+    await asyncio.sleep(0)
+
+    assert queued.done()
+    assert admission.memory_in_use_kib == 60
+
+
+async def test_oversize_hash_is_admitted_only_when_idle():
+    admission = controller(memory_budget_kib=100, max_concurrency=4)
+    await admission.acquire(500)
+    assert admission.in_flight == 1
+
+    queued = await waiting(admission, 10)
+    admission.release(500)
+    await asyncio.sleep(0)
+
+    assert queued.done()
+    assert admission.memory_in_use_kib == 10
+
+
+async def test_cancelled_waiter_leaves_the_queue():
+    admission = controller()
+    await admission.acquire(10)
+    queued = await waiting(admission, 10)
+
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+
+    assert admission.queued == 0
+    admission.release(10)
+    assert admission.in_flight == 0
+
+
+async def test_waiter_cancelled_after_admission_releases_its_slot():
+    admission = controller()
+    await admission.acquire(10)
+    queued = await waiting(admission, 10)
+
+    # Admitted by the release, cancelled before it got to run.
+    admission.release(10)
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+
+    assert admission.in_flight == 0
+    assert admission.memory_in_use_kib == 0
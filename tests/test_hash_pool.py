@@ -0,0 +1,61 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from fastapi import HTTPException
+
+import app.core.utils.security as security
+from app.core.config import settings
+from app.core.utils.security import HashAdmissionController, get_hash_executor
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def admission(monkeypatch):
+    controller = HashAdmissionController(
+        memory_budget_kib=1024, max_concurrency=1, max_queue=4, queue_timeout=5.0
+    )
+    monkeypatch.setattr(security, "_hash_admission", controller)
+    return controller
+
+
+async def test_timed_out_job_keeps_its_slot_until_it_finishes(admission, monkeypatch):
+    monkeypatch.setattr(settings, "security_hash_timeout_seconds", 0.05)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await security._run_in_hash_pool(64, time.sleep, 0.5)
+
+    assert exc_info.value.status_code == 503
+    assert admission.in_flight == 1
+    assert admission.memory_in_use_kib == 64
+
+    deadline = time.monotonic() + 5
+    while admission.in_flight and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    assert admission.in_flight == 0
+    assert admission.memory_in_use_kib == 0
+
+
+async def test_broken_pool_is_shut_down_and_replaced(admission, monkeypatch):
+    executor = get_hash_executor()
+    shutdown_calls = []
+    shutdown = executor.shutdown
+
+    def record_shutdown(*args, **kwargs):
+        shutdown_calls.append(kwargs)
+        shutdown(*args, **kwargs)
+
+    monkeypatch.setattr(executor, "shutdown", record_shutdown)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await security._run_in_hash_pool(64, os._exit, 1)
+
+    assert exc_info.value.status_code == 503
+    assert shutdown_calls
+    assert get_hash_executor() is not executor
+    assert await security._run_in_hash_pool(64, abs, -3) == 3
+    assert admission.in_flight == 0
@@ -0,0 +1,173 @@
+import argparse
+import csv
+import json
+import sys
+
+import pytest
+
+from sqlalchemy import select
+
+from app.cli import import_users
+from app.core.config import settings
+from app.core.session import AsyncSessionLocal
+from app.core.utils.security import hash_password
+from app.db.models.code import VerificationCode
+from app.db.models.outbox import EmailOutbox
+from app.db.models.user import User
+
+
+def test_send_verification_refused_with_the_memory_code_store(
+    monkeypatch, tmp_path, capsys
+):
+    monkeypatch.setattr(settings, "verification_code_store", "memory")
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["import_users", str(tmp_path / "players.csv"), "--send-verification"],
+    )
+
+    with pytest.raises(SystemExit) as exc_info:
+        import_users.main()
+
+    assert exc_info.value.code == 2
+    assert "VERIFICATION_CODE_STORE" in capsys.readouterr().err
+
+
+def write_jsonl(path, *lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def record(email, username="player", **extra):
+    return json.dumps({"email": email, "username": username, **extra})
+
+
+@pytest.fixture
+def report(tmp_path):
+    path = tmp_path / "rejected.csv"
+    report = import_users.RejectReport(str(path))
+    yield report
+
+    report.close()
+
+
+def rejected(tmp_path):
+    with open(tmp_path / "rejected.csv", encoding="utf-8") as f:
+        return [(int(row["line"]), row["reason"]) for row in csv.DictReader(f)]
+
+
+def test_parse_record_with_password_or_hash():
+    argon2_hash = hash_password("correct-horse-battery")
+
+    hashed = import_users.parse_record(
+        1, {"email": "a@example.com", "username": "alpha", "password_hash": argon2_hash}
+    )
+    plain = import_users.parse_record(
+        2, {"email": "b@example.com", "username": "bravo", "password": "long-password"}
+    )
+
+    assert (hashed.email, hashed.password, hashed.password_hash) == (
+        "a@example.com",
+        None,
+        argon2_hash,
+    )
+    assert (plain.password, plain.password_hash) == ("long-password", None)
+    with pytest.raises(ValueError):
+        import_users.parse_record(
+            3,
+            {"email": "c@example.com", "username": "charlie", "password_hash": "md5"},
+        )
+
+
+def test_csv_records_are_numbered_from_the_header(tmp_path):
+    path = tmp_path / "players.csv"
+    path.write_text(
+        "email,username,password\na@example.com,a,long-password\n", encoding="utf-8"
+    )
+
+    records = list(import_users.read_records(str(path), "csv"))
+
+    assert [(line, row["email"]) for line, row in records] == [(2, "a@example.com")]
+
+
+def test_bad_lines_are_reported_and_the_import_goes_on(tmp_path, report):
+    path = write_jsonl(
+        tmp_path / "players.jsonl",
+        record("a@example.com", "alpha", password="long-password"),
+        "{not json",
+        '["an", "array"]',
+        record("b@example.com", "bravo", password_hash=5),
+        record("not-an-email", "charlie", password="long-password"),
+        record("d@example.com", "delta", password="long-password"),
+        record("e@example.com", "echo", password="long-password"),
+    )
+    stats = import_users.ImportStats()
+
+    batches = list(import_users.batched_rows(path, "jsonl", 2, stats, report))
+    report.close()
+
+    assert [[row.line for row in batch] for batch in batches] == [[1, 6], [7]]
+    assert (stats.read, stats.invalid) == (7, 4)
+    assert [line for line, _ in rejected(tmp_path)] == [2, 3, 4, 5]
+    assert "Invalid JSON" in rejected(tmp_path)[0][1]
+
+
+@pytest.fixture
+def run_args(tmp_path):
+    def make(path):
+        return argparse.Namespace(
+            path=path,
+            format="jsonl",
+            batch_size=2,
+            workers=1,
+            activate=True,
+            send_verification=False,
+            report=str(tmp_path / "rejected.csv"),
+        )
+
+    return make
+
+
+@pytest.mark.anyio
+async def test_existing_and_duplicate_emails_are_reported(
+    tmp_path, user, run_args
+):
+    argon2_hash = hash_password("correct-horse-battery")
+    path = write_jsonl(
+        tmp_path / "players.jsonl",
+        record("new@example.com", "new", password_hash=argon2_hash),
+        record("new@example.com", "twice", password_hash=argon2_hash),
+        record(user.email, "again", password_hash=argon2_hash),
+        record("other@example.com", "other", password_hash=argon2_hash),
+    )
+
+    stats = await import_users.run(run_args(path))
+
+    assert (stats.read, stats.inserted, stats.conflicts) == (4, 2, 2)
+    assert rejected(tmp_path) == [(2, "duplicate in file"), (3, "email exists")]
+    async with AsyncSessionLocal() as session:
+        emails = set(await session.scalars(select(User.email)))
+    assert emails == {user.email, "new@example.com", "other@example.com"}
+
+
+@pytest.mark.anyio
+async def test_send_verification_issues_codes_through_the_store(
+    tmp_path, engine, run_args
+):
+    argon2_hash = hash_password("correct-horse-battery")
+    path = write_jsonl(
+        tmp_path / "players.jsonl",
+        record("alpha@example.com", "alpha", password_hash=argon2_hash),
+        record("bravo@example.com", "bravo", password_hash=argon2_hash),
+    )
+    args = run_args(path)
+    args.activate = False
+    args.send_verification = True
+
+    await import_users.run(args)
+
+    async with AsyncSessionLocal() as session:
+        codes = list(await session.scalars(select(VerificationCode.code)))
+        payloads = list(await session.scalars(select(EmailOutbox.payload)))
+    assert sorted(codes) == sorted(payload["code"] for payload in payloads)
+    assert len(codes) == 2
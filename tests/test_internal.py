@@ -0,0 +1,52 @@
+import httpx
+import pytest
+
+from fastapi import FastAPI
+
+from app.api.internal import router as internal_router
+from app.core.config import settings
+from app.main import app
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def internal_client(engine):
+    internal_app = FastAPI()
+    internal_app.include_router(internal_router)
+    transport = httpx.ASGITransport(app=internal_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+async def test_internal_endpoints_are_off_by_default(client):
+    # Mounts such as /admin carry no .path attribute.
+    assert "/internal/pool" not in {
+        getattr(route, "path", None) for route in app.routes
+    }
+    response = await client.get(
+        "/internal/pool", headers={"Authorization": "Bearer anything"}
+    )
+
+    assert response.status_code == 404
+
+
+async def test_pool_refused_without_a_configured_token(internal_client):
+    response = await internal_client.get(
+        "/internal/pool", headers={"Authorization": "Bearer anything"}
+    )
+
+    assert response.status_code == 403
+
+
+async def test_pool_with_the_internal_token(internal_client, monkeypatch):
+    monkeypatch.setattr(settings, "internal_token", "ops-token")
+
+    assert (await internal_client.get("/internal/pool")).status_code == 403
+    response = await internal_client.get(
+        "/internal/pool", headers={"Authorization": "Bearer ops-token"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["config"]["pool_size"] == settings.db_pool_size
@@ -0,0 +1,149 @@
+import json
+import os
+import time
+
+import pytest
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from fastapi import HTTPException
+
+import app.core.utils.keys as keys_module
+from app.core.config import settings
+from app.core.utils.jwt import create_access_token, verified_tokens, verify_token
+from app.core.utils.keys import KeyRing, jwks_publication_delay_seconds
+
+
+def write_key(keys_dir, kid, age_seconds):
+    path = keys_dir / f"{kid}.pem"
+    path.write_bytes(
+        ed25519.Ed25519PrivateKey.generate().private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    created_at = time.time() - age_seconds
+    os.utime(path, (created_at, created_at))
+    return path
+
+
+def jwks_kids(keyring):
+    return {jwk["kid"] for jwk in json.loads(keyring.jwks_body)["keys"]}
+
+
+@pytest.fixture
+def keys_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "jwks_cache_max_age_seconds", 300)
+    monkeypatch.setattr(settings, "jwks_stale_while_revalidate_seconds", 300)
+    return tmp_path
+
+
+def test_publication_delay_covers_stale_while_revalidate(keys_dir):
+    assert jwks_publication_delay_seconds() == 600
+
+
+def test_new_key_is_published_before_it_signs(keys_dir):
+    write_key(keys_dir, "old", age_seconds=86400)
+    # Past max-age, but a verifier may still serve the previous document.
+    write_key(keys_dir, "new", age_seconds=450)
+    keyring = KeyRing(str(keys_dir))
+    keyring.load()
+
+    assert keyring.signing_key.kid == "old"
+    assert jwks_kids(keyring) == {"old", "new"}
+
+
+def test_new_key_signs_after_the_publication_delay(keys_dir):
+    write_key(keys_dir, "old", age_seconds=86400)
+    write_key(keys_dir, "new", age_seconds=601)
+    keyring = KeyRing(str(keys_dir))
+    keyring.load()
+
+    assert keyring.signing_key.kid == "new"
+    assert keyring.get("old") is not None
+
+
+def test_only_unpublished_keys_sign_with_the_oldest(keys_dir):
+    write_key(keys_dir, "first", age_seconds=20)
+    write_key(keys_dir, "second", age_seconds=10)
+    keyring = KeyRing(str(keys_dir))
+    keyring.load()
+
+    assert keyring.signing_key.kid == "first"
+
+
+def test_pinned_signing_kid(keys_dir):
+    write_key(keys_dir, "old", age_seconds=86400)
+    write_key(keys_dir, "new", age_seconds=10)
+    keyring = KeyRing(str(keys_dir), signing_kid="new")
+    keyring.load()
+
+    assert keyring.signing_key.kid == "new"
+
+
+def write_not_before(keys_dir, kid, value):
+    (keys_dir / f"{kid}.json").write_text(json.dumps({"not_before": value}))
+
+
+def test_equal_mtimes_refuse_to_pick_a_signing_key(keys_dir):
+    # What a Kubernetes secret mount looks like.
+    mounted_at = time.time() - 86400
+    for kid in ("a-new", "z-old"):
+        os.utime(write_key(keys_dir, kid, 0), (mounted_at, mounted_at))
+    keyring = KeyRing(str(keys_dir))
+
+    with pytest.raises(RuntimeError, match="same not_before"):
+        keyring.load()
+
+    pinned = KeyRing(str(keys_dir), signing_kid="z-old")
+    pinned.load()
+    assert pinned.signing_key.kid == "z-old"
+
+
+def test_not_before_file_overrides_the_mtime(keys_dir):
+    write_key(keys_dir, "old", age_seconds=86400)
+    write_key(keys_dir, "new", age_seconds=86400)
+    write_not_before(keys_dir, "old", 0)
+    write_not_before(keys_dir, "new", time.time() - 100)
+    keyring = KeyRing(str(keys_dir))
+    keyring.load()
+
+    assert keyring.signing_key.kid == "old"
+
+    write_not_before(keys_dir, "new", "2000-01-02T00:00:00+00:00")
+    keyring.load()
+
+    assert keyring.signing_key.kid == "new"
+
+
+@pytest.fixture
+def keyring(keys_dir, monkeypatch):
+    monkeypatch.setattr(settings, "jwt_keys_dir", str(keys_dir))
+    monkeypatch.setattr(settings, "jwt_signing_kid", "")
+    monkeypatch.setattr(keys_module, "_keyring", None)
+    verified_tokens.clear()
+    yield keys_module.get_keyring()
+    verified_tokens.clear()
+
+
+def test_tokens_of_a_removed_key_are_rejected(keys_dir, keyring):
+    old = write_key(keys_dir, "old", age_seconds=86400)
+    keyring.load()
+    token = create_access_token({"sub": "1"})
+    assert verify_token(token)["sub"] == "1"
+
+    write_key(keys_dir, "new", age_seconds=86400 - 1)
+    keyring.load()
+    verified_tokens.clear()
+    # Overlap: the old key still verifies while it is in the directory.
+    assert verify_token(token)["sub"] == "1"
+    assert keyring.current().kid == "new"
+
+    old.unlink()
+    keyring.load()
+    assert jwks_kids(keyring) == {"new"}
+    verified_tokens.clear()
+    with pytest.raises(HTTPException) as exc_info:
+        verify_token(token)
+    assert exc_info.value.status_code == 401
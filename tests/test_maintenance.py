@@ -0,0 +1,131 @@
+import pytest
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, func, select, update
+
+from app.core.config import settings
+from app.core.session import AsyncSessionLocal
+from app.db.models.code import VerificationCode
+from app.db.models.outbox import EmailOutbox
+from app.db.repo.code import VerificationCodeRepository
+from app.db.repo.outbox import EmailOutboxRepository
+from app.services.maintenance import ExpiredCodeSweeper, OutboxPurger
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def advisory_lock(engine):
+    # SQLite has no advisory locks; stand in for the Postgres function and
+    # record how often it was taken.
+    lock = {"free": True, "calls": 0}
+
+    def try_lock(key):
+        lock["calls"] += 1
+        return lock["free"]
+
+    def register(dbapi_connection, connection_record, connection_proxy):
+        dbapi_connection.create_function("pg_try_advisory_xact_lock", 1, try_lock)
+
+    event.listen(engine.sync_engine, "checkout", register)
+    yield lock
+    event.remove(engine.sync_engine, "checkout", register)
+
+
+async def issue_used_codes(user_id, count):
+    async with AsyncSessionLocal() as session:
+        repo = VerificationCodeRepository(session)
+        for _ in range(count):
+            await repo.issue(user_id, "000000", 900)
+        await session.commit()
+        await session.execute(update(VerificationCode).values(is_used=True))
+        await repo.issue(user_id, "123456", 900)
+        await session.commit()
+
+
+async def remaining_codes():
+    async with AsyncSessionLocal() as session:
+        return await session.scalar(select(func.count(VerificationCode.id)))
+
+
+async def test_sweeper_deletes_in_locked_batches(user, advisory_lock, monkeypatch):
+    monkeypatch.setattr(settings, "code_sweeper_batch_size", 2)
+    await issue_used_codes(user.id, 5)
+    sweeper = ExpiredCodeSweeper()
+
+    await sweeper.run_once()
+
+    assert sweeper.last_rows_deleted == 5
+    assert await remaining_codes() == 1
+    # One lock per batch transaction: 2 + 2 + 1.
+    assert advisory_lock["calls"] == 3
+    assert sweeper.runs == 1
+
+
+async def test_sweeper_skips_when_another_instance_holds_the_lock(
+    user, advisory_lock
+):
+    await issue_used_codes(user.id, 3)
+    advisory_lock["free"] = False
+    sweeper = ExpiredCodeSweeper()
+
+    await sweeper.run_once()
+
+    assert sweeper.skipped == 1
+    assert sweeper.runs == 0
+    assert await remaining_codes() == 4
+
+
+async def add_message(session, status, age):
+    message = EmailOutbox(
+        recipient="player@example.com",
+        kind=EmailOutbox.KIND_VERIFICATION,
+        payload={"code": "123456"},
+        status=status,
+        attempts=1,
+        updated_at=datetime.now(timezone.utc) - age,
+    )
+    session.add(message)
+    await session.flush()
+    return message.id
+
+
+async def test_purger_deletes_finished_outbox_rows(engine, advisory_lock):
+    async with AsyncSessionLocal() as session:
+        old_sent = await add_message(session, EmailOutbox.STATUS_SENT, timedelta(days=8))
+        old_failed = await add_message(
+            session, EmailOutbox.STATUS_FAILED, timedelta(days=8)
+        )
+        recent_sent = await add_message(
+            session, EmailOutbox.STATUS_SENT, timedelta(hours=1)
+        )
+        pending = await add_message(
+            session, EmailOutbox.STATUS_PENDING, timedelta(days=8)
+        )
+        await session.commit()
+    purger = OutboxPurger()
+
+    await purger.run_once()
+
+    async with AsyncSessionLocal() as session:
+        remaining = set(await session.scalars(select(EmailOutbox.id)))
+    assert remaining == {recent_sent, pending}
+    assert purger.rows_deleted_total == 2
+
+
+async def test_mark_sent_drops_the_payload(engine):
+    async with AsyncSessionLocal() as session:
+        message_id = await add_message(
+            session, EmailOutbox.STATUS_PENDING, timedelta(0)
+        )
+        await EmailOutboxRepository(session).mark_sent(message_id)
+        await session.commit()
+
+        result = await session.execute(
+            select(EmailOutbox.status, EmailOutbox.payload.is_(None)).where(
+                EmailOutbox.id == message_id
+            )
+        )
+        assert result.one() == (EmailOutbox.STATUS_SENT, True)
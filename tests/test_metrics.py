@@ -0,0 +1,56 @@
+import pytest
+
+from prometheus_client.parser import text_string_to_metric_families
+
+from app.core.config import settings
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def internal_token(monkeypatch):
+    monkeypatch.setattr(settings, "internal_token", "scrape-token")
+    return "scrape-token"
+
+
+async def test_metrics_refused_without_a_configured_token(client):
+    response = await client.get(
+        "/metrics", headers={"Authorization": "Bearer anything"}
+    )
+
+    assert response.status_code == 403
+
+
+async def test_metrics_refused_with_a_wrong_token(client, internal_token):
+    response = await client.get("/metrics", headers={"Authorization": "Bearer nope"})
+
+    assert response.status_code == 403
+
+
+async def test_metrics_types(client, access_token, internal_token):
+    response = await client.get(
+        "/metrics", headers={"Authorization": f"Bearer {internal_token}"}
+    )
+    assert response.status_code == 200
+
+    families = list(text_string_to_metric_families(response.text))
+    types = {family.name: family.type for family in families}
+
+    assert len(types) == len(families)
+    assert types["user_cache_local_hits"] == "counter"
+    assert types["user_cache_local_evictions"] == "counter"
+    assert types["user_cache_local_size"] == "gauge"
+    assert types["jwt_verify_cache_misses"] == "counter"
+    assert types["jwt_verify_cache_hit_ratio"] == "gauge"
+    assert types["token_version_cache_evictions"] == "counter"
+    assert types["token_version_cache_size"] == "gauge"
+    assert types["password_hash_admitted"] == "counter"
+    assert types["password_hash_queued"] == "gauge"
+    assert types["password_rehash_submitted"] == "counter"
+    assert types["password_rehash_rehashed"] == "counter"
+    assert types["code_sweeper_runs"] == "counter"
+    assert types["code_sweeper_last_rows_deleted"] == "gauge"
+    assert types["outbox_purger_rows_deleted"] == "counter"
+    assert types["auth_events_recorded"] == "counter"
+    assert types["auth_events_buffered"] == "gauge"
@@ -0,0 +1,155 @@
+import pytest
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.session import AsyncSessionLocal
+from app.db.models.outbox import EmailOutbox
+from app.db.repo.outbox import EmailOutboxRepository
+from app.services.outbox import EmailOutboxWorker
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeEmailService:
+    def __init__(self, result=True):
+        self.result = result
+        self.sent = []
+
+    async def send_verification_email(self, email, code):
+        self.sent.append((email, code))
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+@pytest.fixture
+def outbox_settings(monkeypatch):
+    monkeypatch.setattr(settings, "outbox_batch_size", 10)
+    monkeypatch.setattr(settings, "outbox_lease_seconds", 120)
+    monkeypatch.setattr(settings, "outbox_max_attempts", 3)
+    monkeypatch.setattr(settings, "outbox_backoff_base_seconds", 5)
+    monkeypatch.setattr(settings, "outbox_backoff_max_seconds", 60)
+
+
+def worker(result=True):
+    outbox_worker = EmailOutboxWorker()
+    outbox_worker.email_service = FakeEmailService(result)
+    return outbox_worker
+
+
+async def enqueue(code="123456"):
+    async with AsyncSessionLocal() as session:
+        repo = EmailOutboxRepository(session)
+        await repo.enqueue(
+            "player@example.com", EmailOutbox.KIND_VERIFICATION, {"code": code}
+        )
+        await repo.commit()
+
+
+async def claim():
+    async with AsyncSessionLocal() as session:
+        return await EmailOutboxRepository(session).claim_batch(
+            limit=10, lease_seconds=120
+        )
+
+
+async def make_due():
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(EmailOutbox).values(
+                next_attempt_at=datetime.now(timezone.utc) - timedelta(seconds=1)
+            )
+        )
+        await session.commit()
+
+
+async def load_message():
+    async with AsyncSessionLocal() as session:
+        return (await session.execute(select(EmailOutbox))).scalar_one()
+
+
+def seconds_until(moment):
+    moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - datetime.now(timezone.utc)).total_seconds()
+
+
+async def test_claimed_messages_are_leased(engine):
+    await enqueue()
+
+    claimed = await claim()
+
+    assert [message.attempts for message in claimed] == [1]
+    assert await claim() == []
+    assert 100 < seconds_until((await load_message()).next_attempt_at) <= 120
+
+
+async def test_expired_lease_is_reclaimed(engine):
+    await enqueue()
+    await claim()
+
+    # The worker that held the lease died without reporting back.
+    await make_due()
+    reclaimed = await claim()
+
+    assert [message.attempts for message in reclaimed] == [2]
+
+
+async def test_sent_message_is_marked_sent(engine, outbox_settings):
+    await enqueue()
+    outbox_worker = worker()
+
+    await outbox_worker.run_once()
+
+    message = await load_message()
+    assert outbox_worker.email_service.sent == [("player@example.com", "123456")]
+    assert message.status == EmailOutbox.STATUS_SENT
+    assert message.payload is None
+
+
+async def test_failed_send_is_retried_with_backoff(engine, outbox_settings):
+    await enqueue()
+    outbox_worker = worker(ConnectionError("smtp is down"))
+
+    await outbox_worker.run_once()
+    first = await load_message()
+    await make_due()
+    await outbox_worker.run_once()
+    second = await load_message()
+
+    assert second.status == EmailOutbox.STATUS_PENDING
+    assert second.attempts == 2
+    assert "smtp is down" in second.last_error
+    assert second.payload == {"code": "123456"}
+    assert 3 < seconds_until(first.next_attempt_at) <= 5
+    assert 8 < seconds_until(second.next_attempt_at) <= 10
+
+
+def test_backoff_is_capped(outbox_settings):
+    outbox_worker = worker()
+
+    delays = [
+        round(seconds_until(outbox_worker._retry_at(attempts)))
+        for attempts in (1, 2, 3, 4, 5, 10)
+    ]
+
+    assert delays == [5, 10, 20, 40, 60, 60]
+
+
+async def test_message_is_given_up_after_max_attempts(engine, outbox_settings):
+    await enqueue()
+    outbox_worker = worker(False)
+
+    for _ in range(settings.outbox_max_attempts):
+        await outbox_worker.run_once()
+        await make_due()
+    await outbox_worker.run_once()
+
+    message = await load_message()
+    assert len(outbox_worker.email_service.sent) == settings.outbox_max_attempts
+    assert message.status == EmailOutbox.STATUS_FAILED
+    assert message.attempts == settings.outbox_max_attempts
+    assert message.payload is None
@@ -0,0 +1,125 @@
+import httpx
+import pytest
+
+from fastapi import Depends, FastAPI, Request
+from redis.exceptions import ConnectionError
+
+import app.core.ratelimit as ratelimit
+from app.core.config import settings
+from app.core.ratelimit import RateLimiter, client_ip, rate_limit
+
+
+pytestmark = pytest.mark.anyio
+
+
+def make_request(forwarded=None, peer="10.0.0.1"):
+    headers = []
+    if forwarded is not None:
+        headers.append((b"x-forwarded-for", forwarded.encode()))
+    return Request(
+        {"type": "http", "headers": headers, "client": (peer, 1234)}
+    )
+
+
+@pytest.fixture
+def forwarded_for(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_trust_forwarded_for", True)
+    monkeypatch.setattr(settings, "rate_limit_trusted_proxies", 1)
+
+
+def test_forwarded_for_is_ignored_by_default():
+    assert client_ip(make_request("1.2.3.4")) == "10.0.0.1"
+
+
+def test_spoofed_forwarded_for_entries_are_ignored(forwarded_for):
+    assert client_ip(make_request("6.6.6.6, 203.0.113.7")) == "203.0.113.7"
+    assert client_ip(make_request("7.7.7.7, 203.0.113.7")) == "203.0.113.7"
+
+
+def test_trusted_proxies_counts_hops_from_the_right(forwarded_for, monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_trusted_proxies", 2)
+
+    request = make_request("6.6.6.6, 203.0.113.7, 10.1.1.1")
+
+    assert client_ip(request) == "203.0.113.7"
+
+
+def test_short_forwarded_for_falls_back_to_peer(forwarded_for, monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_trusted_proxies", 2)
+
+    assert client_ip(make_request("203.0.113.7")) == "10.0.0.1"
+
+
+@pytest.fixture
+def limited(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    monkeypatch.setattr(ratelimit, "rate_limiter", RateLimiter())
+
+    app = FastAPI()
+
+    @app.post("/login", dependencies=[Depends(rate_limit("login", 3, 1))])
+    async def login():
+        return {}
+
+    return app
+
+
+@pytest.fixture
+async def limited_client(limited, forwarded_for):
+    transport = httpx.ASGITransport(app=limited)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+async def post(client, email, forwarded):
+    return await client.post(
+        "/login", json={"email": email}, headers={"X-Forwarded-For": forwarded}
+    )
+
+
+async def test_spoofed_forwarded_for_does_not_reset_the_ip_limit(limited_client):
+    codes = [
+        (await post(limited_client, f"u{i}@example.com", f"6.6.6.{i}, 203.0.113.7"))
+        .status_code
+        for i in range(4)
+    ]
+
+    assert codes == [200, 200, 200, 429]
+
+
+async def test_email_limit_applies_across_addresses(limited_client):
+    first = await post(limited_client, "player@example.com", "203.0.113.1")
+    second = await post(limited_client, " Player@Example.com", "203.0.113.2")
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert int(second.headers["Retry-After"]) >= 1
+
+
+async def test_local_buckets_are_used_without_redis(limited_client):
+    assert ratelimit.get_redis() is None
+
+    await post(limited_client, "player@example.com", "203.0.113.1")
+
+    assert any(
+        key.startswith("login:email:") for key in ratelimit.rate_limiter.local._buckets
+    )
+
+
+class BrokenScript:
+    async def __call__(self, keys, args):
+        raise ConnectionError("connection refused")
+
+
+class BrokenRedis:
+    def register_script(self, script):
+        return BrokenScript()
+
+
+async def test_redis_errors_fall_back_to_local_buckets(monkeypatch):
+    monkeypatch.setattr(ratelimit, "get_redis", lambda: BrokenRedis())
+    limiter = RateLimiter()
+    limits = [ratelimit.Limit("login:ip:203.0.113.7", 1)]
+
+    assert await limiter.hit(limits) == 0
+    assert await limiter.hit(limits) > 0
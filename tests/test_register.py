@@ -0,0 +1,49 @@
+import pytest
+
+from sqlalchemy import delete
+
+import app.services.user as user_service_module
+from app.core.cache import get_user_cache
+from app.core.session import AsyncSessionLocal
+from app.db.models.user import User
+from app.db.repo.user import UserRepository
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_duplicate_email_is_rejected_before_hashing(
+    client, user, password, monkeypatch
+):
+    async def fail_hash(password):
+        raise AssertionError("hashed a password for a known email")
+
+    monkeypatch.setattr(user_service_module, "hash_password_async", fail_hash)
+
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={"email": user.email, "username": "other", "password": password},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "User with email already exists"
+
+
+async def test_email_of_a_user_deleted_elsewhere_can_register_again(
+    client, user, password
+):
+    async with AsyncSessionLocal() as session:
+        # Warm this worker's cache, then delete the row behind its back, the
+        # way another worker would.
+        await UserRepository(session, cache=get_user_cache()).get_by_email(
+            user.email
+        )
+        await session.execute(delete(User).where(User.id == user.id))
+        await session.commit()
+
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={"email": user.email, "username": "again", "password": password},
+    )
+
+    assert response.status_code == 201
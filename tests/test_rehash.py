@@ -0,0 +1,205 @@
+import httpx
+import pytest
+
+from fastapi import HTTPException
+from passlib.hash import argon2
+from sqlalchemy import select, update
+
+import app.core.utils.hash_calibration as hash_calibration
+import app.services.rehash as rehash_module
+from app.core.config import settings
+from app.core.session import AsyncSessionLocal
+from app.core.utils.hash_calibration import MIN_MEMORY_COST_KIB, calibrate_argon2
+from app.core.utils.security import (
+    get_argon2_params,
+    hash_password,
+    password_needs_rehash,
+)
+from app.db.models.user import User
+from app.db.repo.user import UserRepository
+from app.main import app
+
+
+pytestmark = pytest.mark.anyio
+
+
+def argon2_hash(
+    type="id", time_cost=None, memory_cost=None, parallelism=None, password="secret"
+):
+    current_time_cost, current_memory_cost, current_parallelism = get_argon2_params()
+    return argon2.using(
+        type=type,
+        time_cost=time_cost or current_time_cost,
+        memory_cost=memory_cost or current_memory_cost,
+        parallelism=parallelism or current_parallelism,
+    ).hash(password)
+
+
+def test_current_hash_is_kept():
+    assert not password_needs_rehash(hash_password("secret"))
+
+
+def test_cost_within_tolerance_is_kept():
+    _, memory_cost, _ = get_argon2_params()
+
+    assert not password_needs_rehash(argon2_hash(memory_cost=int(memory_cost * 1.2)))
+    assert password_needs_rehash(argon2_hash(memory_cost=memory_cost * 2))
+
+
+def test_different_parallelism_is_rehashed():
+    _, _, parallelism = get_argon2_params()
+
+    assert password_needs_rehash(argon2_hash(parallelism=parallelism + 1))
+
+
+@pytest.mark.parametrize("variant", ["i", "d"])
+def test_other_argon2_variants_are_rehashed(variant):
+    assert password_needs_rehash(argon2_hash(type=variant))
+
+
+def test_bcrypt_is_rehashed():
+    bcrypt_hash = "$2b$04$dfjUkHps4jVHV.SrOheqb.VYELiZ.yE7usIBRRiUxXWISQ3Y7gwKC"
+
+    assert password_needs_rehash(bcrypt_hash)
+
+
+def test_unknown_hash_is_left_alone():
+    assert not password_needs_rehash("not-a-hash")
+
+
+@pytest.fixture
+def fake_timings(monkeypatch):
+    # One millisecond per MiB and pass.
+    def measure_verify_ms(time_cost, memory_cost, parallelism, rounds=3):
+        return time_cost * memory_cost / 1024
+
+    monkeypatch.setattr(hash_calibration, "measure_verify_ms", measure_verify_ms)
+
+
+def test_calibration_spends_the_budget_on_passes(fake_timings):
+    params, elapsed_ms = calibrate_argon2(250, 65536, 2)
+
+    assert params == (3, 65536, 2)
+    assert elapsed_ms == 192
+
+
+def test_calibration_halves_memory_while_one_pass_is_too_slow(fake_timings):
+    params, _ = calibrate_argon2(100, 409600, 2)
+
+    assert params == (1, 102400, 2)
+
+
+def test_calibration_stops_at_the_memory_floor(fake_timings):
+    params, _ = calibrate_argon2(1, 409600, 2)
+
+    assert params == (1, MIN_MEMORY_COST_KIB, 2)
+
+
+async def stored_hash(user_id):
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(User.password_hash).where(User.id == user_id)
+        )
+        return result.scalar_one()
+
+
+async def test_replace_password_hash_only_replaces_the_verified_hash(user):
+    old_hash = await stored_hash(user.id)
+    async with AsyncSessionLocal() as session:
+        repo = UserRepository(session)
+
+        assert not await repo.replace_password_hash(
+            user.id, user.email, "some-other-hash", "new-hash"
+        )
+        assert await stored_hash(user.id) == old_hash
+
+        assert await repo.replace_password_hash(
+            user.id, user.email, old_hash, "new-hash"
+        )
+        assert await stored_hash(user.id) == "new-hash"
+
+
+@pytest.fixture
+def rehash_on_login(monkeypatch):
+    monkeypatch.setattr(settings, "security_rehash_on_login", True)
+    rehasher = rehash_module.PasswordRehasher()
+    monkeypatch.setattr(rehash_module, "password_rehasher", rehasher)
+    monkeypatch.setattr("app.services.auth.password_rehasher", rehasher)
+    return rehasher
+
+
+async def set_hash(user_id, password_hash):
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(User).where(User.id == user_id).values(password_hash=password_hash)
+        )
+        await session.commit()
+
+
+async def login(client, user, password):
+    return await client.post(
+        "/api/v1/auth/login", json={"email": user.email, "password": password}
+    )
+
+
+async def test_login_rehashes_an_outdated_hash(
+    rehash_on_login, client, user, password
+):
+    _, _, parallelism = get_argon2_params()
+    await set_hash(user.id, argon2_hash(parallelism=parallelism + 1, password=password))
+
+    assert (await login(client, user, password)).status_code == 200
+
+    new_hash = await stored_hash(user.id)
+    assert new_hash.startswith("$argon2id$")
+    assert not password_needs_rehash(new_hash)
+    assert rehash_on_login.rehashed_total == 1
+    assert (await login(client, user, password)).status_code == 200
+
+
+async def test_login_succeeds_when_the_rehash_is_refused(
+    rehash_on_login, client, user, password, monkeypatch
+):
+    _, _, parallelism = get_argon2_params()
+    old_hash = argon2_hash(parallelism=parallelism + 1, password=password)
+    await set_hash(user.id, old_hash)
+
+    async def overloaded(password):
+        raise HTTPException(status_code=503, detail="Server is busy")
+
+    monkeypatch.setattr(rehash_module, "hash_password_async", overloaded)
+
+    assert (await login(client, user, password)).status_code == 200
+    assert await stored_hash(user.id) == old_hash
+    assert rehash_on_login.failed_total == 1
+
+
+async def test_login_response_does_not_wait_for_the_rehash(
+    rehash_on_login, engine, user, password, monkeypatch
+):
+    _, _, parallelism = get_argon2_params()
+    await set_hash(user.id, argon2_hash(parallelism=parallelism + 1, password=password))
+    events = []
+
+    async def slow_hash(password):
+        events.append("rehash")
+        return hash_password(password)
+
+    monkeypatch.setattr(rehash_module, "hash_password_async", slow_hash)
+
+    async def recording_app(scope, receive, send):
+        async def recording_send(message):
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body"
+            ):
+                events.append("response")
+            await send(message)
+
+        await app(scope, receive, recording_send)
+
+    transport = httpx.ASGITransport(app=recording_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        assert (await login(c, user, password)).status_code == 200
+
+    assert events == ["response", "rehash"]
+    assert rehash_on_login.rehashed_total == 1
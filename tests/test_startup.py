@@ -0,0 +1,21 @@
+import pytest
+
+from benchmarks.startup import TARGET, import_profile
+
+
+# Imported on first use only; a regression here costs every new worker.
+LAZY_MODULES = ("sqladmin", "redis", "asyncpg")
+
+
+@pytest.fixture
+def production_like_env(monkeypatch):
+    monkeypatch.setenv("ADMIN_ENABLED", "true")
+    monkeypatch.setenv("REDIS_ENABLED", "true")
+    monkeypatch.setenv("TOKEN_REVOCATION_STORE", "redis")
+
+
+def test_importing_the_app_stays_lazy(production_like_env):
+    profile = import_profile(TARGET)
+
+    assert TARGET in profile
+    assert [module for module in LAZY_MODULES if module in profile] == []
@@ -0,0 +1,161 @@
+import pytest
+
+from sqlalchemy import update
+
+from app.core.session import AsyncSessionLocal
+from app.db.models.user import User
+from app.db.repo.code import VerificationCodeRepository
+from app.db.repo.user import UserRepository
+
+
+pytestmark = pytest.mark.anyio
+
+
+def summary(statements):
+    # (verb, table) per statement, e.g. ("SELECT", "user_account").
+    result = []
+    for statement in statements.statements:
+        words = statement.replace("\n", " ").split()
+        verb = words[0]
+        if verb == "SELECT":
+            table = words[words.index("FROM") + 1]
+        elif verb == "UPDATE":
+            table = words[1]
+        else:
+            table = words[2]
+        result.append((verb, table))
+    return result
+
+
+async def test_login_with_a_cold_cache_is_one_select(
+    client, user, password, statements
+):
+    response = await client.post(
+        "/api/v1/auth/login", json={"email": user.email, "password": password}
+    )
+
+    assert response.status_code == 200
+    assert summary(statements) == [("SELECT", "user_account")]
+
+
+async def test_me_with_a_warm_cache_runs_no_sql(client, access_token, statements):
+    headers = {"Authorization": f"Bearer {access_token}"}
+    await client.get("/api/v1/auth/me", headers=headers)
+    statements.reset()
+
+    response = await client.get("/api/v1/auth/me", headers=headers)
+
+    assert response.status_code == 200
+    assert statements.count == 0
+
+
+async def test_verify_email_statements(client, user, statements):
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(User)
+            .where(User.id == user.id)
+            .values(is_active=False, is_verified=False)
+        )
+        await VerificationCodeRepository(session).issue(user.id, "123456", 900)
+        await session.commit()
+    statements.reset()
+
+    response = await client.post(
+        "/api/v1/auth/verify-email", json={"email": user.email, "code": "123456"}
+    )
+
+    assert response.status_code == 200
+    assert summary(statements) == [
+        ("SELECT", "user_account"),
+        ("UPDATE", "verification_code"),
+        ("UPDATE", "user_account"),
+        # refresh before the row is written through to the cache
+        ("SELECT", "user_account"),
+    ]
+
+
+async def test_register_statements(client, password, statements):
+    response = await client.post(
+        "/api/v1/auth/register",
+        json={"email": "new@example.com", "username": "newbie", "password": password},
+    )
+
+    assert response.status_code == 201
+    assert summary(statements) == [
+        # duplicate check before hashing
+        ("SELECT", "user_account"),
+        ("INSERT", "user_account"),
+        ("INSERT", "verification_code"),
+        ("INSERT", "email_outbox"),
+    ]
+
+
+async def test_resend_verification_statements(client, user, statements):
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(User)
+            .where(User.id == user.id)
+            .values(is_active=False, is_verified=False)
+        )
+        await VerificationCodeRepository(session).issue(user.id, "123456", 900)
+        await session.commit()
+    statements.reset()
+
+    response = await client.post(
+        "/api/v1/auth/resend-code", json={"email": user.email}
+    )
+
+    assert response.status_code == 200
+    assert summary(statements) == [
+        ("SELECT", "user_account"),
+        # the active code is reused, not reissued
+        ("SELECT", "verification_code"),
+        ("INSERT", "email_outbox"),
+    ]
+
+
+async def test_refresh_is_one_select(client, user, password, statements):
+    response = await client.post(
+        "/api/v1/auth/login", json={"email": user.email, "password": password}
+    )
+    refresh_token = response.json()["refresh_token"]
+    statements.reset()
+
+    response = await client.post(
+        "/api/v1/auth/refresh", json={"refresh_token": refresh_token}
+    )
+
+    assert response.status_code == 200
+    assert summary(statements) == [("SELECT", "user_account")]
+
+
+async def test_get_by_id_with_codes_loads_them_eagerly(user, statements):
+    async with AsyncSessionLocal() as session:
+        await VerificationCodeRepository(session).issue(user.id, "123456", 900)
+        await session.commit()
+        statements.reset()
+
+        loaded = await UserRepository(session).get_by_id(user.id, with_codes=True)
+
+        assert [code.code for code in loaded.verification_codes] == ["123456"]
+        assert summary(statements) == [
+            ("SELECT", "user_account"),
+            ("SELECT", "verification_code"),
+        ]
+
+
+async def test_code_get_by_id_with_user_joins_the_user(user, statements):
+    async with AsyncSessionLocal() as session:
+        await VerificationCodeRepository(session).issue(user.id, "123456", 900)
+        await session.commit()
+        codes = await VerificationCodeRepository(session).get_active_by_user(user.id)
+        code_id = codes[0].id
+        session.expunge_all()
+        statements.reset()
+
+        code = await VerificationCodeRepository(session).get_by_id(
+            code_id, with_user=True
+        )
+
+        assert code.user.email == user.email
+        assert summary(statements) == [("SELECT", "verification_code")]
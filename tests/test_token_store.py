@@ -0,0 +1,139 @@
+import pytest
+
+from fastapi import HTTPException
+from redis.exceptions import ConnectionError
+
+import app.db.repo.token_store as token_store
+from app.core.config import settings
+from app.db.repo.token_store import (
+    InMemoryTokenRevocationStore,
+    RedisTokenRevocationStore,
+    get_token_store,
+)
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def unresolved(monkeypatch):
+    monkeypatch.setattr(token_store, "_token_store", None)
+    monkeypatch.setattr(token_store, "_token_store_resolved", False)
+
+
+def test_redis_store_without_redis_fails_fast(unresolved, monkeypatch):
+    monkeypatch.setattr(settings, "token_revocation_store", "redis")
+    monkeypatch.setattr(settings, "REDIS_ENABLED", False)
+
+    with pytest.raises(RuntimeError):
+        get_token_store()
+
+
+def test_unknown_store_fails_fast(unresolved, monkeypatch):
+    monkeypatch.setattr(settings, "token_revocation_store", "redsi")
+
+    with pytest.raises(RuntimeError):
+        get_token_store()
+
+
+def test_memory_store(unresolved, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "token_revocation_store", "memory")
+
+    assert isinstance(get_token_store(), InMemoryTokenRevocationStore)
+    assert "only apply within this process" in caplog.text
+
+
+def test_default_store_follows_redis_enabled(unresolved, monkeypatch):
+    monkeypatch.setattr(settings, "token_revocation_store", "")
+    monkeypatch.setattr(settings, "REDIS_ENABLED", False)
+
+    assert isinstance(get_token_store(), InMemoryTokenRevocationStore)
+
+    monkeypatch.setattr(token_store, "_token_store_resolved", False)
+    monkeypatch.setattr(settings, "REDIS_ENABLED", True)
+
+    assert isinstance(get_token_store(), RedisTokenRevocationStore)
+
+
+def test_memory_store_is_refused_with_several_workers(unresolved, monkeypatch):
+    monkeypatch.setattr(settings, "token_revocation_store", "memory")
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+
+    with pytest.raises(RuntimeError):
+        get_token_store()
+
+
+class BrokenPipeline:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, *args, **kwargs):
+        pass
+
+    async def execute(self):
+        raise ConnectionError("connection refused")
+
+
+class BrokenRedis:
+    async def set(self, *args, **kwargs):
+        raise ConnectionError("connection refused")
+
+    async def eval(self, *args):
+        raise ConnectionError("connection refused")
+
+    async def mget(self, keys):
+        raise ConnectionError("connection refused")
+
+    def pipeline(self, transaction=True):
+        return BrokenPipeline()
+
+
+@pytest.fixture
+def broken_redis(monkeypatch):
+    monkeypatch.setattr(token_store, "get_redis", lambda: BrokenRedis())
+
+
+CHECKS = [
+    lambda store: store.start_family("fam", "jti", 60),
+    lambda store: store.rotate("fam", "jti", "new", 60),
+    lambda store: store.is_revoked("jti", "fam"),
+]
+
+
+@pytest.mark.parametrize("call", CHECKS)
+async def test_fail_closed_answers_503(broken_redis, call):
+    with pytest.raises(HTTPException) as exc_info:
+        await call(RedisTokenRevocationStore(fail_open=False))
+
+    assert exc_info.value.status_code == 503
+
+
+async def test_fail_open_lets_tokens_through(broken_redis):
+    store = RedisTokenRevocationStore(fail_open=True)
+
+    await store.start_family("fam", "jti", 60)
+    assert await store.rotate("fam", "jti", "new", 60)
+    assert not await store.is_revoked("jti", "fam")
+
+
+@pytest.mark.parametrize("fail_open", [False, True])
+async def test_revoke_never_fails_silently(broken_redis, fail_open):
+    with pytest.raises(HTTPException) as exc_info:
+        await RedisTokenRevocationStore(fail_open=fail_open).revoke("jti", "fam", 60)
+
+    assert exc_info.value.status_code == 503
+
+
+async def test_me_answers_503_not_401_when_redis_is_down(
+    client, access_token, broken_redis, monkeypatch
+):
+    monkeypatch.setattr(token_store, "_token_store", RedisTokenRevocationStore())
+
+    response = await client.get(
+        "/api/v1/auth/me", headers={"Authorization": f"Bearer {access_token}"}
+    )
+
+    assert response.status_code == 503
@@ -0,0 +1,82 @@
+import pytest
+
+from sqlalchemy import update
+
+from app.core.cache import user_cache
+from app.core.session import AsyncSessionLocal
+from app.db.models.user import User
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def login(client, password):
+    return await client.post(
+        "/api/v1/auth/login",
+        json={"email": "player@example.com", "password": password},
+    )
+
+
+async def test_cached_user_has_no_password_hash(client, user, password):
+    assert (await login(client, password)).status_code == 200
+
+    data = user_cache.local.get(f"id:{user.id}")
+
+    assert data["email"] == user.email
+    assert "password_hash" not in data
+
+
+async def test_login_from_cache_reads_only_the_hash(
+    client, user, password, statements
+):
+    await login(client, password)
+    statements.reset()
+
+    assert (await login(client, password)).status_code == 200
+    assert (await login(client, "wrong-password")).status_code == 401
+
+    assert len(statements.statements) == 2
+    for statement in statements.statements:
+        assert statement.startswith("SELECT user_account.password_hash")
+
+
+async def set_user(user_id, **values):
+    # Another worker's write: the database changes, this worker's cache does not.
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(User).where(User.id == user_id).values(**values))
+        await session.commit()
+
+
+async def test_login_after_verify_email_on_another_worker(client, user, password):
+    await set_user(user.id, is_active=False, is_verified=False)
+    assert (await login(client, password)).status_code == 401
+    assert user_cache.local.get(f"id:{user.id}")["is_active"] is False
+
+    await set_user(user.id, is_active=True, is_verified=True)
+
+    assert (await login(client, password)).status_code == 200
+    assert user_cache.local.get(f"id:{user.id}")["is_active"] is True
+
+
+async def test_deactivated_user_cannot_log_in_from_a_stale_cache(
+    client, user, password
+):
+    assert (await login(client, password)).status_code == 200
+
+    await set_user(user.id, is_active=False)
+
+    assert (await login(client, password)).status_code == 401
+
+
+async def test_refresh_checks_the_token_version_on_the_primary(
+    client, user, password
+):
+    refresh_token = (await login(client, password)).json()["refresh_token"]
+    assert user_cache.local.get(f"id:{user.id}") is not None
+
+    await set_user(user.id, token_version=1)
+    response = await client.post(
+        "/api/v1/auth/refresh", json={"refresh_token": refresh_token}
+    )
+
+    assert response.status_code == 401